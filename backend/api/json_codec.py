@@ -0,0 +1,43 @@
+"""Encode and decode JSON with orjson when it is installed, and the standard library otherwise.
+
+Both codecs raise a subclass of `json.JSONDecodeError` on invalid input, so the
+callers catch the same exception whichever codec is used.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONCodec:
+    """The codec of the standard library."""
+
+    name = "json"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class OrjsonCodec(JSONCodec):
+    """The codec of orjson, which decodes and encodes several times faster."""
+
+    name = "orjson"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+
+def get_codec() -> JSONCodec:
+    return OrjsonCodec() if orjson else JSONCodec()
+
+
+codec = get_codec()
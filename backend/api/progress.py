@@ -0,0 +1,19 @@
+"""Report the progress of long-running Celery tasks to `TaskStatus`."""
+from typing import Any, Optional
+
+PROGRESS = "PROGRESS"
+
+
+def report_progress(task, current: int, total: Optional[int], **info: Any):
+    """Record how many of the items of a task are processed.
+
+    Args:
+        task: the bound Celery task.
+        current: the number of processed items.
+        total: the number of items, or None if it is unknown.
+        info: other details of the progress, e.g. the throughput.
+    """
+    if task.request.id is None or task.request.is_eager:
+        # The task is called directly, so there is no result to update.
+        return
+    task.update_state(state=PROGRESS, meta={"current": current, "total": total, **info})
@@ -0,0 +1,24 @@
+import json
+import unittest
+
+from api.json_codec import JSONCodec, OrjsonCodec
+
+
+class TestJSONCodec(unittest.TestCase):
+    codec = JSONCodec()
+
+    def test_round_trip(self):
+        obj = {"text": "こんにちは", "label": [[0, 5, "LOC"]], "meta": {"score": 0.5, "ok": True, "none": None}}
+        text = self.codec.dumps(obj)
+        self.assertIn("こんにちは", text)
+        self.assertEqual(self.codec.loads(text), obj)
+        self.assertEqual(self.codec.loads(text.encode()), obj)
+
+    def test_raise_json_decode_error(self):
+        for data in ["", "{", '{"text": x}']:
+            with self.subTest(data=data), self.assertRaises(json.JSONDecodeError):
+                self.codec.loads(data)
+
+
+class TestOrjsonCodec(TestJSONCodec):
+    codec = OrjsonCodec()
@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from api.progress import PROGRESS, report_progress
+from api.tests.utils import CRUDMixin
+from users.tests.utils import make_user
+
+
+class TestTaskStatus(CRUDMixin):
+    def setUp(self):
+        self.user = make_user()
+        self.url = reverse(viewname="task_status", args=["task"])
+
+    @patch("api.views.AsyncResult")
+    def test_return_progress_of_running_task(self, async_result):
+        task = async_result.return_value
+        task.ready.return_value = False
+        task.state = PROGRESS
+        task.info = {"current": 1, "total": 2}
+        response = self.assert_fetch(self.user, status.HTTP_200_OK)
+        self.assertEqual(response.data["progress"], {"current": 1, "total": 2})
+        self.assertFalse(response.data["ready"])
+
+    @patch("api.views.AsyncResult")
+    def test_return_result_of_finished_task(self, async_result):
+        task = async_result.return_value
+        task.ready.return_value = True
+        task.successful.return_value = True
+        task.state = "SUCCESS"
+        task.result = {"error": []}
+        response = self.assert_fetch(self.user, status.HTTP_200_OK)
+        self.assertEqual(response.data["result"], {"error": []})
+        self.assertIsNone(response.data["progress"])
+
+
+class TestReportProgress(SimpleTestCase):
+    def test_update_task_state(self):
+        task = MagicMock()
+        task.request.is_eager = False
+        report_progress(task, 1, 2)
+        task.update_state.assert_called_once_with(state=PROGRESS, meta={"current": 1, "total": 2})
+
+    def test_ignore_direct_calls(self):
+        task = MagicMock()
+        task.request.id = None
+        report_progress(task, 1, 2)
+        task.update_state.assert_not_called()
@@ -3,6 +3,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .progress import PROGRESS
+
 
 class TaskStatus(APIView):
     permission_classes = (IsAuthenticated,)
@@ -17,5 +19,6 @@ class TaskStatus(APIView):
                 "ready": ready,
                 "result": task.result if ready and not error else None,
                 "error": {"text": str(task.result)} if error else None,
+                "progress": task.info if task.state == PROGRESS else None,
             }
         )
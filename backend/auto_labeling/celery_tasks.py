@@ -0,0 +1,30 @@
+from functools import partial
+from typing import List, Optional
+
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+
+from .models import AutoLabelingConfig
+from .pipeline.batch import BatchLabeling
+from api.progress import report_progress
+from projects.models import Project
+
+
+@shared_task(bind=True)
+def auto_label_examples(self, user_id, project_id, example_ids: Optional[List[int]] = None):
+    project = get_object_or_404(Project, pk=project_id)
+    user = get_object_or_404(get_user_model(), pk=user_id)
+    examples = project.examples.all()
+    if example_ids is not None:
+        examples = examples.filter(id__in=example_ids)
+    job = BatchLabeling(
+        project,
+        user,
+        AutoLabelingConfig.objects.filter(project=project),
+        concurrency=settings.AUTO_LABELING_CONCURRENCY,
+        rate_limit=settings.AUTO_LABELING_RATE_LIMIT,
+    )
+    errors = job.run(examples, on_progress=partial(report_progress, self))
+    return {"error": errors}
@@ -0,0 +1,132 @@
+"""Auto-label many examples with the configs of a project.
+
+The requests to the models are sent from a bounded pool of threads, while the
+database is only accessed from the calling thread: the label types are loaded
+once per job, and the labels of each chunk of examples are written with
+bulk_create.
+"""
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Type
+
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+
+from .execution import compile_pipeline
+from .labels import LabelCollection, get_collection_class
+from auto_labeling.models import AutoLabelingConfig
+from examples.models import Example
+from labels.models import Label
+from metrics.summaries import summarize_labels
+from projects.models import Project
+
+
+class RateLimiter:
+    """Space out the calls to `wait`, so that at most `rate` of them return per second.
+
+    Args:
+        rate: the number of calls per second. 0 disables the limit.
+    """
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = self.clock()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            self.sleep(delay)
+
+
+class BatchLabeling:
+    """Run the auto-labeling configs of a project on many examples.
+
+    Args:
+        project: the project.
+        user: the user the labels are created for.
+        configs: the auto-labeling configs to run on each example.
+        concurrency: the maximum number of requests sent at the same time.
+        rate_limit: the maximum number of requests sent per second. 0 disables the limit.
+        chunk_size: the number of examples whose labels are written at once.
+
+    Examples:
+        >>> job = BatchLabeling(project, user, project.auto_labeling_config.all(), concurrency=4)
+        >>> job.run(project.examples.all())
+        [{'example': 3, 'text': 'Connection refused'}]
+    """
+
+    def __init__(
+        self,
+        project: Project,
+        user: User,
+        configs: Iterable[AutoLabelingConfig],
+        concurrency: int = 1,
+        rate_limit: float = 0,
+        chunk_size: int = 100,
+    ):
+        self.project = project
+        self.user = user
+        self.pipelines = [(config.task_type, compile_pipeline(config)) for config in configs]
+        self.concurrency = max(concurrency, 1)
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.chunk_size = chunk_size
+        self.types = {
+            task_type: get_collection_class(task_type).load_types(project)
+            for task_type in {task_type for task_type, _ in self.pipelines}
+        }
+
+    def run(
+        self, examples: QuerySet, on_progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[Dict[str, object]]:
+        """Label the examples, and return the errors of the examples whose requests failed.
+
+        Args:
+            examples: the examples to label.
+            on_progress: called with the number of labeled examples and the total after each chunk.
+        """
+        example_ids = list(examples.order_by("id").values_list("id", flat=True))
+        errors: List[Dict[str, object]] = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for i in range(0, len(example_ids), self.chunk_size):
+                chunk = Example.objects.filter(id__in=example_ids[i : i + self.chunk_size]).order_by("id")
+                errors.extend(self.label_chunk(executor, list(chunk)))
+                if on_progress:
+                    on_progress(min(i + self.chunk_size, len(example_ids)), len(example_ids))
+        return errors
+
+    def label_chunk(self, executor: ThreadPoolExecutor, examples: List[Example]) -> List[Dict[str, object]]:
+        for example in examples:
+            # Avoids a query per example in Example.data.
+            example.project = self.project
+        tasks = [(example, task_type, execute) for example in examples for task_type, execute in self.pipelines]
+        results = executor.map(lambda task: self.predict(task[0].data, task[2]), tasks)
+
+        labels: Dict[Type[Label], List[Label]] = defaultdict(list)
+        errors = []
+        for (example, task_type, _), result in zip(tasks, results):
+            if isinstance(result, Exception):
+                errors.append({"example": example.id, "text": str(result)})
+                continue
+            labels[result.model].extend(result.transform(self.project, example, self.user, self.types[task_type]))
+        for model, instances in labels.items():
+            instances = model.objects.filter_annotatable_labels(instances, self.project)
+            model.objects.bulk_create(instances)
+            summarize_labels(model, [example.id for example in examples])
+        return errors
+
+    def predict(self, data: str, execute: Callable[[str], LabelCollection]):
+        self.rate_limiter.wait()
+        try:
+            return execute(data)
+        except Exception as e:
+            return e
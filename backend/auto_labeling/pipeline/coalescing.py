@@ -0,0 +1,36 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class RequestCoalescer:
+    """Run a function once for the concurrent calls with the same key, and share its outcome.
+
+    Examples:
+        >>> coalescer = RequestCoalescer()
+        >>> coalescer.call("key", lambda: model.send(text))  # other threads calling with "key" wait for this call
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[Hashable, Future] = {}
+
+    def call(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self.lock:
+            future = self.calls.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self.calls[key] = Future()
+        if not is_owner:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
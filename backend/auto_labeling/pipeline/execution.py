@@ -1,4 +1,6 @@
-from typing import Type
+import hashlib
+import json
+from typing import Callable, Dict, Type
 
 from auto_labeling_pipeline.labels import (
     ClassificationLabels,
@@ -10,8 +12,12 @@ from auto_labeling_pipeline.mappings import MappingTemplate
 from auto_labeling_pipeline.models import RequestModelFactory
 from auto_labeling_pipeline.pipeline import pipeline
 from auto_labeling_pipeline.postprocessing import PostProcessor
+from django.conf import settings
+from jinja2 import Template
 
-from .labels import create_labels
+from .coalescing import RequestCoalescer
+from .labels import LabelCollection, create_labels
+from .lru import LRUCache
 from auto_labeling.models import AutoLabelingConfig
 
 
@@ -19,11 +25,75 @@ def get_label_collection(task_type: str) -> Type[Labels]:
     return {"Category": ClassificationLabels, "Span": SequenceLabels, "Text": Seq2seqLabels}[task_type]
 
 
-def execute_pipeline(data: str, config: AutoLabelingConfig):
+class CompiledMappingTemplate(MappingTemplate):
+    """A mapping template parsed once, instead of on each rendering."""
+
+    def __init__(self, label_collection: Type[Labels] = Labels, template: str = ""):
+        super().__init__(label_collection=label_collection, template=template)
+        self.compiled = Template(self.template)
+
+    def render(self, response: Dict) -> Labels:
+        labels = json.loads(self.compiled.render(input=response))
+        return self.label_collection(labels)
+
+
+# The pipelines of the latest configs, keyed by the id and the update time of the config.
+_pipelines = LRUCache(maxsize=128)
+
+# The labels predicted for the latest examples, keyed by the config version and the hash of the example data.
+_predictions = LRUCache(maxsize=settings.AUTO_LABELING_CACHE_SIZE, ttl=settings.AUTO_LABELING_CACHE_TIMEOUT)
+_requests = RequestCoalescer()
+
+
+def build_pipeline(config: AutoLabelingConfig) -> Callable[[str], LabelCollection]:
+    """Build the pipeline of a config, to run it on many examples.
+
+    The returned function can be called from several threads: it does not access the database.
+    """
     label_collection = get_label_collection(config.task_type)
     model = RequestModelFactory.create(model_name=config.model_name, attributes=config.model_attrs)
-    template = MappingTemplate(label_collection=label_collection, template=config.template)
+    template = CompiledMappingTemplate(label_collection=label_collection, template=config.template)
     post_processor = PostProcessor(config.label_mapping)
-    labels = pipeline(text=data, request_model=model, mapping_template=template, post_processing=post_processor)
-    labels = create_labels(config.task_type, labels)
-    return labels
+
+    def predict(data: str) -> Labels:
+        # The models fill the placeholders of their attributes in place, so each call uses its own copy.
+        request_model = model.copy(deep=True)
+        return pipeline(
+            text=data, request_model=request_model, mapping_template=template, post_processing=post_processor
+        )
+
+    def predict_once(data: str) -> Labels:
+        key = (config.pk, config.updated_at, hashlib.sha256(data.encode()).hexdigest())
+
+        def load() -> Labels:
+            labels = _predictions.get(key)
+            if labels is None:
+                labels = predict(data)
+                _predictions.set(key, labels)
+            return labels
+
+        # Concurrent calls for the same example wait for the first one instead of sending their own request.
+        return _requests.call(key, load)
+
+    def execute(data: str) -> LabelCollection:
+        labels = predict(data) if config.pk is None else predict_once(data)
+        # The collection is created for each call, because saving it modifies its labels.
+        return create_labels(config.task_type, labels)
+
+    return execute
+
+
+def compile_pipeline(config: AutoLabelingConfig) -> Callable[[str], LabelCollection]:
+    """Return the pipeline of a config, built once per version of the config."""
+    if config.pk is None:
+        return build_pipeline(config)
+    key = (config.pk, config.updated_at)
+    execute = _pipelines.get(key)
+    if execute is None:
+        execute = build_pipeline(config)
+        _pipelines.set(key, execute)
+    return execute
+
+
+def execute_pipeline(data: str, config: AutoLabelingConfig):
+    return compile_pipeline(config)(data)
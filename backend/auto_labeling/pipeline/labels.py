@@ -1,12 +1,14 @@
 import abc
-from typing import List, Type
+from typing import Dict, List, Optional, Type
 
 from auto_labeling_pipeline.labels import Labels
 from django.contrib.auth.models import User
 
 from examples.models import Example
+from label_types.caches import get_label_types
 from label_types.models import CategoryType, LabelType, SpanType
 from labels.models import Category, Label, Span, TextLabel
+from metrics.summaries import summarize_labels
 from projects.models import Project
 
 
@@ -17,8 +19,14 @@ class LabelCollection(abc.ABC):
     def __init__(self, labels):
         self.labels = labels
 
-    def transform(self, project: Project, example: Example, user: User) -> List[Label]:
-        mapping = {c.text: c for c in self.label_type.objects.filter(project=project)}
+    @classmethod
+    def load_types(cls, project: Project) -> Dict[str, LabelType]:
+        return get_label_types(cls.label_type, project.id)
+
+    def transform(
+        self, project: Project, example: Example, user: User, types: Optional[Dict[str, LabelType]] = None
+    ) -> List[Label]:
+        mapping = self.load_types(project) if types is None else types
         annotations = []
         for label in self.labels:
             if label["label"] not in mapping:
@@ -33,6 +41,7 @@ class LabelCollection(abc.ABC):
         labels = self.transform(project, example, user)
         labels = self.model.objects.filter_annotatable_labels(labels, project)
         self.model.objects.bulk_create(labels)
+        summarize_labels(self.model, [example.id])
 
 
 class Categories(LabelCollection):
@@ -48,7 +57,13 @@ class Spans(LabelCollection):
 class Texts(LabelCollection):
     model = TextLabel
 
-    def transform(self, project: Project, example: Example, user: User) -> List[Label]:
+    @classmethod
+    def load_types(cls, project: Project) -> Dict[str, LabelType]:
+        return {}
+
+    def transform(
+        self, project: Project, example: Example, user: User, types: Optional[Dict[str, LabelType]] = None
+    ) -> List[Label]:
         annotations = []
         for label in self.labels:
             label["example"] = example
@@ -57,5 +72,9 @@ class Texts(LabelCollection):
         return annotations
 
 
+def get_collection_class(task_type: str) -> Type[LabelCollection]:
+    return {"Category": Categories, "Span": Spans, "Text": Texts}[task_type]
+
+
 def create_labels(task_type: str, labels: Labels) -> LabelCollection:
-    return {"Category": Categories, "Span": Spans, "Text": Texts}[task_type](labels.dict())
+    return get_collection_class(task_type)(labels.dict())
@@ -0,0 +1,235 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, TestCase
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from api.tests.utils import CRUDMixin
+from auto_labeling.celery_tasks import auto_label_examples
+from auto_labeling.pipeline.batch import BatchLabeling, RateLimiter
+from auto_labeling.pipeline.labels import Spans
+from examples.tests.utils import make_doc
+from labels.models import Category, Span
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class StubModelHandler(BaseHTTPRequestHandler):
+    """Return the category `POS` or `NEG` depending on whether the text contains `good`."""
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            server.texts.append(None)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        text = body["text"]
+        server.barrier_wait()
+        with server.lock:
+            server.active -= 1
+            server.texts[-1] = text
+        if text == "error":
+            self.send_response(500)
+            self.end_headers()
+            self.wfile.write(b"error")
+            return
+        label = "POS" if "good" in text else "NEG"
+        data = json.dumps([{"label": label}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubModelServer(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubModelHandler)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, parties=1):
+        self.active = 0
+        self.max_active = 0
+        self.texts = []
+        self.barrier = threading.Barrier(parties) if parties > 1 else None
+
+    def barrier_wait(self):
+        if self.barrier:
+            try:
+                self.barrier.wait(timeout=1)
+            except threading.BrokenBarrierError:
+                pass
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class TestBatchLabeling(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = StubModelServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.reset()
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION, single_class_classification=False)
+        self.user = self.project.admin
+        self.pos = mommy.make("CategoryType", project=self.project.item, text="POS")
+        self.neg = mommy.make("CategoryType", project=self.project.item, text="NEG")
+        self.examples = [make_doc(self.project.item) for _ in range(6)]
+        for i, example in enumerate(self.examples):
+            example.text = f"good {i}" if i % 2 else f"bad {i}"
+            example.save()
+        mommy.make(
+            "AutoLabelingConfig",
+            project=self.project.item,
+            task_type="Category",
+            model_name="Custom REST Request",
+            model_attrs={
+                "url": self.server.url,
+                "method": "POST",
+                "params": {},
+                "headers": {},
+                "body": {"text": "{{ text }}"},
+            },
+            template="{{ input | tojson }}",
+        )
+
+    def run_job(self, examples=None, **kwargs):
+        configs = self.project.item.auto_labeling_config.all()
+        job = BatchLabeling(self.project.item, self.user, configs, **kwargs)
+        return job.run(examples if examples is not None else self.project.item.examples.all())
+
+    def test_label_all_examples(self):
+        errors = self.run_job(concurrency=3, chunk_size=4)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.server.texts), len(self.examples))
+        labels = {category.example_id: category.label for category in Category.objects.all()}
+        expected = {example.id: self.pos if "good" in example.text else self.neg for example in self.examples}
+        self.assertEqual(labels, expected)
+
+    def test_send_requests_concurrently(self):
+        self.server.reset(parties=3)
+        self.run_job(concurrency=3)
+        self.assertEqual(self.server.max_active, 3)
+
+    def test_bound_concurrency(self):
+        self.server.reset(parties=3)
+        self.run_job(concurrency=2)
+        self.assertLessEqual(self.server.max_active, 2)
+
+    def test_label_only_given_examples(self):
+        examples = self.project.item.examples.filter(id=self.examples[0].id)
+        self.run_job(examples)
+        self.assertEqual(list(Category.objects.values_list("example", flat=True)), [self.examples[0].id])
+
+    def test_skip_labels_of_annotated_examples(self):
+        mommy.make("Category", example=self.examples[0], label=self.neg, user=self.user)
+        self.run_job()
+        self.assertEqual(Category.objects.filter(example=self.examples[0]).count(), 1)
+
+    def test_report_failed_examples(self):
+        self.examples[0].text = "error"
+        self.examples[0].save()
+        errors = self.run_job()
+        self.assertEqual([error["example"] for error in errors], [self.examples[0].id])
+        self.assertEqual(Category.objects.count(), len(self.examples) - 1)
+
+    def test_number_of_queries_does_not_depend_on_number_of_examples(self):
+        with self.assertNumQueries(11):
+            # configs, label types, example ids, examples, categories, insertion, and the summary refresh
+            self.run_job(chunk_size=len(self.examples))
+
+    def test_report_progress_per_chunk(self):
+        configs = self.project.item.auto_labeling_config.all()
+        job = BatchLabeling(self.project.item, self.user, configs, chunk_size=4)
+        on_progress = MagicMock()
+        job.run(self.project.item.examples.all(), on_progress=on_progress)
+        self.assertEqual([call.args for call in on_progress.call_args_list], [(4, 6), (6, 6)])
+
+    def test_celery_task(self):
+        result = auto_label_examples.apply(
+            kwargs={"user_id": self.user.id, "project_id": self.project.item.id, "example_ids": [self.examples[1].id]}
+        )
+        self.assertEqual(result.get(), {"error": []})
+        self.assertEqual(Category.objects.get().label, self.pos)
+
+
+class TestBatchSpanLabeling(TestCase):
+    @patch("auto_labeling.pipeline.batch.compile_pipeline")
+    def test_drop_overlapping_spans_of_configs(self, compile_pipeline):
+        project = prepare_project(task=ProjectType.SEQUENCE_LABELING)
+        mommy.make("SpanType", project=project.item, text="LOC")
+        example = make_doc(project.item)
+        mommy.make("AutoLabelingConfig", project=project.item, task_type="Span", _quantity=2)
+        compile_pipeline.side_effect = [
+            lambda data: Spans([{"label": "LOC", "start_offset": 0, "end_offset": 5}]),
+            lambda data: Spans([{"label": "LOC", "start_offset": 4, "end_offset": 10}]),
+        ]
+        configs = project.item.auto_labeling_config.order_by("id")
+        BatchLabeling(project.item, project.admin, configs).run(project.item.examples.all())
+        self.assertEqual(list(Span.objects.filter(example=example).values_list("start_offset", flat=True)), [0])
+
+
+class TestRateLimiter(SimpleTestCase):
+    def test_space_out_calls(self):
+        now = [0.0]
+        sleeps = []
+        limiter = RateLimiter(rate=2, clock=lambda: now[0], sleep=sleeps.append)
+        for _ in range(3):
+            limiter.wait()
+        self.assertEqual(sleeps, [0.5, 1.0])
+
+    def test_no_limit(self):
+        sleep = MagicMock()
+        limiter = RateLimiter(rate=0, sleep=sleep)
+        limiter.wait()
+        sleep.assert_not_called()
+
+
+class TestAutomatedLabelingJob(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.url = reverse(viewname="auto_labeling_job", args=[self.project.item.id])
+        self.data = {"example_ids": [1, 2]}
+
+    @patch("auto_labeling.views.auto_label_examples")
+    def test_start_job(self, task):
+        task.delay.return_value.task_id = "task"
+        response = self.assert_create(self.project.admin, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {"task_id": "task"})
+        task.delay.assert_called_once_with(
+            user_id=self.project.admin.id, project_id=self.project.item.id, example_ids=[1, 2]
+        )
+
+    @patch("auto_labeling.views.auto_label_examples")
+    def test_reject_invalid_example_ids(self, task):
+        self.data = {"example_ids": "1"}
+        self.assert_create(self.project.admin, status.HTTP_400_BAD_REQUEST)
+        task.delay.assert_not_called()
+
+    @patch("auto_labeling.views.auto_label_examples")
+    def test_deny_non_admin(self, task):
+        for member in self.project.staffs:
+            self.assert_create(member, status.HTTP_403_FORBIDDEN)
+        task.delay.assert_not_called()
+
+    def test_deny_non_member(self):
+        self.assert_create(expected=status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,163 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from auto_labeling_pipeline.labels import ClassificationLabels
+from django.test import SimpleTestCase, TestCase
+from model_mommy import mommy
+
+from auto_labeling.pipeline.coalescing import RequestCoalescer
+from auto_labeling.pipeline.execution import (
+    CompiledMappingTemplate,
+    _pipelines,
+    _predictions,
+    compile_pipeline,
+)
+from auto_labeling.pipeline.labels import Categories
+from auto_labeling.pipeline.lru import LRUCache
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestCompilePipeline(TestCase):
+    def setUp(self):
+        _pipelines.clear()
+        _predictions.clear()
+        project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.config = mommy.make(
+            "AutoLabelingConfig",
+            project=project.item,
+            task_type="Category",
+            model_name="Custom REST Request",
+            model_attrs={"url": "http://localhost", "method": "POST", "params": {}, "headers": {}, "body": {}},
+            template="{{ input | tojson }}",
+        )
+
+    def test_reuse_pipeline_of_same_config(self):
+        self.assertIs(compile_pipeline(self.config), compile_pipeline(self.config))
+
+    def test_rebuild_pipeline_of_updated_config(self):
+        execute = compile_pipeline(self.config)
+        self.config.template = "[]"
+        self.config.save()
+        self.assertIsNot(compile_pipeline(self.config), execute)
+
+    def test_send_each_request_with_own_model(self):
+        self.config.model_attrs["body"] = {"text": "{{ text }}"}
+        self.config.save()
+        execute = compile_pipeline(self.config)
+        with patch("auto_labeling_pipeline.models.requests.request") as request:
+            request.return_value.json.return_value = [{"label": "POS"}]
+            execute("foo")
+            labels = execute("bar")
+        self.assertEqual([call.kwargs["json"] for call in request.call_args_list], [{"text": "foo"}, {"text": "bar"}])
+        self.assertIsInstance(labels, Categories)
+
+    @patch("auto_labeling_pipeline.models.requests.request")
+    def test_reuse_prediction_of_same_data(self, request):
+        request.return_value.json.return_value = [{"label": "POS"}]
+        execute = compile_pipeline(self.config)
+        first = execute("foo")
+        first.labels[0]["label"] = "modified"
+        second = execute("foo")
+        execute("bar")
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(second.labels, [{"label": "POS"}])
+
+    @patch("auto_labeling_pipeline.models.requests.request")
+    def test_predict_again_after_config_update(self, request):
+        request.return_value.json.return_value = [{"label": "POS"}]
+        compile_pipeline(self.config)("foo")
+        self.config.save()
+        compile_pipeline(self.config)("foo")
+        self.assertEqual(request.call_count, 2)
+
+    @patch("auto_labeling_pipeline.models.requests.request")
+    def test_do_not_cache_failures(self, request):
+        request.side_effect = [ConnectionError, request.return_value]
+        request.return_value.json.return_value = [{"label": "POS"}]
+        execute = compile_pipeline(self.config)
+        with self.assertRaises(ConnectionError):
+            execute("foo")
+        self.assertEqual(execute("foo").labels, [{"label": "POS"}])
+
+    @patch("auto_labeling_pipeline.models.requests.request")
+    def test_coalesce_concurrent_requests(self, request):
+        started = threading.Event()
+        release = threading.Event()
+
+        def send(**kwargs):
+            started.set()
+            release.wait(timeout=5)
+            return request.return_value
+
+        request.side_effect = send
+        request.return_value.json.return_value = [{"label": "POS"}]
+        execute = compile_pipeline(self.config)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            first = executor.submit(execute, "foo")
+            started.wait(timeout=5)
+            others = [executor.submit(execute, "foo") for _ in range(2)]
+            release.set()
+            results = [future.result() for future in [first, *others]]
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual([labels.labels for labels in results], [[{"label": "POS"}]] * 3)
+
+
+class TestCompiledMappingTemplate(SimpleTestCase):
+    def test_render(self):
+        template = '[{% for x in input %}{"label": "{{ x }}"}{% endfor %}]'
+        template = CompiledMappingTemplate(ClassificationLabels, template)
+        labels = template.render(["POS"])
+        self.assertEqual(labels.dict(), [{"label": "POS"}])
+
+
+class TestLRUCache(SimpleTestCase):
+    def test_evict_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_expire_entries(self):
+        now = [0.0]
+        cache = LRUCache(ttl=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        now[0] = 9.9
+        self.assertEqual(cache.get("a"), 1)
+        now[0] = 10
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+class TestRequestCoalescer(SimpleTestCase):
+    def test_share_exception_with_waiting_calls(self):
+        coalescer = RequestCoalescer()
+        entered = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            entered.set()
+            release.wait(timeout=5)
+            raise ValueError
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(coalescer.call, "key", fail)
+            entered.wait(timeout=5)
+            second = executor.submit(coalescer.call, "key", lambda: "unused")
+            time.sleep(0.1)  # lets the second call wait for the first one
+            release.set()
+            for future in (first, second):
+                with self.assertRaises(ValueError):
+                    future.result()
+        self.assertEqual(coalescer.calls, {})
+
+    def test_call_again_after_completion(self):
+        coalescer = RequestCoalescer()
+        self.assertEqual(coalescer.call("key", lambda: 1), 1)
+        self.assertEqual(coalescer.call("key", lambda: 2), 2)
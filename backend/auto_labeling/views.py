@@ -6,7 +6,6 @@ from auto_labeling_pipeline.mappings import MappingTemplate
 from auto_labeling_pipeline.menu import Options
 from auto_labeling_pipeline.models import RequestModelFactory
 from auto_labeling_pipeline.postprocessing import PostProcessor
-from django.shortcuts import get_object_or_404
 from django_drf_filepond.models import TemporaryUpload
 from rest_framework import generics, status
 from rest_framework.exceptions import ValidationError
@@ -15,6 +14,7 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .celery_tasks import auto_label_examples
 from .exceptions import (
     AWSTokenError,
     ResponseJSONDecodeError,
@@ -25,8 +25,8 @@ from .exceptions import (
 from .models import AutoLabelingConfig
 from .pipeline.execution import execute_pipeline, get_label_collection
 from .serializers import AutoLabelingConfigSerializer
-from projects.models import Project
 from projects.permissions import IsProjectAdmin, IsProjectMember
+from projects.resolvers import get_project
 
 
 class TemplateListAPI(APIView):
@@ -71,7 +71,7 @@ class RestAPIRequestTesting(APIView):
 
     @property
     def project(self):
-        return get_object_or_404(Project, pk=self.kwargs["project_id"])
+        return get_project(self.request, self.kwargs["project_id"])
 
     def create_model(self):
         model_name = self.request.data["model_name"]
@@ -152,11 +152,33 @@ class AutomatedLabeling(generics.CreateAPIView):
     swagger_schema = None
 
     def create(self, request, *args, **kwargs):
-        project = get_object_or_404(Project, pk=self.kwargs["project_id"])
+        project = get_project(self.request, self.kwargs["project_id"])
         example = project.examples.get(pk=self.request.query_params["example"])
         configs = AutoLabelingConfig.objects.filter(project=project)
-        # Todo: make async calls or celery tasks to reduce waiting time.
         for config in configs:
             labels = execute_pipeline(example.data, config=config)
             labels.save(project, example, self.request.user)
         return Response({"ok": True}, status=status.HTTP_201_CREATED)
+
+
+class AutomatedLabelingJob(APIView):
+    """Auto-label the examples of a project in a Celery task.
+
+    The body may give `example_ids` to label only these examples. Only the
+    project admins may start a job, as it calls the configured models on
+    every example regardless of the assignments.
+    """
+
+    permission_classes = [IsAuthenticated & IsProjectAdmin]
+    swagger_schema = None
+
+    def post(self, request, *args, **kwargs):
+        example_ids = request.data.get("example_ids")
+        if example_ids is not None and not (
+            isinstance(example_ids, list) and all(isinstance(example_id, int) for example_id in example_ids)
+        ):
+            raise ValidationError({"example_ids": "A list of example ids is expected."})
+        celery_task = auto_label_examples.delay(
+            user_id=request.user.id, project_id=self.kwargs["project_id"], example_ids=example_ids
+        )
+        return Response({"task_id": celery_task.task_id}, status=status.HTTP_202_ACCEPTED)
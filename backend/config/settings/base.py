@@ -10,7 +10,7 @@ https://docs.djangoproject.com/en/2.0/ref/settings/
 Any setting that is configured via an environment variable may
 also be set in a `.env` file in the project base directory.
 """
-from os import path
+from os import cpu_count, path
 
 import dj_database_url
 from environs import Env, EnvError
@@ -224,6 +224,19 @@ if DATABASES["default"].get("ENGINE") == "sql_server.pyodbc":
     DATABASES["default"].setdefault("OPTIONS", {}).setdefault("driver", "ODBC Driver 17 for SQL Server")
 
 
+# Caches
+# The default cache is local to each process. Set $REDIS_URL to share it between processes.
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+if env("REDIS_URL", None):
+    CACHES["default"] = {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": env("REDIS_URL")}
+
+# How long the role of a member is cached, in seconds (0 disables the cache). With a per-process cache,
+# a role change made in another process is visible after this delay, so it is disabled by default.
+ROLE_CACHE_TIMEOUT = env.int("ROLE_CACHE_TIMEOUT", 60 if env("REDIS_URL", None) else 0)
+
+# How long the label types of a project are cached, in seconds.
+LABEL_TYPE_CACHE_TIMEOUT = env.int("LABEL_TYPE_CACHE_TIMEOUT", 60)
+
 # Sessions and CSRF
 # Honor the 'X-Forwarded-Proto' header for request.is_secure()
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -247,8 +260,24 @@ if DEBUG:
     CSRF_TRUSTED_ORIGINS = ["http://127.0.0.1:3000", "http://0.0.0.0:3000", "http://localhost:3000", "http://10.0.2.15:3000"]
     CSRF_TRUSTED_ORIGINS += env.list("CSRF_TRUSTED_ORIGINS", [])
 
-# Batch size for importing data
+# Batch size for importing data: the size of the first batch, and the bounds it is adapted within
+# so that a batch is saved in about IMPORT_BATCH_SECONDS and holds at most IMPORT_BATCH_MEMORY megabytes
 IMPORT_BATCH_SIZE = env.int("IMPORT_BATCH_SIZE", 1000)
+IMPORT_MIN_BATCH_SIZE = env.int("IMPORT_MIN_BATCH_SIZE", 100)
+IMPORT_MAX_BATCH_SIZE = env.int("IMPORT_MAX_BATCH_SIZE", 10000)
+IMPORT_BATCH_SECONDS = env.float("IMPORT_BATCH_SECONDS", 1.0)
+IMPORT_BATCH_MEMORY = env.int("IMPORT_BATCH_MEMORY", 64)
+
+# The number of processes parsing the uploaded files at the same time (1 parses them in the importing process)
+IMPORT_WORKERS = env.int("IMPORT_WORKERS", min(cpu_count() or 1, 4))
+
+# Auto labeling jobs: the number of requests sent at the same time, and per second (0 for no limit)
+AUTO_LABELING_CONCURRENCY = env.int("AUTO_LABELING_CONCURRENCY", 4)
+AUTO_LABELING_RATE_LIMIT = env.float("AUTO_LABELING_RATE_LIMIT", 0)
+
+# The number of model predictions kept per process, and for how many seconds
+AUTO_LABELING_CACHE_SIZE = env.int("AUTO_LABELING_CACHE_SIZE", 1024)
+AUTO_LABELING_CACHE_TIMEOUT = env.int("AUTO_LABELING_CACHE_TIMEOUT", 3600)
 
 # Necessary for email verification of new accounts
 EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", False)
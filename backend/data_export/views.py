@@ -1,6 +1,5 @@
 from celery.result import AsyncResult
 from django.http import FileResponse
-from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -8,8 +7,8 @@ from rest_framework.views import APIView
 
 from .celery_tasks import export_dataset
 from .pipeline.catalog import Options
-from projects.models import Project
 from projects.permissions import IsProjectAdmin
+from projects.resolvers import get_project
 
 
 class DatasetCatalog(APIView):
@@ -17,7 +16,7 @@ class DatasetCatalog(APIView):
 
     def get(self, request, *args, **kwargs):
         project_id = kwargs["project_id"]
-        project = get_object_or_404(Project, pk=project_id)
+        project = get_project(request, project_id)
         use_relation = getattr(project, "use_relation", False)
         options = Options.filter_by_task(project.project_type, use_relation)
         return Response(data=options, status=status.HTTP_200_OK)
@@ -1,3 +1,4 @@
+from functools import partial
 from typing import List
 
 import filetype
@@ -9,13 +10,17 @@ from django_drf_filepond.api import store_upload
 from django_drf_filepond.models import TemporaryUpload
 
 from .datasets import load_dataset
+from .models import ImportCheckpoint
+from .pipeline.batching import BatchSizeController
 from .pipeline.catalog import Format, create_file_format
 from .pipeline.exceptions import (
     FileImportException,
     FileTypeException,
     MaximumFileSizeException,
 )
+from .pipeline.progress import ImportProgress
 from .pipeline.readers import FileName
+from api.progress import report_progress
 from projects.models import Project
 
 
@@ -46,8 +51,12 @@ def check_uploaded_files(upload_ids: List[str], file_format: Format):
     return cleaned_ids, errors
 
 
-@shared_task(autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True)
-def import_dataset(user_id, project_id, file_format: str, upload_ids: List[str], task: str, **kwargs):
+def report_import_progress(task, progress: ImportProgress):
+    report_progress(task, progress.rows, progress.total, **progress.dict())
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_jitter=True)
+def import_dataset(self, user_id, project_id, file_format: str, upload_ids: List[str], task: str, **kwargs):
     project = get_object_or_404(Project, pk=project_id)
     user = get_object_or_404(get_user_model(), pk=user_id)
     try:
@@ -55,13 +64,27 @@ def import_dataset(user_id, project_id, file_format: str, upload_ids: List[str],
         upload_ids, errors = check_uploaded_files(upload_ids, fmt)
         temporary_uploads = TemporaryUpload.objects.filter(upload_id__in=upload_ids)
         filenames = [
-            FileName(full_path=tu.get_file_path(), generated_name=tu.file.name, upload_name=tu.upload_name)
+            FileName(
+                full_path=tu.get_file_path(),
+                generated_name=tu.file.name,
+                upload_name=tu.upload_name,
+                upload_id=tu.upload_id,
+            )
             for tu in temporary_uploads
         ]
 
+        # A retry resumes from the checkpoints of the batches saved before the failure.
         dataset = load_dataset(task, fmt, filenames, project, **kwargs)
-        dataset.save(user, batch_size=settings.IMPORT_BATCH_SIZE)
+        batch_size = BatchSizeController(
+            settings.IMPORT_BATCH_SIZE,
+            min_size=settings.IMPORT_MIN_BATCH_SIZE,
+            max_size=settings.IMPORT_MAX_BATCH_SIZE,
+            target_seconds=settings.IMPORT_BATCH_SECONDS,
+            max_bytes=settings.IMPORT_BATCH_MEMORY * 1024 * 1024,
+        )
+        dataset.save(user, batch_size=batch_size, on_progress=partial(report_import_progress, self))
         upload_to_store(temporary_uploads)
+        ImportCheckpoint.objects.filter(upload_id__in=upload_ids).delete()
         errors.extend(dataset.errors)
         return {"error": [e.dict() for e in errors]}
     except FileImportException as e:
@@ -1,9 +1,12 @@
 import abc
-from typing import List, Type
+from typing import Callable, List, Optional, Type, Union
 
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
 
-from .models import DummyLabelType
+from .models import DummyLabelType, ImportCheckpoint
+from .pipeline.batching import BatchSizeController
 from .pipeline.catalog import RELATION_EXTRACTION, Format
 from .pipeline.data import BaseData, BinaryData, TextData
 from .pipeline.examples import Examples
@@ -13,23 +16,53 @@ from .pipeline.label import CategoryLabel, Label, RelationLabel, SpanLabel, Text
 from .pipeline.label_types import LabelTypes
 from .pipeline.labels import Categories, Labels, Relations, Spans, Texts
 from .pipeline.makers import BinaryExampleMaker, ExampleMaker, LabelMaker
+from .pipeline.progress import ImportProgress
 from .pipeline.readers import (
     DEFAULT_LABEL_COLUMN,
     DEFAULT_TEXT_COLUMN,
     FileName,
+    ParallelReader,
     Reader,
+    Record,
 )
 from label_types.models import CategoryType, LabelType, RelationType, SpanType
 from projects.models import Project, ProjectType
 
 
+OnProgress = Optional[Callable[[ImportProgress], None]]
+BatchSize = Union[int, BatchSizeController]
+
+
 class Dataset(abc.ABC):
     def __init__(self, reader: Reader, project: Project, **kwargs):
         self.reader = reader
         self.project = project
         self.kwargs = kwargs
+        self.progress = ImportProgress()
+
+    def save(self, user: User, batch_size: BatchSize = 1000, on_progress: OnProgress = None):
+        """Save the records in batches.
 
-    def save(self, user: User, batch_size: int = 1000):
+        Each batch is saved in a transaction with the checkpoints of its files,
+        so that a retried import resumes after the last saved batch.
+
+        Args:
+            user: the user the labels are created for.
+            batch_size: the number of records per batch, or a controller that adapts it.
+            on_progress: called with the progress after each batch.
+        """
+        self.progress = ImportProgress(total=self.reader.count())
+        for records in self.reader.batch(batch_size):
+            with transaction.atomic():
+                self.save_batch(user, records)
+                ImportCheckpoint.objects.save_progress(self.reader.checkpoints)
+            self.progress.rows += len(records)
+            self.progress.errors = len(self.errors)
+            if on_progress:
+                on_progress(self.progress)
+
+    def save_batch(self, user: User, records: List[Record]):
+        """Save the examples and labels of a batch of records, and count them in `progress`."""
         raise NotImplementedError()
 
     @property
@@ -42,10 +75,10 @@ class PlainDataset(Dataset):
         super().__init__(reader, project, **kwargs)
         self.example_maker = ExampleMaker(project=project, data_class=TextData)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: List[Record]):
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
+        self.progress.examples += len(examples)
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -71,19 +104,19 @@ class DatasetWithSingleLabelType(Dataset):
             column=kwargs.get("column_label") or DEFAULT_LABEL_COLUMN, label_class=self.label_class
         )
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            # create examples
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: List[Record]):
+        # create examples
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
+        self.progress.examples += len(examples)
 
-            # create label types
-            labels = self.labels_class(self.label_maker.make(records), self.types)
-            labels.clean(self.project)
-            labels.save_types(self.project)
+        # create label types
+        labels = self.labels_class(self.label_maker.make(records), self.types)
+        labels.clean(self.project)
+        labels.save_types(self.project)
 
-            # create Labels
-            labels.save(user, examples)
+        # create Labels
+        self.progress.labels += labels.save(user, examples)
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -95,10 +128,10 @@ class BinaryDataset(Dataset):
         super().__init__(reader, project, **kwargs)
         self.example_maker = BinaryExampleMaker(project=project, data_class=BinaryData)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: List[Record]):
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
+        self.progress.examples += len(examples)
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -140,24 +173,24 @@ class RelationExtractionDataset(Dataset):
         self.span_maker = LabelMaker(column="entities", label_class=SpanLabel)
         self.relation_maker = LabelMaker(column="relations", label_class=RelationLabel)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            # create examples
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: List[Record]):
+        # create examples
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
+        self.progress.examples += len(examples)
 
-            # create label types
-            spans = Spans(self.span_maker.make(records), self.span_types)
-            spans.clean(self.project)
-            spans.save_types(self.project)
+        # create label types
+        spans = Spans(self.span_maker.make(records), self.span_types)
+        spans.clean(self.project)
+        spans.save_types(self.project)
 
-            relations = Relations(self.relation_maker.make(records), self.relation_types)
-            relations.clean(self.project)
-            relations.save_types(self.project)
+        relations = Relations(self.relation_maker.make(records), self.relation_types)
+        relations.clean(self.project)
+        relations.save_types(self.project)
 
-            # create Labels
-            spans.save(user, examples)
-            relations.save(user, examples, spans=spans)
+        # create Labels
+        self.progress.labels += spans.save(user, examples)
+        self.progress.labels += relations.save(user, examples, spans=spans)
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -178,24 +211,24 @@ class CategoryAndSpanDataset(Dataset):
         self.category_maker = LabelMaker(column="cats", label_class=CategoryLabel)
         self.span_maker = LabelMaker(column="entities", label_class=SpanLabel)
 
-    def save(self, user: User, batch_size: int = 1000):
-        for records in self.reader.batch(batch_size):
-            # create examples
-            examples = Examples(self.example_maker.make(records))
-            examples.save()
+    def save_batch(self, user: User, records: List[Record]):
+        # create examples
+        examples = Examples(self.example_maker.make(records))
+        examples.save()
+        self.progress.examples += len(examples)
 
-            # create label types
-            categories = Categories(self.category_maker.make(records), self.category_types)
-            categories.clean(self.project)
-            categories.save_types(self.project)
+        # create label types
+        categories = Categories(self.category_maker.make(records), self.category_types)
+        categories.clean(self.project)
+        categories.save_types(self.project)
 
-            spans = Spans(self.span_maker.make(records), self.span_types)
-            spans.clean(self.project)
-            spans.save_types(self.project)
+        spans = Spans(self.span_maker.make(records), self.span_types)
+        spans.clean(self.project)
+        spans.save_types(self.project)
 
-            # create Labels
-            categories.save(user, examples)
-            spans.save(user, examples)
+        # create Labels
+        self.progress.labels += categories.save(user, examples)
+        self.progress.labels += spans.save(user, examples)
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -224,6 +257,10 @@ def select_dataset(project: Project, task: str, file_format: Format) -> Type[Dat
 
 def load_dataset(task: str, file_format: Format, data_files: List[FileName], project: Project, **kwargs) -> Dataset:
     parser = create_parser(file_format, **kwargs)
-    reader = Reader(data_files, parser)
+    checkpoints = ImportCheckpoint.objects.load(data_file.upload_id for data_file in data_files)
+    if settings.IMPORT_WORKERS > 1 and len(data_files) > 1:
+        reader = ParallelReader(data_files, parser, max_workers=settings.IMPORT_WORKERS, checkpoints=checkpoints)
+    else:
+        reader = Reader(data_files, parser, checkpoints)
     dataset_class = select_dataset(project, task, file_format)
     return dataset_class(reader, project, **kwargs)
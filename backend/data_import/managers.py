@@ -0,0 +1,18 @@
+from typing import Dict, Iterable
+
+from django.db.models import Manager
+
+
+class ImportCheckpointManager(Manager):
+    def load(self, upload_ids: Iterable[str]) -> Dict[str, int]:
+        """Return the number of saved records per upload id."""
+        return dict(self.filter(upload_id__in=list(upload_ids)).values_list("upload_id", "records"))
+
+    def save_progress(self, checkpoints: Dict[str, int]):
+        """Record the number of saved records per upload id."""
+        self.bulk_create(
+            [self.model(upload_id=upload_id, records=records) for upload_id, records in checkpoints.items()],
+            update_conflicts=True,
+            unique_fields=["upload_id"],
+            update_fields=["records", "updated_at"],
+        )
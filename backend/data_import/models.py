@@ -1,5 +1,8 @@
 from unittest.mock import MagicMock
 
+from django.db import models
+
+from .managers import ImportCheckpointManager
 from label_types.models import CategoryType
 
 
@@ -8,3 +11,20 @@ class DummyLabelType(CategoryType):
 
     class Meta:
         proxy = True
+
+
+class ImportCheckpoint(models.Model):
+    """The number of records of an uploaded file that are saved.
+
+    It is updated in the transaction of each batch, so that a retried import
+    skips the records saved before it failed. The rows are deleted when the
+    import finishes.
+    """
+
+    objects = ImportCheckpointManager()
+    upload_id = models.CharField(max_length=22, unique=True)
+    records = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.upload_id}: {self.records}"
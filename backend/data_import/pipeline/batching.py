@@ -0,0 +1,66 @@
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+Record = Dict[Any, Any]
+
+
+def record_size(record: Record) -> int:
+    """Returns the approximate number of bytes a record holds, without following nested containers."""
+    return sys.getsizeof(record) + sum(sys.getsizeof(value) for value in record.values())
+
+
+class BatchSizeController:
+    """Adapt the number of records per batch to the time and the memory the previous batch took.
+
+    The next batch is sized so that it is saved in about `target_seconds` and
+    holds at most `max_bytes` of records, at the rates measured on the previous
+    batch. It grows at most twice per batch, so that a fast batch of short rows
+    is not followed by a huge one, but shrinks at once when the rows get wider
+    or the database slower.
+
+    Args:
+        initial_size: the size of the first batch.
+        min_size: the smallest batch size.
+        max_size: the largest batch size. Setting both bounds to the same value fixes the size.
+        target_seconds: the time to save a batch in.
+        max_bytes: the approximate memory the records of a batch may hold.
+        clock: the clock the batches are timed with.
+
+    Examples:
+        >>> controller = BatchSizeController(1000, min_size=100, max_size=10000)
+        >>> controller.update(records, seconds=0.25)
+        >>> controller.size
+        2000
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        min_size: int = 1,
+        max_size: int = 10000,
+        target_seconds: float = 1.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_size = max(min_size, 1)
+        self.max_size = max(max_size, self.min_size)
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.size = self.clamp(initial_size)
+
+    def clamp(self, size: float) -> int:
+        return int(min(max(size, self.min_size), self.max_size))
+
+    def update(self, records: List[Record], seconds: float):
+        """Size the next batch from the records of the previous one and the seconds they took to save."""
+        if not records:
+            return
+        limits = [2 * self.size]
+        if seconds > 0:
+            limits.append(self.target_seconds * len(records) / seconds)
+        size = sum(record_size(record) for record in records)
+        if size > 0:
+            limits.append(self.max_bytes * len(records) / size)
+        self.size = self.clamp(min(limits))
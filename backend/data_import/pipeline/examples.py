@@ -16,6 +16,9 @@ class Examples:
     def __contains__(self, uuid: UUID4) -> bool:
         return uuid in self.uuid_to_example
 
+    def __len__(self) -> int:
+        return len(self.examples)
+
     def save(self):
         examples = Example.objects.bulk_create(self.examples)
         self.uuid_to_example = {example.uuid: example for example in examples}
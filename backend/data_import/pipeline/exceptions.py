@@ -8,6 +8,7 @@ class FileImportException(Exception):
 
 class FileParseException(FileImportException):
     def __init__(self, filename: str, line_num: int, message: str):
+        super().__init__(filename, line_num, message)  # Makes the exception picklable.
         self.filename = filename
         self.line_num = line_num
         self.message = message
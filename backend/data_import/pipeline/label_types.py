@@ -1,5 +1,6 @@
 from typing import Dict, List, Type
 
+from label_types.caches import forget_label_types
 from label_types.models import LabelType
 from projects.models import Project
 
@@ -17,6 +18,9 @@ class LabelTypes:
 
     def save(self, label_types: List[LabelType]):
         self.label_type_class.objects.bulk_create(label_types, ignore_conflicts=True)
+        # bulk_create sends no signals, so the cached label types are dropped here.
+        for project_id in {label_type.project_id for label_type in label_types}:
+            forget_label_types(self.label_type_class, project_id)
 
     def update(self, project: Project):
         types = self.label_type_class.objects.filter(project=project)
@@ -5,11 +5,13 @@ from typing import Dict, List, Tuple
 from .examples import Examples
 from .label import Label
 from .label_types import LabelTypes
+from labels.intervals import IntervalSet
 from labels.models import Category as CategoryModel
 from labels.models import Label as LabelModel
 from labels.models import Relation as RelationModel
 from labels.models import Span as SpanModel
 from labels.models import TextLabel as TextLabelModel
+from metrics.summaries import summarize_labels
 from projects.models import Project
 
 
@@ -32,13 +34,16 @@ class Labels(abc.ABC):
         self.types.save(filtered_types)
         self.types.update(project)
 
-    def save(self, user, examples: Examples, **kwargs):
+    def save(self, user, examples: Examples, **kwargs) -> int:
+        """Save the labels of the saved examples, and return their number."""
         labels = [
             label.create(user, examples[label.example_uuid], self.types, **kwargs)
             for label in self.labels
             if label.example_uuid in examples
         ]
         self.label_model.objects.bulk_create(labels)
+        summarize_labels(self.label_model, [label.example_id for label in labels])
+        return len(labels)
 
 
 class Categories(Labels):
@@ -61,11 +66,9 @@ class Spans(Labels):
         spans = []
         groups = groupby(self.labels, lambda label: label.example_uuid)
         for _, group in groups:
-            labels = sorted(group)
-            last_offset = -1
-            for label in labels:
-                if getattr(label, "start_offset") >= last_offset:
-                    last_offset = getattr(label, "end_offset")
+            intervals = IntervalSet()
+            for label in sorted(group):
+                if intervals.add(getattr(label, "start_offset"), getattr(label, "end_offset")):
                     spans.append(label)
         self.labels = spans
 
@@ -84,6 +87,6 @@ class Texts(Labels):
 class Relations(Labels):
     label_model = RelationModel
 
-    def save(self, user, examples: Examples, **kwargs):
+    def save(self, user, examples: Examples, **kwargs) -> int:
         id_to_span = kwargs["spans"].id_to_span
-        super().save(user, examples, id_to_span=id_to_span)
+        return super().save(user, examples, id_to_span=id_to_span)
@@ -1,6 +1,5 @@
-from typing import List, Optional, Type
-
-import pandas as pd
+import math
+from typing import Any, List, Optional, Type
 
 from .data import BaseData
 from .exceptions import FileParseException
@@ -10,11 +9,22 @@ from .readers import (
     LINE_NUMBER_COLUMN,
     UPLOAD_NAME_COLUMN,
     UUID_COLUMN,
+    Record,
 )
 from examples.models import Example
 from projects.models import Project
 
 
+def is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def column_not_found_in_files(records: List[Record], column: str) -> List[FileParseException]:
+    message = f"Column {column} not found in the file"
+    upload_names = dict.fromkeys(record.get(UPLOAD_NAME_COLUMN) for record in records)
+    return [FileParseException(upload_name, 0, message) for upload_name in upload_names]
+
+
 class ExampleMaker:
     def __init__(
         self,
@@ -26,19 +36,23 @@ class ExampleMaker:
         self.project = project
         self.data_class = data_class
         self.column_data = column_data
-        self.exclude_columns = exclude_columns or []
+        self.exclude_columns = set(exclude_columns or [])
         self._errors: List[FileParseException] = []
 
-    def make(self, df: pd.DataFrame) -> List[Example]:
-        if not self.check_column_existence(df):
-            return []
-        self.check_value_existence(df)
-        # make dataframe without exclude columns and missing data
-        df_with_data_column = df.loc[:, ~df.columns.isin(self.exclude_columns)]
-        df_with_data_column = df_with_data_column.dropna(subset=[self.column_data])
+    def make(self, records: List[Record]) -> List[Example]:
+        """Make the examples of the records in a single pass.
 
+        The records are left unchanged, so that the labels can be made from them afterwards.
+        """
+        has_column = False
+        missing: List[Record] = []
         examples = []
-        for row in df_with_data_column.to_dict(orient="records"):
+        for record in records:
+            has_column = has_column or self.column_data in record
+            if is_missing(record.get(self.column_data)):
+                missing.append(record)
+                continue
+            row = {key: value for key, value in record.items() if key not in self.exclude_columns}
             line_num = row.pop(LINE_NUMBER_COLUMN, 0)
             row[DEFAULT_TEXT_COLUMN] = row.pop(self.column_data)  # Rename column for parsing
             try:
@@ -49,22 +63,14 @@ class ExampleMaker:
                 message = f"Invalid data in line {line_num}"
                 error = FileParseException(row[UPLOAD_NAME_COLUMN], line_num, message)
                 self._errors.append(error)
-        return examples
-
-    def check_column_existence(self, df: pd.DataFrame) -> bool:
-        message = f"Column {self.column_data} not found in the file"
-        if self.column_data not in df.columns:
-            for filename in df[UPLOAD_NAME_COLUMN].unique():
-                self._errors.append(FileParseException(filename, 0, message))
-            return False
-        return True
-
-    def check_value_existence(self, df: pd.DataFrame):
-        df_without_data_column = df[df[self.column_data].isnull()]
-        for row in df_without_data_column.to_dict(orient="records"):
+        if not has_column:
+            self._errors.extend(column_not_found_in_files(records, self.column_data))
+            return []
+        for record in missing:
             message = f"Column {self.column_data} not found in record"
-            error = FileParseException(row[UPLOAD_NAME_COLUMN], row.get(LINE_NUMBER_COLUMN, 0), message)
+            error = FileParseException(record[UPLOAD_NAME_COLUMN], record.get(LINE_NUMBER_COLUMN, 0), message)
             self._errors.append(error)
+        return examples
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -73,10 +79,10 @@ class ExampleMaker:
 
 
 class BinaryExampleMaker(ExampleMaker):
-    def make(self, df: pd.DataFrame) -> List[Example]:
+    def make(self, records: List[Record]) -> List[Example]:
         examples = []
-        for row in df.to_dict(orient="records"):
-            data = self.data_class.parse(**row)
+        for record in records:
+            data = self.data_class.parse(**record)
             example = data.create(self.project)
             examples.append(example)
         return examples
@@ -88,30 +94,27 @@ class LabelMaker:
         self.label_class = label_class
         self._errors: List[FileParseException] = []
 
-    def make(self, df: pd.DataFrame) -> List[Label]:
-        if not self.check_column_existence(df):
-            return []
-
-        df_label = df.explode(self.column)
-        df_label = df_label[[UUID_COLUMN, self.column]]
-        df_label.dropna(subset=[self.column], inplace=True)
+    def make(self, records: List[Record]) -> List[Label]:
+        """Make the labels of the records, one per item when the column holds a list."""
+        has_column = False
         labels = []
-        for row in df_label.to_dict(orient="records"):
-            try:
-                label = self.label_class.parse(row[UUID_COLUMN], row[self.column])
-                labels.append(label)
-            except ValueError:
-                pass
+        for record in records:
+            if self.column not in record:
+                continue
+            has_column = True
+            values = record[self.column]
+            for value in values if isinstance(values, (list, tuple)) else [values]:
+                if is_missing(value):
+                    continue
+                try:
+                    label = self.label_class.parse(record[UUID_COLUMN], value)
+                    labels.append(label)
+                except ValueError:
+                    pass
+        if not has_column:
+            self._errors.extend(column_not_found_in_files(records, self.column))
         return labels
 
-    def check_column_existence(self, df: pd.DataFrame) -> bool:
-        message = f"Column {self.column} not found in the file"
-        if self.column not in df.columns:
-            for filename in df[UPLOAD_NAME_COLUMN].unique():
-                self._errors.append(FileParseException(filename, 0, message))
-            return False
-        return True
-
     @property
     def errors(self) -> List[FileParseException]:
         self._errors.sort(key=lambda error: error.line_num)
@@ -1,13 +1,13 @@
+import codecs
 import csv
 import io
 import json
-import os
-from typing import Any, Dict, Iterator, List, Tuple
+import re
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
 
 import chardet
 import pyexcel
 import pyexcel.exceptions
-from chardet import UniversalDetector
 from seqeval.scheme import BILOU, IOB2, IOBES, IOE2, Tokens
 
 from .exceptions import FileParseException
@@ -17,11 +17,48 @@ from .readers import (
     LINE_NUMBER_COLUMN,
     Parser,
 )
+from api import json_codec
 
 DEFAULT_ENCODING = "Auto"
 
+# The number of bytes at the beginning of a file the encoding is detected from.
+ENCODING_DETECTION_SIZE = 1 << 16
 
-def detect_encoding(filename: str, buffer_size: int = io.DEFAULT_BUFFER_SIZE) -> str:
+# The UTF-32 BOMs come first, because the UTF-32 LE BOM starts with the UTF-16 LE one.
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def guess_encoding(prefix: bytes) -> str:
+    """Guesses character encoding from the beginning of a file.
+
+    A BOM and UTF-8, which includes ASCII, are recognized without chardet.
+
+    Args:
+        prefix: the first bytes of the file.
+
+    Returns:
+        The character encoding.
+    """
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        # The prefix may end in the middle of a character, so it is not decoded as final.
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    detected = chardet.detect(prefix)
+    return detected.get("encoding") or "utf-8"
+
+
+def detect_encoding(filename: str, buffer_size: int = ENCODING_DETECTION_SIZE) -> str:
     """Detects character encoding automatically.
 
     If you want to know the supported encodings, please see the following document:
@@ -29,32 +66,13 @@ def detect_encoding(filename: str, buffer_size: int = io.DEFAULT_BUFFER_SIZE) ->
 
     Args:
         filename: the filename for detecting the encoding.
-        buffer_size: the buffer size to read file contents incrementally.
+        buffer_size: the number of bytes read from the beginning of the file.
 
     Returns:
         The character encoding.
     """
-    # For a small file.
-    if os.path.getsize(filename) < buffer_size:
-        detected = chardet.detect(open(filename, "rb").read())
-        return detected.get("encoding", "utf-8")
-
-    # For a large file, call the Universal Encoding Detector incrementally.
-    # It will stop as soon as it is confident enough to report its results.
-    # See: https://chardet.readthedocs.io/en/latest/usage.html
     with open(filename, "rb") as f:
-        detector = UniversalDetector()
-        while True:
-            binary = f.read(buffer_size)
-            detector.feed(binary)
-            if binary == b"":
-                break
-            if detector.done:
-                break
-        if detector.done:
-            return detector.result["encoding"] or "utf-8"
-        else:
-            return "utf-8"
+        return guess_encoding(f.read(buffer_size))
 
 
 def decide_encoding(filename: str, encoding: str) -> str:
@@ -76,9 +94,30 @@ def decide_encoding(filename: str, encoding: str) -> str:
         return encoding
 
 
+def count_lines(filename: str, buffer_size: int = 1 << 20) -> int:
+    """Counts the lines of a file from its bytes, without decoding it.
+
+    The count is exact for the encodings whose newline is the single byte `\\n`, and approximate for the others.
+    """
+    lines = 0
+    last = b"\n"
+    with open(filename, "rb") as f:
+        while True:
+            chunk = f.read(buffer_size)
+            if not chunk:
+                break
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    # The last line may not end with a newline.
+    return lines if last == b"\n" else lines + 1
+
+
 class LineReader:
     """LineReader is a helper class to read a file line by line.
 
+    The encoding is detected from the beginning of the file, and the lines are
+    decoded from the same file object, so the file is opened only once.
+
     Attributes:
         filename: The filename to read.
         encoding: The character encoding.
@@ -89,10 +128,106 @@ class LineReader:
         self.encoding = encoding
 
     def __iter__(self) -> Iterator[str]:
-        encoding = decide_encoding(self.filename, self.encoding)
-        with open(self.filename, encoding=encoding) as f:
-            for line in f:
-                yield line.rstrip()
+        with open(self.filename, "rb") as f:
+            encoding = self.encoding
+            if encoding == DEFAULT_ENCODING:
+                encoding = guess_encoding(f.read(ENCODING_DETECTION_SIZE))
+                f.seek(0)
+            with io.TextIOWrapper(f, encoding=encoding) as text:
+                for line in text:
+                    yield line.rstrip()
+
+
+class JSONArrayDecoder:
+    """JSONArrayDecoder decodes the items of a top-level JSON array one at a time.
+
+    The file is read in chunks, and only the part of the array that is not
+    decoded yet is kept in memory.
+
+    Attributes:
+        f: The file to read.
+        chunk_size: The number of characters read at once.
+
+    Raises:
+        json.JSONDecodeError: If the file is not a JSON array.
+    """
+
+    whitespace = re.compile(r"[ \t\n\r]*")
+    # The longest token that fails to decode when cut, e.g. "-Infinity" or a "\\uXXXX" escape.
+    max_token_length = 10
+
+    def __init__(self, f: TextIO, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.lines = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+        else:
+            while True:
+                yield self.decode()
+                if self.expect(",]") == "]":
+                    break
+        if self.peek():
+            raise json.JSONDecodeError("Extra data", self.buffer, self.pos)
+
+    def line_num(self, error: json.JSONDecodeError) -> int:
+        """Returns the line of the file an error raised while decoding it is at."""
+        return self.lines + error.lineno
+
+    def read(self, size: int) -> bool:
+        """Appends the next characters to the buffer, dropping the decoded ones, and returns whether any were read."""
+        chunk = self.f.read(size)
+        if not chunk:
+            return False
+        self.lines += self.buffer.count("\n", 0, self.pos)
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skips whitespace, and returns the next character or an empty string at the end of the file."""
+        while True:
+            self.pos = self.whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read(self.chunk_size):
+                return ""
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if not character or character not in characters:
+            expected = " or ".join(repr(c) for c in characters)
+            raise json.JSONDecodeError(f"Expecting {expected}", self.buffer, self.pos)
+        self.pos += 1
+        return character
+
+    def is_truncated(self, error: json.JSONDecodeError) -> bool:
+        """Returns whether an error may be due to the end of the buffer, rather than to an invalid item."""
+        return error.msg.startswith("Unterminated string") or error.pos >= len(self.buffer) - self.max_token_length
+
+    def decode(self) -> Any:
+        size = self.chunk_size
+        self.peek()
+        while True:
+            try:
+                item, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # The item may continue in the next chunk. The chunks grow to read long items in linear time.
+                if not self.is_truncated(e) or not self.read(size):
+                    raise
+                size *= 2
+                continue
+            # So may a number ending the buffer.
+            if end == len(self.buffer) and self.read(size):
+                continue
+            self.pos = end
+            return item
 
 
 class PlainParser(Parser):
@@ -104,6 +239,9 @@ class PlainParser(Parser):
     def __init__(self, **kwargs):
         self.kwargs = kwargs
 
+    def count(self, filename: str) -> Optional[int]:
+        return 1
+
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         yield {}
 
@@ -118,6 +256,9 @@ class LineParser(Parser):
     def __init__(self, encoding: str = DEFAULT_ENCODING, **kwargs):
         self.encoding = encoding
 
+    def count(self, filename: str) -> Optional[int]:
+        return count_lines(filename)
+
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         reader = LineReader(filename, self.encoding)
         for line_num, line in enumerate(reader, start=1):
@@ -134,6 +275,9 @@ class TextFileParser(Parser):
     def __init__(self, encoding: str = DEFAULT_ENCODING, **kwargs):
         self.encoding = encoding
 
+    def count(self, filename: str) -> Optional[int]:
+        return 1
+
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         encoding = decide_encoding(filename, self.encoding)
         with open(filename, encoding=encoding) as f:
@@ -152,6 +296,10 @@ class CSVParser(Parser):
         self.encoding = encoding
         self.delimiter = delimiter
 
+    def count(self, filename: str) -> Optional[int]:
+        # The header is not a row. Cells spanning several lines make the count approximate.
+        return max(count_lines(filename) - 1, 0)
+
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         encoding = decide_encoding(filename, self.encoding)
         with open(filename, encoding=encoding) as f:
@@ -163,6 +311,8 @@ class CSVParser(Parser):
 class JSONParser(Parser):
     """JSONParser is a parser to read a json file and return its rows.
 
+    The file must hold an array of rows, which are decoded one at a time.
+
     Attributes:
         encoding: The character encoding.
     """
@@ -174,12 +324,12 @@ class JSONParser(Parser):
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         encoding = decide_encoding(filename, self.encoding)
         with open(filename, encoding=encoding) as f:
+            rows = JSONArrayDecoder(f)
             try:
-                rows = json.load(f)
                 for row in rows:
                     yield row
             except json.decoder.JSONDecodeError as e:
-                error = FileParseException(filename, line_num=1, message=str(e))
+                error = FileParseException(filename, line_num=rows.line_num(e), message=e.msg)
                 self._errors.append(error)
 
     @property
@@ -190,6 +340,8 @@ class JSONParser(Parser):
 class JSONLParser(Parser):
     """JSONLParser is a parser to read a JSONL file and return its rows.
 
+    The lines are decoded with orjson when it is installed.
+
     Attributes:
         encoding: The character encoding.
     """
@@ -198,15 +350,26 @@ class JSONLParser(Parser):
         self.encoding = encoding
         self._errors: List[FileParseException] = []
 
+    def count(self, filename: str) -> Optional[int]:
+        return count_lines(filename)
+
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         reader = LineReader(filename, self.encoding)
+        loads = json_codec.codec.loads
         for line_num, line in enumerate(reader, start=1):
             try:
-                row = json.loads(line)
-                yield {LINE_NUMBER_COLUMN: line_num, **row}
+                row = loads(line)
             except json.decoder.JSONDecodeError as e:
                 error = FileParseException(filename, line_num, str(e))
                 self._errors.append(error)
+                continue
+            if not isinstance(row, dict):
+                error = FileParseException(filename, line_num, "A line must be a JSON object.")
+                self._errors.append(error)
+                continue
+            # The decoded dict is new, so the line number is added in place. A column of the file takes precedence.
+            row.setdefault(LINE_NUMBER_COLUMN, line_num)
+            yield row
 
     @property
     def errors(self) -> List[FileParseException]:
@@ -250,6 +413,9 @@ class FastTextParser(Parser):
         self.encoding = encoding
         self.label = label
 
+    def count(self, filename: str) -> Optional[int]:
+        return count_lines(filename)
+
     def parse(self, filename: str) -> Iterator[Dict[Any, Any]]:
         reader = LineReader(filename, self.encoding)
         for line_num, line in enumerate(reader, start=1):
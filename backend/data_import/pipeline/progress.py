@@ -0,0 +1,43 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class ImportProgress:
+    """The progress of an import, updated after each batch.
+
+    Args:
+        total: the approximate number of rows to read, or None if it is unknown.
+        clock: the clock the throughput is measured with.
+    """
+
+    def __init__(self, total: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.total = total
+        self.clock = clock
+        self.started = clock()
+        self.rows = 0
+        self.examples = 0
+        self.labels = 0
+        self.errors = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.clock() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """The estimated number of seconds until all the rows are read."""
+        rate = self.rows_per_second
+        if self.total is None or rate == 0:
+            return None
+        return max(self.total - self.rows, 0) / rate
+
+    def dict(self) -> Dict[str, Any]:
+        eta = self.eta
+        return {
+            "examples": self.examples,
+            "labels": self.labels,
+            "errors": self.errors,
+            "rows_per_second": round(self.rows_per_second, 1),
+            "eta": None if eta is None else round(eta, 1),
+        }
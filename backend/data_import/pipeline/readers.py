@@ -2,10 +2,12 @@ import abc
 import collections.abc
 import dataclasses
 import uuid
-from typing import Any, Dict, Iterator, List
+from queue import Empty
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-import pandas as pd
+import billiard
 
+from .batching import BatchSizeController
 from .exceptions import FileParseException
 
 DEFAULT_TEXT_COLUMN = "text"
@@ -15,6 +17,11 @@ UPLOAD_NAME_COLUMN = "upload_name"
 UUID_COLUMN = "example_uuid"
 LINE_NUMBER_COLUMN = "#line_number"
 
+# The namespace of the uuids derived from the upload ids.
+UUID_NAMESPACE = uuid.UUID("6a1b7a6e-33d4-4b0c-9a61-d5c3b2c4a0f4")
+
+Record = Dict[Any, Any]
+
 
 class BaseReader(collections.abc.Iterable):
     """Reader has a role to parse files and return a Record iterator."""
@@ -34,7 +41,7 @@ class BaseReader(collections.abc.Iterable):
         raise NotImplementedError("Please implement this method in the subclass.")
 
     @abc.abstractmethod
-    def batch(self, batch_size: int) -> Iterator[pd.DataFrame]:
+    def batch(self, batch_size: Union[int, BatchSizeController]) -> Iterator[List[Record]]:
         raise NotImplementedError("Please implement this method in the subclass.")
 
 
@@ -51,40 +58,203 @@ class Parser(abc.ABC):
         """Returns parsing errors."""
         return []
 
+    def count(self, filename: str) -> Optional[int]:
+        """Returns the approximate number of rows in the file, or None if it cannot be counted cheaply."""
+        return None
+
 
 @dataclasses.dataclass
 class FileName:
     full_path: str
     generated_name: str
     upload_name: str
+    upload_id: str = ""
+
+
+def record_uuid(filename: FileName, index: int) -> uuid.UUID:
+    """Returns the uuid of the example made from the index-th record of a file.
+
+    The uuid is derived from the upload id, so that it is the same when the
+    import is retried. It is shaped as a version 4 uuid, as the data classes
+    expect. Files without an upload id get random uuids.
+    """
+    if not filename.upload_id:
+        return uuid.uuid4()
+    name = f"{filename.upload_id}:{index}"
+    return uuid.UUID(bytes=uuid.uuid5(UUID_NAMESPACE, name).bytes, version=4)
 
 
 class Reader(BaseReader):
-    def __init__(self, filenames: List[FileName], parser: Parser):
+    """Reader that reads the files one after another.
+
+    Args:
+        filenames: the files to read.
+        parser: the parser of the files.
+        checkpoints: the number of records to skip per upload id, because they are already saved.
+            It is updated as the records are read.
+    """
+
+    def __init__(self, filenames: List[FileName], parser: Parser, checkpoints: Optional[Dict[str, int]] = None):
         self.filenames = filenames
         self.parser = parser
+        self.checkpoints: Dict[str, int] = dict(checkpoints or {})
 
-    def __iter__(self) -> Iterator[Dict[Any, Any]]:
+    def parse(self) -> Iterator[Tuple[FileName, Iterable[Record]]]:
         for filename in self.filenames:
-            rows = self.parser.parse(filename.full_path)
-            for row in rows:
-                yield {
-                    UUID_COLUMN: uuid.uuid4(),
-                    FILE_NAME_COLUMN: filename.generated_name,
-                    UPLOAD_NAME_COLUMN: filename.upload_name,
-                    **row,
-                }
-
-    def batch(self, batch_size: int) -> Iterator[pd.DataFrame]:
+            yield filename, self.parser.parse(filename.full_path)
+
+    def __iter__(self) -> Iterator[Record]:
+        for filename, rows in self.parse():
+            saved = self.checkpoints.get(filename.upload_id, 0) if filename.upload_id else 0
+            for index, row in enumerate(rows):
+                if index < saved:
+                    continue
+                # The parsers create a new dict per row, so it is completed in place instead of copied.
+                row.setdefault(UUID_COLUMN, record_uuid(filename, index))
+                row.setdefault(FILE_NAME_COLUMN, filename.generated_name)
+                row.setdefault(UPLOAD_NAME_COLUMN, filename.upload_name)
+                if filename.upload_id:
+                    self.checkpoints[filename.upload_id] = index + 1
+                yield row
+
+    def count(self) -> Optional[int]:
+        """Returns the approximate number of records left to read, or None if it is unknown."""
+        counts = [self.parser.count(filename.full_path) for filename in self.filenames]
+        if None in counts:
+            return None
+        return max(sum(counts) - sum(self.checkpoints.values()), 0)
+
+    def batch(self, batch_size: Union[int, BatchSizeController]) -> Iterator[List[Record]]:
+        """Yield the records in batches.
+
+        Args:
+            batch_size: the number of records per batch, or a controller that sizes each batch
+                from the time the previous one took to be processed by the caller.
+        """
+        if isinstance(batch_size, int):
+            batch_size = BatchSizeController(batch_size, min_size=batch_size, max_size=batch_size)
+        controller = batch_size
         batch = []
         for record in self:
             batch.append(record)
-            if len(batch) == batch_size:
-                yield pd.DataFrame(batch)
+            if len(batch) >= controller.size:
+                started = controller.clock()
+                yield batch
+                controller.update(batch, controller.clock() - started)
                 batch = []
         if batch:
-            yield pd.DataFrame(batch)
+            yield batch
 
     @property
     def errors(self) -> List[FileParseException]:
         return self.parser.errors
+
+
+# The kinds of messages the workers put on their queues.
+RECORDS, DONE, FAILED = "records", "done", "failed"
+
+
+def parse_files(parser: Parser, filenames: List[str], queue, chunk_size: int):
+    """Parse files one after another in a worker process, and put their records on the queue in chunks.
+
+    The chunks of each file are followed by `(DONE, errors)` with the parsing
+    errors of the file, or by `(FAILED, exception)` if the parser raised.
+    """
+    for filename in filenames:
+        saved_errors = len(parser.errors)
+        chunk: List[Record] = []
+        try:
+            for record in parser.parse(filename):
+                chunk.append(record)
+                if len(chunk) == chunk_size:
+                    queue.put((RECORDS, chunk))
+                    chunk = []
+        except Exception as e:
+            queue.put((FAILED, e))
+            return
+        if chunk:
+            queue.put((RECORDS, chunk))
+        queue.put((DONE, parser.errors[saved_errors:]))
+
+
+class ParallelReader(Reader):
+    """Reader that parses the files in worker processes.
+
+    The files are dealt to the workers in turn, and each worker streams the
+    records of its files back in chunks through a bounded queue. The records
+    are yielded in the order of the files, so the examples are saved by a
+    single writer as with `Reader`, and at most about `max_pending_records`
+    records are parsed ahead of the writer whatever the size of the files.
+
+    Args:
+        filenames: the files to read.
+        parser: the parser of the files. It is copied to the worker processes.
+        max_workers: the number of processes.
+        checkpoints: the number of records to skip per upload id, as in `Reader`.
+        chunk_size: the number of records sent back at once.
+        max_pending_records: the number of records the workers may parse ahead of the writer.
+    """
+
+    def __init__(
+        self,
+        filenames: List[FileName],
+        parser: Parser,
+        max_workers: int,
+        checkpoints: Optional[Dict[str, int]] = None,
+        chunk_size: int = 1000,
+        max_pending_records: int = 10000,
+    ):
+        super().__init__(filenames, parser, checkpoints)
+        self.max_workers = max(min(max_workers, len(filenames)), 1)
+        self.chunk_size = chunk_size
+        self.max_pending_records = max_pending_records
+        self._errors: List[FileParseException] = []
+
+    def parse(self) -> Iterator[Tuple[FileName, Iterable[Record]]]:
+        # billiard, unlike multiprocessing, can start processes from the daemonic processes of Celery workers.
+        # The workers are spawned rather than forked, because forking a process that runs threads can deadlock.
+        context = billiard.get_context("spawn")
+        queue_size = max(self.max_pending_records // (self.chunk_size * self.max_workers), 1)
+        workers = []
+        for i in range(self.max_workers):
+            queue = context.Queue(maxsize=queue_size)
+            filenames = [filename.full_path for filename in self.filenames[i :: self.max_workers]]
+            process = context.Process(target=parse_files, args=(self.parser, filenames, queue, self.chunk_size))
+            process.daemon = True
+            process.start()
+            workers.append((process, queue))
+        completed = False
+        try:
+            for i, filename in enumerate(self.filenames):
+                yield filename, self.collect(*workers[i % self.max_workers])
+            completed = True
+        finally:
+            for process, queue in workers:
+                if not completed:
+                    # A worker blocked on its full queue would never exit.
+                    process.terminate()
+                process.join()
+                queue.close()
+
+    def collect(self, process, queue) -> Iterator[Record]:
+        """Yield the records of the next file of a worker."""
+        while True:
+            # A worker that has exited has flushed its messages to the queue before.
+            alive = process.is_alive()
+            try:
+                kind, value = queue.get(timeout=1)
+            except Empty:
+                if not alive:
+                    raise RuntimeError(f"The parsing process exited with code {process.exitcode}.")
+                continue
+            if kind == RECORDS:
+                yield from value
+            elif kind == DONE:
+                self._errors.extend(value)
+                return
+            else:
+                raise value
+
+    @property
+    def errors(self) -> List[FileParseException]:
+        return self._errors
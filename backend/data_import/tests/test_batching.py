@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import MagicMock
+
+from data_import.pipeline.batching import BatchSizeController, record_size
+from data_import.pipeline.readers import FileName, Reader
+
+
+class TestBatchSizeController(unittest.TestCase):
+    def make_records(self, n, text="a"):
+        return [{"text": text} for _ in range(n)]
+
+    def test_grow_at_most_twice_per_batch(self):
+        controller = BatchSizeController(100, max_size=1000)
+        controller.update(self.make_records(100), seconds=0.01)
+        self.assertEqual(controller.size, 200)
+
+    def test_size_batch_to_target_seconds(self):
+        controller = BatchSizeController(100, max_size=1000, target_seconds=1.0)
+        controller.update(self.make_records(100), seconds=0.8)
+        self.assertEqual(controller.size, 125)
+        controller.update(self.make_records(125), seconds=2.5)
+        self.assertEqual(controller.size, 50)
+
+    def test_bound_memory_of_wide_records(self):
+        records = self.make_records(10, text="a" * 10000)
+        controller = BatchSizeController(10, max_bytes=20 * record_size(records[0]))
+        controller.update(records, seconds=0.01)
+        self.assertEqual(controller.size, 20)
+        controller.max_bytes = 5 * record_size(records[0])
+        controller.update(records, seconds=0.01)
+        self.assertEqual(controller.size, 5)
+
+    def test_keep_size_within_bounds(self):
+        controller = BatchSizeController(1000, min_size=10, max_size=100)
+        self.assertEqual(controller.size, 100)
+        controller.update(self.make_records(100), seconds=1000)
+        self.assertEqual(controller.size, 10)
+
+    def test_ignore_empty_batch(self):
+        controller = BatchSizeController(100)
+        controller.update([], seconds=0)
+        self.assertEqual(controller.size, 100)
+
+
+class TestAdaptiveBatch(unittest.TestCase):
+    def test_time_batches_while_the_caller_saves_them(self):
+        parser = MagicMock()
+        parser.parse.return_value = iter([{"text": str(i)} for i in range(10)])
+        reader = Reader([FileName("a.txt", "a.txt", "a.txt")], parser)
+        now = [0.0]
+        controller = BatchSizeController(2, max_size=100, target_seconds=1.0, clock=lambda: now[0])
+        sizes = []
+        for batch in reader.batch(controller):
+            sizes.append(len(batch))
+            now[0] += 0.5
+        self.assertEqual(sizes, [2, 4, 4])
@@ -1,6 +1,5 @@
 import uuid
 
-import pandas as pd
 from django.test import TestCase
 
 from data_import.pipeline.data import TextData
@@ -31,21 +30,30 @@ class TestExamplesMaker(TestCase):
         self.maker = ExampleMaker(self.project.item, TextData, self.text_column, [self.label_column])
 
     def test_make_examples(self):
-        df = pd.DataFrame([self.record])
-        examples = self.maker.make(df)
+        examples = self.maker.make([self.record])
         self.assertEqual(len(examples), 1)
 
     def test_check_column_existence(self):
         self.record.pop(self.text_column)
-        df = pd.DataFrame([self.record])
-        examples = self.maker.make(df)
+        examples = self.maker.make([self.record])
         self.assertEqual(len(examples), 0)
         self.assertEqual(len(self.maker.errors), 1)
 
+    def test_report_records_without_text(self):
+        other = {**self.record, LINE_NUMBER_COLUMN: 2, UUID_COLUMN: uuid.uuid4(), self.text_column: None}
+        examples = self.maker.make([self.record, other])
+        self.assertEqual(len(examples), 1)
+        self.assertEqual([error.line_num for error in self.maker.errors], [2])
+
+    def test_keep_records_unchanged(self):
+        record = dict(self.record)
+        examples = self.maker.make([self.record])
+        self.assertEqual(self.record, record)
+        self.assertEqual(examples[0].meta, {})
+
     def test_empty_text_raises_error(self):
         self.record[self.text_column] = ""
-        df = pd.DataFrame([self.record])
-        examples = self.maker.make(df)
+        examples = self.maker.make([self.record])
         self.assertEqual(len(examples), 0)
         self.assertEqual(len(self.maker.errors), 1)
 
@@ -54,16 +62,14 @@ class TestLabelFormatter(TestCase):
     def setUp(self):
         self.label_column = "label"
         self.label_class = CategoryLabel
-        self.df = pd.DataFrame(
-            [
-                {LINE_NUMBER_COLUMN: 1, UUID_COLUMN: uuid.uuid4(), self.label_column: ["A"]},
-                {LINE_NUMBER_COLUMN: 2, UUID_COLUMN: uuid.uuid4(), self.label_column: ["B", "C"]},
-            ]
-        )
+        self.records = [
+            {LINE_NUMBER_COLUMN: 1, UUID_COLUMN: uuid.uuid4(), self.label_column: ["A"]},
+            {LINE_NUMBER_COLUMN: 2, UUID_COLUMN: uuid.uuid4(), self.label_column: ["B", "C"]},
+        ]
 
     def test_make(self):
         label_maker = LabelMaker(column=self.label_column, label_class=self.label_class)
-        labels = label_maker.make(self.df)
+        labels = label_maker.make(self.records)
         self.assertEqual(len(labels), 3)
         with self.subTest():
             for label, expected in zip(labels, ["A", "B", "C"]):
@@ -71,18 +77,17 @@ class TestLabelFormatter(TestCase):
 
     def test_format_without_specified_column(self):
         label_maker = LabelMaker(column="invalid_column", label_class=self.label_class)
-        with self.assertRaises(KeyError):
-            label_maker.make(self.df)
+        labels = label_maker.make(self.records)
+        self.assertEqual(labels, [])
+        self.assertEqual(len(label_maker.errors), 1)
 
     def test_format_with_partially_correct_column(self):
         label_maker = LabelMaker(column=self.label_column, label_class=self.label_class)
-        df = pd.DataFrame(
-            [
-                {LINE_NUMBER_COLUMN: 1, UUID_COLUMN: uuid.uuid4(), self.label_column: ["A"]},
-                {LINE_NUMBER_COLUMN: 2, UUID_COLUMN: uuid.uuid4(), "invalid_column": ["B"]},
-                {LINE_NUMBER_COLUMN: 3, UUID_COLUMN: uuid.uuid4()},
-                {LINE_NUMBER_COLUMN: 3, UUID_COLUMN: uuid.uuid4(), self.label_column: [{}]},
-            ]
-        )
-        labels = label_maker.make(df)
+        records = [
+            {LINE_NUMBER_COLUMN: 1, UUID_COLUMN: uuid.uuid4(), self.label_column: ["A"]},
+            {LINE_NUMBER_COLUMN: 2, UUID_COLUMN: uuid.uuid4(), "invalid_column": ["B"]},
+            {LINE_NUMBER_COLUMN: 3, UUID_COLUMN: uuid.uuid4()},
+            {LINE_NUMBER_COLUMN: 3, UUID_COLUMN: uuid.uuid4(), self.label_column: [{}]},
+        ]
+        labels = label_maker.make(records)
         self.assertEqual(len(labels), 1)
@@ -1,9 +1,13 @@
+import codecs
+import io
 import json
 import os
 import shutil
 import tempfile
 import unittest
+from unittest.mock import patch
 
+from api.json_codec import JSONCodec, OrjsonCodec
 from data_import.pipeline import parsers
 from data_import.pipeline.readers import LINE_NUMBER_COLUMN
 
@@ -82,8 +86,60 @@ class TestJSONParser(TestParser):
         expected = json.loads(content)
         self.assert_record(content, parser, expected)
 
+    def test_report_line_of_invalid_row(self):
+        content = '[\n{"text": "line1"},\n{"text": line2}\n]'
+        parser = parsers.JSONParser()
+        self.assert_record(content, parser, [{"text": "line1"}])
+        self.assertEqual([error.line_num for error in parser.errors], [3])
+
+    def test_reject_other_than_array(self):
+        parser = parsers.JSONParser()
+        self.assert_record('{"text": "line1"}', parser, [])
+        self.assertEqual(len(parser.errors), 1)
+
+
+class TestJSONArrayDecoder(unittest.TestCase):
+    def decode(self, content, chunk_size=3):
+        return list(parsers.JSONArrayDecoder(io.StringIO(content), chunk_size=chunk_size))
+
+    def test_decode_items_across_chunks(self):
+        items = [{"text": "a long text " * 10, "labels": [[0, 5, "LOC"]]}, 12345, -1.5e3, "a", None, True, []]
+        self.assertEqual(self.decode(json.dumps(items)), items)
+        self.assertEqual(self.decode(json.dumps(items, indent=2), chunk_size=1), items)
+
+    def test_decode_empty_array(self):
+        self.assertEqual(self.decode(" [ ] "), [])
+
+    def test_decode_tokens_cut_by_chunks(self):
+        items = ["\u00e9\\", -float("inf"), False, {"a": [None]}]
+        content = json.dumps(items, ensure_ascii=True)
+        for chunk_size in range(1, 12):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.decode(content, chunk_size=chunk_size), items)
+
+    def test_stop_reading_at_invalid_item(self):
+        content = "[" + ", ".join(['{"text": "valid"}', '{"text": invalid}'] + ['{"text": "valid"}'] * 10000) + "]"
+        decoder = parsers.JSONArrayDecoder(io.StringIO(content), chunk_size=64)
+        with self.assertRaises(json.JSONDecodeError) as cm:
+            list(decoder)
+        self.assertEqual(cm.exception.msg, "Expecting value")
+        self.assertLess(len(decoder.buffer), 256)
+
+    def test_reject_invalid_array(self):
+        for content in ["", "{}", "[1, 2", "[1 2]", "[1,]", "[1] 2", '["a', "[tru"]:
+            with self.subTest(content=content), self.assertRaises(json.JSONDecodeError):
+                self.decode(content)
+
 
 class TestJSONLParser(TestParser):
+    codec = OrjsonCodec()
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch("api.json_codec.codec", self.codec)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_read(self):
         line1 = json.dumps({"text": "line1", "labels": "Label1"})
         line2 = json.dumps({"text": "line2", "labels": "Label2"})
@@ -92,6 +148,70 @@ class TestJSONLParser(TestParser):
         expected = [json.loads(line1), json.loads(line2)]
         self.assert_record(content, parser, expected)
 
+    def test_report_invalid_lines(self):
+        content = '{"text": "line1"}\n{"text": line2}\n["line3"]\n\n{"text": "line5"}'
+        parser = parsers.JSONLParser()
+        self.assert_record(content, parser, [{"text": "line1"}, {"text": "line5"}])
+        self.assertEqual([error.line_num for error in parser.errors], [2, 3, 4])
+
+    def test_keep_line_number_column_of_file(self):
+        self.create_file(json.dumps({"text": "line1", LINE_NUMBER_COLUMN: 10}))
+        row = next(parsers.JSONLParser().parse(self.test_file))
+        self.assertEqual(row[LINE_NUMBER_COLUMN], 10)
+
+
+class TestJSONLParserWithStandardLibrary(TestJSONLParser):
+    codec = JSONCodec()
+
+
+class TestLineReader(TestParser):
+    def read(self, content: bytes, encoding=parsers.DEFAULT_ENCODING):
+        with open(self.test_file, "wb") as f:
+            f.write(content)
+        return list(parsers.LineReader(self.test_file, encoding))
+
+    def test_read_lines(self):
+        self.assertEqual(self.read(b"a\r\n\nb  \n"), ["a", "", "b"])
+        self.assertEqual(self.read(b""), [])
+
+    def test_read_lines_with_bom(self):
+        content = "こんにちは\nworld"
+        self.assertEqual(self.read(codecs.BOM_UTF8 + content.encode()), ["こんにちは", "world"])
+        self.assertEqual(self.read(content.encode("utf-16")), ["こんにちは", "world"])
+
+    def test_read_lines_in_given_encoding(self):
+        content = "こんにちは\n世界"
+        self.assertEqual(self.read(content.encode("shift_jis"), "shift_jis"), ["こんにちは", "世界"])
+
+
+class TestCount(TestParser):
+    def test_count_lines(self):
+        for content, expected in [("", 0), ("a", 1), ("a\n", 1), ("a\n\nb", 3)]:
+            with self.subTest(content=content):
+                self.create_file(content)
+                self.assertEqual(parsers.count_lines(self.test_file, buffer_size=2), expected)
+
+    def test_count_rows(self):
+        self.create_file("text,label\nA,1\nB,2\n")
+        self.assertEqual(parsers.CSVParser().count(self.test_file), 2)
+        self.assertEqual(parsers.JSONLParser().count(self.test_file), 3)
+        self.assertEqual(parsers.TextFileParser().count(self.test_file), 1)
+        self.assertIsNone(parsers.JSONParser().count(self.test_file))
+
+
+class TestDetectEncoding(unittest.TestCase):
+    def test_detect_bom(self):
+        self.assertEqual(parsers.guess_encoding(codecs.BOM_UTF8 + b"text"), "utf-8-sig")
+        self.assertEqual(parsers.guess_encoding("text".encode("utf-16")), "utf-16")
+        self.assertEqual(parsers.guess_encoding("text".encode("utf-32")), "utf-32")
+
+    def test_detect_utf8_cut_in_the_middle_of_a_character(self):
+        self.assertEqual(parsers.guess_encoding("こんにちは".encode()[:-1]), "utf-8")
+
+    def test_detect_other_encoding_with_chardet(self):
+        content = "Le cœur a ses raisons que la raison ne connaît point. " * 10
+        self.assertNotIn(parsers.guess_encoding(content.encode("cp1252")).lower(), ["utf-8", "ascii"])
+
 
 class TestFastTextParser(TestParser):
     def test_read(self):
@@ -0,0 +1,28 @@
+import unittest
+
+from data_import.pipeline.progress import ImportProgress
+
+
+class TestImportProgress(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.progress = ImportProgress(total=300, clock=lambda: self.now)
+
+    def test_throughput_and_eta(self):
+        self.now = 10.0
+        self.progress.rows = 100
+        self.assertEqual(self.progress.rows_per_second, 10.0)
+        self.assertEqual(self.progress.eta, 20.0)
+
+    def test_no_eta_without_total_or_rows(self):
+        self.assertIsNone(self.progress.eta)
+        self.progress.total = None
+        self.now = 10.0
+        self.progress.rows = 100
+        self.assertIsNone(self.progress.eta)
+
+    def test_dict(self):
+        self.now = 4.0
+        self.progress.rows, self.progress.examples, self.progress.labels, self.progress.errors = 100, 90, 120, 10
+        expected = {"examples": 90, "labels": 120, "errors": 10, "rows_per_second": 25.0, "eta": 8.0}
+        self.assertEqual(self.progress.dict(), expected)
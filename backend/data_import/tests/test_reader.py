@@ -1,14 +1,19 @@
+import os
+import shutil
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
-import pandas as pd
-from pandas.testing import assert_frame_equal
-
+from data_import.pipeline.parsers import JSONLParser
 from data_import.pipeline.readers import (
     FILE_NAME_COLUMN,
+    LINE_NUMBER_COLUMN,
     UPLOAD_NAME_COLUMN,
     UUID_COLUMN,
+    FileName,
+    ParallelReader,
     Reader,
+    record_uuid,
 )
 
 
@@ -19,6 +24,7 @@ class TestReader(unittest.TestCase):
         filename = MagicMock()
         filename.generated_name = "filename"
         filename.upload_name = "upload_name"
+        filename.upload_id = ""
         self.filenames = MagicMock()
         self.filenames.__iter__.return_value = [filename]
         self.rows = [
@@ -47,5 +53,89 @@ class TestReader(unittest.TestCase):
         mock.return_value = "uuid"
         reader = Reader(self.filenames, self.parser)
         batch = next(reader.batch(2))
-        expected_df = pd.DataFrame(self.rows)
-        assert_frame_equal(batch, expected_df)
+        self.assertEqual(batch, self.rows)
+
+    def test_keep_columns_of_file(self):
+        self.parser.parse.return_value = [{UPLOAD_NAME_COLUMN: "original"}]
+        reader = Reader(self.filenames, self.parser)
+        self.assertEqual(next(iter(reader))[UPLOAD_NAME_COLUMN], "original")
+
+
+class TestResumableReader(unittest.TestCase):
+    def setUp(self):
+        self.parser = MagicMock()
+        self.parser.parse.side_effect = lambda path: iter([{"text": f"{path}-{i}"} for i in range(3)])
+        self.filenames = [FileName(f"{name}.txt", f"{name}.txt", f"{name}.txt", upload_id=name) for name in "ab"]
+
+    def test_uuid_is_derived_from_upload_id_and_position(self):
+        uuid = record_uuid(self.filenames[0], 1)
+        self.assertEqual(uuid, record_uuid(self.filenames[0], 1))
+        self.assertEqual(uuid.version, 4)
+        self.assertNotEqual(uuid, record_uuid(self.filenames[0], 2))
+        self.assertNotEqual(uuid, record_uuid(self.filenames[1], 1))
+
+    def test_track_records_read_per_upload(self):
+        reader = Reader(self.filenames, self.parser)
+        batches = reader.batch(2)
+        next(batches)
+        self.assertEqual(reader.checkpoints, {"a": 2})
+        next(batches)
+        self.assertEqual(reader.checkpoints, {"a": 3, "b": 1})
+
+    def test_count_records_left(self):
+        self.parser.count.return_value = 3
+        self.assertEqual(Reader(self.filenames, self.parser, checkpoints={"a": 2}).count(), 4)
+        self.parser.count.return_value = None
+        self.assertIsNone(Reader(self.filenames, self.parser).count())
+
+    def test_skip_saved_records(self):
+        records = list(Reader(self.filenames, self.parser))
+        reader = Reader(self.filenames, self.parser, checkpoints={"a": 3, "b": 1})
+        self.assertEqual(list(reader), records[4:])
+        self.assertEqual(reader.checkpoints, {"a": 3, "b": 3})
+
+
+class TestParallelReader(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.filenames = []
+        for i in range(5):
+            path = os.path.join(self.test_dir, f"{i}.jsonl")
+            with open(path, "w") as f:
+                f.write(f'{{"text": "{i}-1"}}\n{{"text": "{i}-2"}}\n')
+                if i == 2:
+                    f.write("invalid\n")
+            self.filenames.append(FileName(full_path=path, generated_name=f"{i}.jsonl", upload_name=f"{i}.jsonl"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_read_files_in_order(self):
+        reader = ParallelReader(self.filenames, JSONLParser(encoding="utf-8"), max_workers=2)
+        records = list(reader)
+        expected = [f"{i}-{j}" for i in range(5) for j in (1, 2)]
+        self.assertEqual([record["text"] for record in records], expected)
+        self.assertEqual(records[-1][UPLOAD_NAME_COLUMN], "4.jsonl")
+        self.assertEqual(records[-1][LINE_NUMBER_COLUMN], 2)
+        self.assertEqual(len({record[UUID_COLUMN] for record in records}), len(records))
+
+    def test_stream_records_in_chunks(self):
+        reader = ParallelReader(
+            self.filenames, JSONLParser(encoding="utf-8"), max_workers=2, chunk_size=1, max_pending_records=1
+        )
+        expected = [f"{i}-{j}" for i in range(5) for j in (1, 2)]
+        self.assertEqual([record["text"] for record in reader], expected)
+
+    def test_stop_reading_early(self):
+        reader = ParallelReader(
+            self.filenames, JSONLParser(encoding="utf-8"), max_workers=2, chunk_size=1, max_pending_records=1
+        )
+        records = iter(reader)
+        self.assertEqual(next(records)["text"], "0-1")
+        records.close()
+
+    def test_collect_errors_of_workers(self):
+        reader = ParallelReader(self.filenames, JSONLParser(encoding="utf-8"), max_workers=2)
+        list(reader.batch(3))
+        errors = [(error.filename, error.line_num) for error in reader.errors]
+        self.assertEqual(errors, [(self.filenames[2].full_path, 3)])
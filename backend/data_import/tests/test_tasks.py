@@ -1,6 +1,7 @@
 import os
 import pathlib
 import shutil
+from unittest.mock import patch
 
 from django.core.files import File
 from django.test import TestCase, override_settings
@@ -8,6 +9,8 @@ from django_drf_filepond.models import StoredUpload, TemporaryUpload
 from django_drf_filepond.utils import _get_file_id
 
 from data_import.celery_tasks import import_dataset
+from data_import.models import ImportCheckpoint
+from data_import.pipeline.examples import Examples
 from data_import.pipeline.catalog import RELATION_EXTRACTION
 from examples.models import Example
 from label_types.models import SpanType
@@ -25,28 +28,31 @@ class TestImportData(TestCase):
         self.project = prepare_project(self.task)
         self.user = self.project.admin
         self.data_path = pathlib.Path(__file__).parent / "data"
-        self.upload_id = _get_file_id()
+        self.upload_ids = []
 
     def tearDown(self):
-        try:
-            su = StoredUpload.objects.get(upload_id=self.upload_id)
+        for su in StoredUpload.objects.filter(upload_id__in=self.upload_ids):
             directory = pathlib.Path(su.get_absolute_file_path()).parent
             shutil.rmtree(directory)
-        except StoredUpload.DoesNotExist:
-            pass
 
-    def import_dataset(self, filename, file_format, task, kwargs=None):
+    def upload(self, filename):
         file_path = str(self.data_path / filename)
+        upload_id = _get_file_id()
         TemporaryUpload.objects.create(
-            upload_id=self.upload_id,
-            file_id="1",
+            upload_id=upload_id,
+            file_id=str(len(self.upload_ids) + 1),
             file=File(open(file_path, mode="rb"), filename.split("/")[-1]),
             upload_name=filename,
             upload_type="F",
         )
-        upload_ids = [self.upload_id]
+        self.upload_ids.append(upload_id)
+
+    def import_dataset(self, filename, file_format, task, kwargs=None):
+        filenames = filename if isinstance(filename, list) else [filename]
+        for name in filenames:
+            self.upload(name)
         kwargs = kwargs or {}
-        return import_dataset(self.user.id, self.project.item.id, file_format, upload_ids, task, **kwargs)
+        return import_dataset(self.user.id, self.project.item.id, file_format, self.upload_ids, task, **kwargs)
 
 
 @override_settings(MAX_UPLOAD_SIZE=0)
@@ -97,6 +103,49 @@ class TestImportClassificationData(TestImportData):
         self.import_dataset(filename, file_format, self.task, kwargs)
         self.assert_examples(dataset)
 
+    @override_settings(IMPORT_BATCH_SIZE=1, IMPORT_MIN_BATCH_SIZE=1, IMPORT_MAX_BATCH_SIZE=1)
+    def test_resume_after_failure(self):
+        filename = "text_classification/example.jsonl"
+        kwargs = {"column_label": "labels"}
+        dataset = [("exampleA", ["positive"]), ("exampleB", ["positive", "negative"]), ("exampleC", [])]
+        save = Examples.save
+
+        def fail_on_second_batch(examples):
+            if fail_on_second_batch.calls == 1:
+                raise RuntimeError("Worker lost")
+            fail_on_second_batch.calls += 1
+            save(examples)
+
+        fail_on_second_batch.calls = 0
+        with patch.object(Examples, "save", autospec=True, side_effect=fail_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                self.import_dataset(filename, "JSONL", self.task, kwargs)
+        self.assertEqual(Example.objects.count(), 1)
+        self.assertEqual(ImportCheckpoint.objects.get().records, 1)
+
+        import_dataset(self.user.id, self.project.item.id, "JSONL", self.upload_ids, self.task, **kwargs)
+        self.assert_examples(dataset)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    @override_settings(IMPORT_BATCH_SIZE=2, IMPORT_MIN_BATCH_SIZE=2, IMPORT_MAX_BATCH_SIZE=2)
+    @patch("data_import.celery_tasks.report_progress")
+    def test_report_progress_per_batch(self, report_progress):
+        kwargs = {"column_label": "labels"}
+        self.import_dataset("text_classification/example.jsonl", "JSONL", self.task, kwargs)
+        self.assertEqual([call.args[1:] for call in report_progress.call_args_list], [(2, 3), (3, 3)])
+        info = report_progress.call_args.kwargs
+        self.assertEqual((info["examples"], info["labels"], info["errors"]), (3, 3, 0))
+        self.assertEqual(info["eta"], 0)
+
+    @override_settings(IMPORT_WORKERS=2)
+    def test_parse_files_in_parallel(self):
+        filenames = ["text_classification/example.jsonl", "text_classification/example.json"]
+        kwargs = {"column_label": "labels"}
+        dataset = [("exampleA", ["positive"]), ("exampleB", ["positive", "negative"]), ("exampleC", [])]
+        response = self.import_dataset(filenames, "JSONL", self.task, kwargs)
+        self.assertGreaterEqual(len(response["error"]), 1)  # The JSON file is not a valid JSONL file.
+        self.assert_examples(dataset)
+
     def test_csv(self):
         filename = "text_classification/example.csv"
         file_format = "CSV"
@@ -223,7 +272,7 @@ class TestImportRelationExtractionData(TestImportData):
         self.project = prepare_project(self.task, use_relation=True)
         self.user = self.project.admin
         self.data_path = pathlib.Path(__file__).parent / "data"
-        self.upload_id = _get_file_id()
+        self.upload_ids = []
 
     def assert_examples(self, dataset):
         self.assertEqual(Example.objects.count(), len(dataset))
@@ -1,7 +1,30 @@
-from django.db.models import Count, Q, QuerySet
+from typing import List, Optional, Tuple
+
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet
 from django_filters.rest_framework import BooleanFilter, CharFilter, FilterSet
+from rest_framework.filters import SearchFilter
 
 from .models import Example
+from .search import get_search_backend
+from labels.models import BoundingBox, Category, Relation, Segmentation, Span
+from projects.models import Project, ProjectType
+
+
+def select_label_models(project: Optional[Project]) -> List[Tuple[type, str]]:
+    """Return the label models used by the project, with their field referring to the label type."""
+    categories, spans, relations = (Category, "label"), (Span, "label"), (Relation, "type")
+    bboxes, segmentations = (BoundingBox, "label"), (Segmentation, "label")
+    if project is None:
+        return [categories, spans, relations, bboxes, segmentations]
+    mapping = {
+        ProjectType.DOCUMENT_CLASSIFICATION: [categories],
+        ProjectType.SEQUENCE_LABELING: [spans, relations] if getattr(project, "use_relation", False) else [spans],
+        ProjectType.INTENT_DETECTION_AND_SLOT_FILLING: [categories, spans],
+        ProjectType.IMAGE_CLASSIFICATION: [categories],
+        ProjectType.BOUNDING_BOX: [bboxes],
+        ProjectType.SEGMENTATION: [segmentations],
+    }
+    return mapping.get(project.project_type, [])
 
 
 class ExampleFilter(FilterSet):
@@ -10,6 +33,8 @@ class ExampleFilter(FilterSet):
     assignee = CharFilter(method="filter_by_assignee")
 
     def filter_by_state(self, queryset, field_name, is_confirmed: bool):
+        if "is_confirmed" in queryset.query.annotations:
+            return queryset.filter(is_confirmed=is_confirmed)
         queryset = queryset.annotate(
             num_confirm=Count(
                 expression=field_name,
@@ -26,15 +51,15 @@ class ExampleFilter(FilterSet):
     def filter_by_label(self, queryset: QuerySet, field_name: str, label: str) -> QuerySet:
         """Filter examples by a given label name.
 
-        This performs filtering on all of the following labels at once:
+        Only the label tables used by the project type are searched, each with an EXISTS
+        subquery on the ids of the label types named `label`. If the project is unknown,
+        all of the following labels are searched:
         - categories
         - spans
         - relations
         - bboxes
         - segmentations
 
-        Todo: Consider project type to make filtering more efficient.
-
         Args:
             queryset (QuerySet): QuerySet to filter.
             field_name (str): This equals to `label`.
@@ -43,14 +68,27 @@ class ExampleFilter(FilterSet):
         Returns:
             QuerySet: Filtered examples.
         """
-        queryset = queryset.filter(
-            Q(categories__label__text=label)
-            | Q(spans__label__text=label)
-            | Q(relations__type__text=label)
-            | Q(bboxes__label__text=label)
-            | Q(segmentations__label__text=label)
-        )
-        return queryset
+        project = self.get_project()
+        condition = Q()
+        for label_model, label_type_field in select_label_models(project):
+            label_types = label_model._meta.get_field(label_type_field).related_model.objects.filter(text=label)
+            if project is None:
+                labels = label_model.objects.filter(**{f"{label_type_field}__in": label_types})
+            else:
+                type_ids = list(label_types.filter(project=project).values_list("id", flat=True))
+                if not type_ids:
+                    continue
+                labels = label_model.objects.filter(**{f"{label_type_field}_id__in": type_ids})
+            condition |= Exists(labels.filter(example=OuterRef("pk")))
+        if not condition:
+            return queryset.none()
+        return queryset.filter(condition)
+
+    def get_project(self) -> Optional[Project]:
+        context = getattr(self.request, "parser_context", None)
+        view = context.get("view") if isinstance(context, dict) else None
+        project = getattr(view, "project", None)
+        return project if isinstance(project, Project) else None
 
     def filter_by_assignee(self, queryset: QuerySet, field_name: str, assignee: str) -> QuerySet:
         return queryset.filter(assignments__assignee__username=assignee)
@@ -58,3 +96,19 @@ class ExampleFilter(FilterSet):
     class Meta:
         model = Example
         fields = ("project", "text", "created_at", "updated_at", "label", "assignee")
+
+
+class ExampleSearchFilter(SearchFilter):
+    """Search examples with the full-text index of the database, ranking the matches first.
+
+    Databases without a full-text index fall back to the substring search over `search_fields`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        backend = get_search_backend()
+        if backend is None:
+            return super().filter_queryset(request, queryset, view)
+        queryset = backend.search(queryset, request.query_params.get(self.search_param, ""))
+        if "search_rank" not in queryset.query.annotations:
+            return queryset
+        return queryset.order_by("-search_rank", *(queryset.query.order_by or queryset.model._meta.ordering))
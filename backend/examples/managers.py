@@ -1,9 +1,15 @@
+from django.db import connections, router
 from django.db.models import Count, Manager
 
 
 class ExampleManager(Manager):
     def bulk_create(self, objs, batch_size=None, ignore_conflicts=False):
-        super().bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+        objs = super().bulk_create(objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts)
+        features = connections[router.db_for_write(self.model)].features
+        if features.can_return_rows_from_bulk_insert and not ignore_conflicts:
+            # The ids are set by the INSERT ... RETURNING statement.
+            return objs
+        # Otherwise, the ids are read back with the uuids.
         uuids = [data.uuid for data in objs]
         examples = self.in_bulk(uuids, field_name="uuid")
         return [examples[uid] for uid in uuids]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from examples.search import get_search_backend
+
+
+def create_search_index(apps, schema_editor):
+    backend = get_search_backend(schema_editor.connection)
+    if backend:
+        backend.install(schema_editor)
+
+
+def drop_search_index(apps, schema_editor):
+    backend = get_search_backend(schema_editor.connection)
+    if backend:
+        backend.uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examples", "0008_assignment"),
+    ]
+
+    operations = [migrations.RunPython(code=create_search_index, reverse_code=drop_search_index)]
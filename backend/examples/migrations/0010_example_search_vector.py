@@ -0,0 +1,20 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:30
+
+from django.db import migrations
+
+from examples.search import PostgresSearchBackend
+
+
+def store_search_vector(apps, schema_editor):
+    """Replace the expression index of 0009 with a stored tsvector column and its index."""
+    if schema_editor.connection.vendor == PostgresSearchBackend.vendor:
+        PostgresSearchBackend().install(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("examples", "0009_example_search_index"),
+    ]
+
+    operations = [migrations.RunPython(code=store_search_vector, reverse_code=migrations.RunPython.noop)]
@@ -0,0 +1,146 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import F, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginate by the position of the last row instead of an offset.
+
+    The position is the tuple of the ordering fields of the queryset, with `id`
+    appended as a tie-breaker. Each page is fetched with a WHERE clause on that
+    tuple, so page N costs the same as the first one.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    max_page_size = 1000
+    unique_field = "id"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> List[Any]:
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor["reverse"])
+
+        keys = self.keys
+        queryset = queryset.annotate(**{key: F(field.lstrip("-")) for key, field in zip(keys, self.ordering)})
+        if cursor:
+            queryset = queryset.filter(self.after(cursor["position"]))
+        order_by = [self.direction(key, field) for key, field in zip(keys, self.ordering)]
+        items = list(queryset.order_by(*order_by)[: self.page_size + 1])
+        has_more = len(items) > self.page_size
+        items = items[: self.page_size]
+        if self.reverse:
+            items.reverse()
+
+        self.has_next = True if self.reverse else has_more
+        self.has_previous = has_more if self.reverse else cursor is not None
+        self.first_position = self.position(items[0]) if items else None
+        self.last_position = self.position(items[-1]) if items else None
+        return items
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, queryset: QuerySet) -> Tuple[str, ...]:
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not any(field.lstrip("-") in (self.unique_field, "pk") for field in ordering):
+            descending = bool(ordering) and ordering[0].startswith("-")
+            ordering.append(f"-{self.unique_field}" if descending else self.unique_field)
+        return tuple(ordering)
+
+    @property
+    def keys(self) -> List[str]:
+        return [f"keyset_{i}" for i in range(len(self.ordering))]
+
+    def direction(self, key: str, field: str) -> str:
+        descending = field.startswith("-") != self.reverse
+        return f"-{key}" if descending else key
+
+    def after(self, position: List[Any]) -> Q:
+        """Build the condition selecting the rows after the position in the current direction."""
+        condition = Q()
+        equal = Q()
+        for key, field, value in zip(self.keys, self.ordering, position):
+            descending = field.startswith("-") != self.reverse
+            condition |= equal & Q(**{f"{key}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{key: value})
+        return condition
+
+    def position(self, item) -> List[Any]:
+        return [getattr(item, key) for key in self.keys]
+
+    def encode_cursor(self, position: List[Any], reverse: bool) -> str:
+        payload = json.dumps({"position": position, "reverse": reverse}, default=str)
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, base64.urlsafe_b64encode(payload.encode()).decode()
+        )
+
+    def decode_cursor(self, request) -> Optional[Dict[str, Any]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if len(cursor["position"]) != len(self.ordering):
+                raise ValueError
+            return {"position": cursor["position"], "reverse": bool(cursor.get("reverse"))}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class ExamplePagination(LimitOffsetPagination):
+    """Offset pagination by default. Keyset pagination with `?pagination=cursor`."""
+
+    mode_query_param = "pagination"
+
+    def __init__(self):
+        self.keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.mode_query_param) == "cursor":
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,134 @@
+"""Full-text search over the text and the filename of examples.
+
+The backend depends on the database:
+- PostgreSQL: a generated tsvector column of the example, with a GIN index.
+- SQLite: an FTS5 table kept in sync with the example table by triggers.
+
+Both indexes are maintained by the database itself, so examples written by
+save(), bulk_create() or the data import stay searchable without extra work.
+Other databases fall back to the substring search of DRF's SearchFilter.
+"""
+import re
+from typing import List, Optional
+
+from django.db import connection as default_connection
+from django.db.models import BooleanField, QuerySet
+from django.db.models.expressions import RawSQL
+
+TABLE = "examples_example"
+TERM = re.compile(r"\w+")
+
+
+def parse_terms(query: str) -> List[str]:
+    return TERM.findall(query)
+
+
+class SearchBackend:
+    vendor = ""
+
+    def install(self, schema_editor):
+        raise NotImplementedError()
+
+    def uninstall(self, schema_editor):
+        raise NotImplementedError()
+
+    def match(self, terms: List[str]) -> str:
+        """Return the full-text query matching every term as a prefix."""
+        raise NotImplementedError()
+
+    def search(self, queryset: QuerySet, query: str) -> QuerySet:
+        """Filter the examples matching the query, and annotate their relevance as `search_rank`."""
+        terms = parse_terms(query)
+        if not terms:
+            return queryset
+        match = self.match(terms)
+        return self.filter(queryset, match).annotate(search_rank=RawSQL(self.rank, [match]))
+
+    def filter(self, queryset: QuerySet, match: str) -> QuerySet:
+        raise NotImplementedError()
+
+    @property
+    def rank(self) -> str:
+        raise NotImplementedError()
+
+
+class PostgresSearchBackend(SearchBackend):
+    vendor = "postgresql"
+    column = "search_vector"
+    index = "examples_example_search_vector"
+    # The expression index created before the vector was stored.
+    legacy_index = "examples_example_search"
+    vector = "to_tsvector('simple'::regconfig, COALESCE(text, '') || ' ' || COALESCE(filename, ''))"
+
+    def install(self, schema_editor):
+        statements = [
+            f"DROP INDEX IF EXISTS {self.legacy_index}",
+            f"ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS {self.column} tsvector "
+            f"GENERATED ALWAYS AS ({self.vector}) STORED",
+            f"CREATE INDEX IF NOT EXISTS {self.index} ON {TABLE} USING gin ({self.column})",
+        ]
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    def uninstall(self, schema_editor):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {self.index}")
+        schema_editor.execute(f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS {self.column}")
+
+    def match(self, terms: List[str]) -> str:
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def filter(self, queryset: QuerySet, match: str) -> QuerySet:
+        condition = f"{TABLE}.{self.column} @@ to_tsquery('simple'::regconfig, %s)"
+        return queryset.filter(RawSQL(condition, [match], output_field=BooleanField()))
+
+    @property
+    def rank(self) -> str:
+        return f"ts_rank({TABLE}.{self.column}, to_tsquery('simple'::regconfig, %s))"
+
+
+class SQLiteSearchBackend(SearchBackend):
+    vendor = "sqlite"
+    index = "examples_example_fts"
+
+    def install(self, schema_editor):
+        index = self.index
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"text, filename, content='{TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {TABLE} BEGIN "
+            f"INSERT INTO {index}(rowid, text, filename) VALUES (new.id, new.text, new.filename); END",
+            f"CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {TABLE} BEGIN "
+            f"INSERT INTO {index}({index}, rowid, text, filename) VALUES ('delete', old.id, old.text, old.filename); "
+            "END",
+            f"CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF text, filename ON {TABLE} BEGIN "
+            f"INSERT INTO {index}({index}, rowid, text, filename) VALUES ('delete', old.id, old.text, old.filename); "
+            f"INSERT INTO {index}(rowid, text, filename) VALUES (new.id, new.text, new.filename); END",
+            f"INSERT INTO {index}({index}) VALUES ('rebuild')",
+        ]
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    def uninstall(self, schema_editor):
+        for trigger in ("insert", "delete", "update"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {self.index}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {self.index}")
+
+    def match(self, terms: List[str]) -> str:
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def filter(self, queryset: QuerySet, match: str) -> QuerySet:
+        return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {self.index} WHERE {self.index} MATCH %s", [match]))
+
+    @property
+    def rank(self) -> str:
+        # bm25() is lower for better matches.
+        return f"SELECT -bm25({self.index}) FROM {self.index} WHERE {self.index} MATCH %s AND rowid = {TABLE}.id"
+
+
+BACKENDS = {backend.vendor: backend for backend in (PostgresSearchBackend(), SQLiteSearchBackend())}
+
+
+def get_search_backend(connection=None) -> Optional[SearchBackend]:
+    """Return the search backend of the database, or None if it has no full-text index."""
+    connection = connection or default_connection
+    return BACKENDS.get(connection.vendor)
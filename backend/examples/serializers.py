@@ -27,6 +27,7 @@ class AssignmentSerializer(serializers.ModelSerializer):
 class ExampleSerializer(serializers.ModelSerializer):
     annotation_approver = serializers.SerializerMethodField()
     is_confirmed = serializers.SerializerMethodField()
+    comment_count = serializers.SerializerMethodField()
     assignments = serializers.SerializerMethodField()
 
     @classmethod
@@ -35,13 +36,22 @@ class ExampleSerializer(serializers.ModelSerializer):
         return approver.username if approver else None
 
     def get_is_confirmed(self, instance):
+        if hasattr(instance, "is_confirmed"):
+            return instance.is_confirmed
         user = self.context.get("request").user
-        if instance.project.collaborative_annotation:
+        project = self.context.get("project") or instance.project
+        if project.collaborative_annotation:
             states = instance.states.all()
         else:
             states = instance.states.filter(confirmed_by_id=user.id)
         return states.count() > 0
 
+    @staticmethod
+    def get_comment_count(instance):
+        if hasattr(instance, "annotated_comment_count"):
+            return instance.annotated_comment_count
+        return instance.comment_count
+
     def get_assignments(self, instance):
         return [
             {
@@ -1,8 +1,11 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.http import urlencode
+from model_mommy import mommy
 from rest_framework import status
 from rest_framework.reverse import reverse
 
-from .utils import make_assignment, make_doc, make_example_state
+from .utils import make_assignment, make_comment, make_doc, make_example_state
 from api.tests.utils import CRUDMixin
 from projects.models import ProjectType
 from projects.tests.utils import prepare_project
@@ -107,6 +110,116 @@ class TestExampleListFilter(CRUDMixin):
         self.assert_filter(data={"confirmed": "True"}, user=user, expected=0)
 
 
+class TestExampleListQueries(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.url = reverse(viewname="example_list", args=[self.project.item.id]) + "?limit=100"
+        self.add_examples(3)
+
+    def add_examples(self, quantity):
+        for example in mommy.make("Example", project=self.project.item, _quantity=quantity):
+            for member in self.project.members:
+                make_assignment(self.project.item, example, member)
+            make_comment(example, self.project.admin)
+            make_example_state(example, self.project.annotator)
+
+    def test_serialize_precomputed_fields(self):
+        response = self.assert_fetch(self.project.annotator, status.HTTP_200_OK)
+        item = response.data["results"][0]
+        self.assertTrue(item["is_confirmed"])
+        self.assertEqual(item["comment_count"], 1)
+        self.assertEqual(
+            sorted(assignment["assignee"] for assignment in item["assignments"]),
+            sorted(member.username for member in self.project.members),
+        )
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertFalse(response.data["results"][0]["is_confirmed"])
+
+    def test_query_count_does_not_depend_on_examples(self):
+        for user in (self.project.admin, self.project.annotator):
+            self.client.force_login(user)
+            self.client.get(self.url)
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(self.url)
+            self.add_examples(10)
+            with self.assertNumQueries(len(context.captured_queries)):
+                self.client.get(self.url)
+
+
+class TestExampleListKeysetPagination(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.examples = mommy.make("Example", project=self.project.item, _quantity=7)
+        for example in self.examples:
+            make_assignment(self.project.item, example, self.project.annotator)
+        self.url = reverse(viewname="example_list", args=[self.project.item.id])
+
+    def fetch(self, user, url=None, **params):
+        self.client.force_login(user)
+        response = self.client.get(url or self.url, data=params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def fetch_all(self, user, **params):
+        data = self.fetch(user, pagination="cursor", limit=3, **params)
+        ids = [item["id"] for item in data["results"]]
+        while data["next"]:
+            data = self.fetch(user, data["next"])
+            ids += [item["id"] for item in data["results"]]
+        return ids, data
+
+    def test_iterate_pages_in_creation_order(self):
+        ids, _ = self.fetch_all(self.project.admin)
+        expected = [example.id for example in sorted(self.examples, key=lambda e: (e.created_at, e.id))]
+        self.assertEqual(ids, expected)
+
+    def test_go_back_to_previous_page(self):
+        first = self.fetch(self.project.admin, pagination="cursor", limit=3)
+        second = self.fetch(self.project.admin, first["next"])
+        self.assertIsNone(first["previous"])
+        back = self.fetch(self.project.admin, second["previous"])
+        self.assertEqual(back["results"], first["results"])
+
+    def test_keep_ordering_param(self):
+        for i, example in enumerate(self.examples):
+            example.score = i % 3
+            example.save()
+        ids, _ = self.fetch_all(self.project.admin, ordering="-score")
+        expected = [example.id for example in sorted(self.examples, key=lambda e: (-e.score, -e.id))]
+        self.assertEqual(ids, expected)
+
+    def test_keep_filter_params(self):
+        make_example_state(self.examples[0], self.project.admin)
+        ids, _ = self.fetch_all(self.project.admin, confirmed="True")
+        self.assertEqual(ids, [self.examples[0].id])
+
+    def test_follow_assignment_order_in_random_order_project(self):
+        self.project.item.random_order = True
+        self.project.item.save()
+        for example in self.examples:
+            make_assignment(self.project.item, example, self.project.approver)
+        ids, _ = self.fetch_all(self.project.annotator)
+        assignments = self.project.item.assignments.filter(assignee=self.project.annotator).order_by("id")
+        self.assertEqual(ids, [assignment.example_id for assignment in assignments])
+
+    def test_query_count_does_not_depend_on_page(self):
+        self.client.force_login(self.project.admin)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as first_page:
+            data = self.client.get(self.url, data={"pagination": "cursor", "limit": 2}).json()
+        with self.assertNumQueries(len(first_page.captured_queries)):
+            self.client.get(data["next"])
+
+    def test_reject_invalid_cursor(self):
+        self.client.force_login(self.project.admin)
+        response = self.client.get(self.url, data={"pagination": "cursor", "cursor": "invalid"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_offset_pagination_is_default(self):
+        data = self.fetch(self.project.admin, limit=3, offset=3)
+        self.assertEqual(data["count"], 7)
+
+
 class TestExampleDetail(CRUDMixin):
     def setUp(self):
         self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
@@ -1,6 +1,8 @@
 from unittest.mock import MagicMock
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from model_mommy import mommy
 
 from .utils import make_doc, make_example_state
@@ -60,6 +62,39 @@ class TestLabelFilter(TestFilterMixin):
     def test_returns_example_with_positive_label(self):
         self.assert_filter(data={"label": self.label_type.text}, expected=1)
 
+    def test_returns_example_with_label_of_known_project(self):
+        self.request.parser_context = {"view": MagicMock(project=self.project.item)}
+        self.assert_filter(data={"label": self.label_type.text}, expected=1)
+        self.assert_filter(data={"label": "negative"}, expected=0)
+
+
+class TestLabelFilterByProjectType(TestFilterMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.SEQUENCE_LABELING)
+        self.prepare(project=self.project)
+        self.request.parser_context = {"view": MagicMock(project=self.project.item)}
+        self.label_type = mommy.make("SpanType", project=self.project.item, text="person")
+        mommy.make("Span", example=self.example, label=self.label_type, start_offset=0, end_offset=1)
+        make_doc(self.project.item)
+
+    def test_search_only_tables_of_project_type(self):
+        f = ExampleFilter(data={"label": "person"}, queryset=self.queryset, request=self.request)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(list(f.qs), [self.example])
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        self.assertIn("labels_span", sql)
+        for table in ("labels_category", "labels_relation", "labels_boundingbox", "labels_segmentation"):
+            self.assertNotIn(table, sql)
+
+    def test_does_not_return_duplicates(self):
+        mommy.make("Span", example=self.example, label=self.label_type, start_offset=2, end_offset=3)
+        self.assert_filter(data={"label": "person"}, expected=1)
+
+    def test_does_not_match_label_of_another_project(self):
+        other = prepare_project(task=ProjectType.SEQUENCE_LABELING)
+        mommy.make("SpanType", project=other.item, text="place")
+        self.assert_filter(data={"label": "place"}, expected=0)
+
 
 class TestExampleFilterOnCollaborative(TestFilterMixin):
     def setUp(self):
@@ -1,7 +1,11 @@
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection
 from django.test import TestCase
 from model_mommy import mommy
 
-from examples.models import ExampleState
+from examples.models import Example, ExampleState
 from projects.models import ProjectType
 from projects.tests.utils import prepare_project
 
@@ -69,3 +73,38 @@ class TestExample(TestCase):
         project = prepare_project(ProjectType.IMAGE_CLASSIFICATION)
         example = mommy.make("Example", project=project.item)
         self.assertEqual(str(example.filename), example.data)
+
+    def test_comment_count_follows_new_comments(self):
+        project = prepare_project(ProjectType.SEQUENCE_LABELING)
+        example = mommy.make("Example", project=project.item)
+        self.assertEqual(example.comment_count, 0)
+        mommy.make("Comment", example=example, user=project.admin)
+        self.assertEqual(example.comment_count, 1)
+
+
+class TestExampleManager(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.SEQUENCE_LABELING)
+
+    def make_examples(self):
+        return [Example(project=self.project.item, text=f"example {i}") for i in range(3)]
+
+    def assert_saved(self, examples):
+        saved = Example.objects.in_bulk(field_name="uuid")
+        self.assertEqual([example.id for example in examples], [saved[example.uuid].id for example in examples])
+
+    @skipUnless(connection.features.can_return_rows_from_bulk_insert, "Requires INSERT ... RETURNING.")
+    def test_bulk_create_returns_ids_in_one_query(self):
+        examples = self.make_examples()
+        with self.assertNumQueries(1):
+            examples = Example.objects.bulk_create(examples)
+        self.assert_saved(examples)
+
+    @patch.object(type(connection.features), "can_return_rows_from_bulk_insert", False)
+    def test_bulk_create_reads_ids_without_returning(self):
+        examples = Example.objects.bulk_create(self.make_examples())
+        self.assert_saved(examples)
+
+    def test_bulk_create_ignoring_conflicts_reads_ids(self):
+        examples = Example.objects.bulk_create(self.make_examples(), ignore_conflicts=True)
+        self.assert_saved(examples)
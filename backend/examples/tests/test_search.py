@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from api.tests.utils import CRUDMixin
+from examples.models import Example
+from examples.search import PostgresSearchBackend
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestExampleSearch(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(task=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.url = reverse(viewname="example_list", args=[self.project.item.id])
+        self.once = self.make("The quick brown fox")
+        self.twice = self.make("Quick fox, brown fox, brown fox")
+        self.other = self.make("Lazy dog", filename="foxes.txt")
+
+    def make(self, text, filename="."):
+        return Example.objects.create(project=self.project.item, text=text, filename=filename)
+
+    def search(self, query, **params):
+        self.client.force_login(self.project.admin)
+        response = self.client.get(self.url, data={"q": query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.json()["results"]]
+
+    def test_match_every_term(self):
+        self.assertEqual(set(self.search("quick fox")), {self.once.id, self.twice.id})
+        self.assertEqual(self.search("quick dog"), [])
+
+    def test_match_prefix_and_filename(self):
+        self.assertEqual(set(self.search("fox")), {self.once.id, self.twice.id, self.other.id})
+        self.assertEqual(self.search("laz"), [self.other.id])
+
+    def test_rank_better_matches_first(self):
+        self.assertEqual(self.search("fox brown")[0], self.twice.id)
+
+    def test_keep_ordering_param(self):
+        self.assertEqual(self.search("fox brown", ordering="-created_at"), [self.twice.id, self.once.id])
+
+    def test_ignore_punctuation(self):
+        self.assertEqual(self.search('"fox"! *'), self.search("fox"))
+        self.assertEqual(len(self.search("!!!", limit=10)), 3)
+
+    def test_follow_updates_and_deletions(self):
+        self.once.text = "A slow turtle"
+        self.once.save()
+        self.assertEqual(self.search("turtle"), [self.once.id])
+        self.assertNotIn(self.once.id, self.search("quick"))
+        self.twice.delete()
+        self.assertEqual(self.search("quick"), [])
+
+    def test_find_bulk_created_examples(self):
+        examples = Example.objects.bulk_create([Example(project=self.project.item, text="bulk zebra")])
+        self.assertEqual(self.search("zebra"), [examples[0].id])
+
+    def test_fall_back_to_substring_search(self):
+        with patch("examples.filters.get_search_backend", return_value=None):
+            self.assertEqual(set(self.search("ick fo")), {self.once.id, self.twice.id})
+
+    def test_postgres_query_uses_stored_vector(self):
+        queryset = PostgresSearchBackend().search(Example.objects.all(), "quick fox")
+        sql = str(queryset.query)
+        self.assertIn("examples_example.search_vector @@ to_tsquery('simple'::regconfig, quick:* & fox:*)", sql)
+        self.assertIn("ts_rank(examples_example.search_vector,", sql)
+        self.assertNotIn("to_tsvector", sql)
+        self.assertEqual(sql.count("FROM"), 1)
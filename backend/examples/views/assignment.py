@@ -1,4 +1,3 @@
-from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from pydantic import ValidationError
 from rest_framework import filters, generics, status
@@ -10,8 +9,8 @@ from examples.assignment.usecase import bulk_assign
 from examples.assignment.workload import WorkloadAllocation
 from examples.models import Assignment
 from examples.serializers import AssignmentSerializer
-from projects.models import Project
 from projects.permissions import IsProjectAdmin, IsProjectStaffAndReadOnly
+from projects.resolvers import get_project
 
 
 class AssignmentList(generics.ListCreateAPIView):
@@ -23,7 +22,7 @@ class AssignmentList(generics.ListCreateAPIView):
 
     @property
     def project(self):
-        return get_object_or_404(Project, pk=self.kwargs["project_id"])
+        return get_project(self.request, self.kwargs["project_id"])
 
     def get_queryset(self):
         queryset = self.model.objects.filter(project=self.project, assignee=self.request.user)
@@ -45,7 +44,7 @@ class ResetAssignment(APIView):
 
     @property
     def project(self):
-        return get_object_or_404(Project, pk=self.kwargs["project_id"])
+        return get_project(self.request, self.kwargs["project_id"])
 
     def delete(self, *args, **kwargs):
         Assignment.objects.filter(project=self.project).delete()
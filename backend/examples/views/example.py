@@ -1,38 +1,68 @@
-from django.shortcuts import get_object_or_404
+from django.db.models import Count, Exists, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from examples.filters import ExampleFilter
-from examples.models import Example
+from examples.filters import ExampleFilter, ExampleSearchFilter
+from examples.models import Assignment, Comment, Example, ExampleState
+from examples.pagination import ExamplePagination
 from examples.serializers import ExampleSerializer
-from projects.models import Member, Project
 from projects.permissions import IsProjectAdmin, IsProjectStaffAndReadOnly
+from projects.resolvers import get_member, get_project
 
 
 class ExampleList(generics.ListCreateAPIView):
     serializer_class = ExampleSerializer
     permission_classes = [IsAuthenticated & (IsProjectAdmin | IsProjectStaffAndReadOnly)]
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
+    filter_backends = (DjangoFilterBackend, ExampleSearchFilter, filters.OrderingFilter)
     ordering_fields = ("created_at", "updated_at", "score")
     search_fields = ("text", "filename")
     model = Example
     filterset_class = ExampleFilter
+    pagination_class = ExamplePagination
 
     @property
     def project(self):
-        return get_object_or_404(Project, pk=self.kwargs["project_id"])
+        return get_project(self.request, self.kwargs["project_id"])
 
     def get_queryset(self):
-        member = get_object_or_404(Member, project=self.project, user=self.request.user)
+        member = get_member(self.request, self.kwargs["project_id"])
+        if member is None:
+            raise Http404("No Member matches the given query.")
         if member.is_admin():
-            return self.model.objects.filter(project=self.project)
+            queryset = self.model.objects.filter(project=self.project)
+        else:
+            queryset = self.model.objects.filter(project=self.project, assignments__assignee=self.request.user)
+            if self.project.random_order:
+                queryset = queryset.order_by("assignments__id")
+        return self.annotate_serializer_fields(queryset)
+
+    def annotate_serializer_fields(self, queryset):
+        """Compute the per-example fields of the serializer in the list query."""
+        states = ExampleState.objects.filter(example=OuterRef("pk"))
+        if not self.project.collaborative_annotation:
+            states = states.filter(confirmed_by=self.request.user)
+        comments = (
+            Comment.objects.filter(example=OuterRef("pk"))
+            .order_by()
+            .values("example")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        assignments = Assignment.objects.select_related("assignee")
+        return (
+            queryset.select_related("annotations_approved_by")
+            .prefetch_related(Prefetch("assignments", queryset=assignments))
+            .annotate(is_confirmed=Exists(states), annotated_comment_count=Coalesce(Subquery(comments), 0))
+        )
 
-        queryset = self.model.objects.filter(project=self.project, assignments__assignee=self.request.user)
-        if self.project.random_order:
-            queryset = queryset.order_by("assignments__id")
-        return queryset
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["project"] = self.project
+        return context
 
     def perform_create(self, serializer):
         serializer.save(project=self.project)
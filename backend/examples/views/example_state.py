@@ -4,8 +4,8 @@ from rest_framework.permissions import IsAuthenticated
 
 from examples.models import Example, ExampleState
 from examples.serializers import ExampleStateSerializer
-from projects.models import Project
 from projects.permissions import IsProjectMember
+from projects.resolvers import get_project
 
 
 class ExampleStateList(generics.ListCreateAPIView):
@@ -14,7 +14,7 @@ class ExampleStateList(generics.ListCreateAPIView):
 
     @property
     def can_confirm_per_user(self):
-        project = get_object_or_404(Project, pk=self.kwargs["project_id"])
+        project = get_project(self.request, self.kwargs["project_id"])
         return not project.collaborative_annotation
 
     def get_queryset(self):
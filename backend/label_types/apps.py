@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class LabelTypesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "label_types"
+
+    def ready(self):
+        from . import signals
+
+        signals.connect()
@@ -0,0 +1,35 @@
+"""Cache the label types of each project by their text.
+
+Auto labeling and imports map label names to label types for every example,
+while the label types of a project rarely change. The entries are removed
+when a label type of the project is saved or deleted, and when a project is
+created, so that entries written before a project id was reused are dropped.
+"""
+from typing import Dict, Type
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import LabelType
+
+
+def _key(model: Type[LabelType], project_id: int) -> str:
+    return f"label_types:{model._meta.label_lower}:{project_id}"
+
+
+def get_label_types(model: Type[LabelType], project_id: int) -> Dict[str, LabelType]:
+    """Return the label types of the project, keyed by their text."""
+    key = _key(model, project_id)
+    label_types = cache.get(key)
+    if label_types is None:
+        label_types = {label_type.text: label_type for label_type in model.objects.filter(project=project_id)}
+        cache.set(key, label_types, timeout=settings.LABEL_TYPE_CACHE_TIMEOUT)
+    return label_types
+
+
+def forget_label_types(model: Type[LabelType], project_id: int):
+    cache.delete(_key(model, project_id))
+
+
+def forget_project_label_types(project_id: int):
+    cache.delete_many([_key(model, project_id) for model in LabelType.__subclasses__()])
@@ -0,0 +1,24 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .caches import forget_label_types, forget_project_label_types
+from .models import LabelType
+from projects.models import Project
+
+
+def forget_label_types_of_project(sender, instance, **kwargs):
+    forget_label_types(sender, instance.project_id)
+
+
+def forget_all_label_types_of_project(sender, instance, created=True, **kwargs):
+    if created:
+        forget_project_label_types(instance.id)
+
+
+def connect():
+    for model in LabelType.__subclasses__():
+        post_save.connect(forget_label_types_of_project, sender=model)
+        post_delete.connect(forget_label_types_of_project, sender=model)
+    for model in apps.get_models():
+        if issubclass(model, Project):
+            post_save.connect(forget_all_label_types_of_project, sender=model)
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import TestCase
+from model_mommy import mommy
+
+from label_types.caches import get_label_types
+from label_types.models import CategoryType, SpanType
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestLabelTypeCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        self.project_id = self.project.item.id
+        self.label_type = mommy.make("CategoryType", project=self.project.item, text="POS")
+
+    def assert_texts(self, model, texts):
+        self.assertCountEqual(get_label_types(model, self.project_id), texts)
+
+    def test_cache_label_types(self):
+        self.assertEqual(get_label_types(CategoryType, self.project_id), {"POS": self.label_type})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_label_types(CategoryType, self.project_id), {"POS": self.label_type})
+
+    def test_separate_label_type_models(self):
+        self.assert_texts(CategoryType, ["POS"])
+        self.assert_texts(SpanType, [])
+
+    def test_invalidate_on_creation(self):
+        self.assert_texts(CategoryType, ["POS"])
+        mommy.make("CategoryType", project=self.project.item, text="NEG")
+        self.assert_texts(CategoryType, ["POS", "NEG"])
+
+    def test_invalidate_on_update(self):
+        self.assert_texts(CategoryType, ["POS"])
+        self.label_type.text = "NEG"
+        self.label_type.save()
+        self.assert_texts(CategoryType, ["NEG"])
+
+    def test_invalidate_on_bulk_deletion(self):
+        self.assert_texts(CategoryType, ["POS"])
+        CategoryType.objects.filter(project=self.project_id).delete()
+        self.assert_texts(CategoryType, [])
+
+    def test_invalidate_on_project_creation(self):
+        self.assert_texts(CategoryType, ["POS"])
+        CategoryType.objects.filter(project=self.project_id).update(text="NEG")
+        self.project.item.save()
+        self.assert_texts(CategoryType, ["POS"])
+        self.project.item.delete()
+        mommy.make("TextClassificationProject", id=self.project_id, project_type=ProjectType.DOCUMENT_CLASSIFICATION)
+        self.assert_texts(CategoryType, [])
@@ -2,7 +2,6 @@ import json
 import re
 
 from django.db import IntegrityError, transaction
-from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status
 from rest_framework.exceptions import ParseError
@@ -19,12 +18,12 @@ from .serializers import (
     RelationTypeSerializer,
     SpanTypeSerializer,
 )
-from projects.models import Project
 from projects.permissions import (
     IsProjectAdmin,
     IsProjectMember,
     IsProjectStaffAndReadOnly,
 )
+from projects.resolvers import get_project
 
 
 def camel_to_snake(name):
@@ -43,7 +42,7 @@ class LabelList(generics.ListCreateAPIView):
     pagination_class = None
 
     def get_permissions(self):
-        project = get_object_or_404(Project, pk=self.kwargs["project_id"])
+        project = get_project(self.request, self.kwargs["project_id"])
         if project.allow_member_to_create_label_type and self.request.method == "POST":
             self.permission_classes = [IsAuthenticated & IsProjectMember]
         else:
@@ -0,0 +1,156 @@
+"""Create, update and delete the labels of an example in a single transaction.
+
+The labels the user can edit are fetched once, the operations are validated
+against them in memory, and the changes are written with bulk queries.
+"""
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set, Tuple, Type
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .intervals import SpanIndex
+from .models import Category, Label, Span, TextLabel
+from .serializers import LabelBatchSerializer
+from examples.models import Example
+from label_types.models import LabelType
+from metrics.signals import deferred_summaries
+from projects.models import Project
+
+
+def check_categories(categories: List[Category], project: Project):
+    counts = Counter((category.user_id, category.label_id) for category in categories)
+    if any(count > 1 for count in counts.values()):
+        raise ValidationError("The same category is given twice.")
+    if project.single_class_classification:
+        users = Counter(category.user_id for category in categories)
+        if (project.collaborative_annotation and len(categories) > 1) or any(count > 1 for count in users.values()):
+            raise ValidationError("Only one category is allowed in this project.")
+
+
+def check_spans(spans: List[Span], project: Project):
+    for span in spans:
+        if not 0 <= span.start_offset < span.end_offset:
+            raise ValidationError("The offsets must satisfy 0 <= start_offset < end_offset.")
+    index = SpanIndex(project)
+    for span in spans:
+        if not index.add(span):
+            raise ValidationError("This overlapping is not allowed in this project.")
+
+
+def check_texts(texts: List[TextLabel], project: Project):
+    counts = Counter((text.user_id, text.text) for text in texts)
+    if any(count > 1 for count in counts.values()):
+        raise ValidationError("The same text is given twice.")
+
+
+CHECKS = {Category: check_categories, Span: check_spans, TextLabel: check_texts}
+
+
+class LabelBatch:
+    """Apply a batch of label operations to an example.
+
+    Args:
+        serializer_class: the batch serializer of the label model.
+        project: the project.
+        example: the example to annotate.
+        user: the user who sends the operations.
+
+    Examples:
+        >>> batch = LabelBatch(SpanBatchSerializer, project, example, user)
+        >>> batch.apply({"create": [{"label": 1, "start_offset": 0, "end_offset": 5}], "delete": [10]})
+        {'created': [{'id': 11, ...}], 'updated': [], 'deleted': [10]}
+    """
+
+    def __init__(self, serializer_class: Type[serializers.ModelSerializer], project: Project, example: Example, user):
+        self.serializer_class = serializer_class
+        self.model: Type[Label] = serializer_class.Meta.model
+        self.project = project
+        self.example = example
+        self.user = user
+
+    def editable_labels(self):
+        labels = self.model.objects.filter(example=self.example)
+        if not self.project.collaborative_annotation:
+            labels = labels.filter(user=self.user)
+        return labels
+
+    def apply(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        operations = LabelBatchSerializer(data=data)
+        operations.is_valid(raise_exception=True)
+        operations = operations.validated_data
+        with transaction.atomic(), deferred_summaries([self.example.id]):
+            labels = {label.id: label for label in self.editable_labels()}
+            deleted = self.select(labels, operations["delete"])
+            for label_id in deleted:
+                labels.pop(label_id)
+            updated, fields = self.update(labels, operations["update"])
+            created = self.create(operations["create"])
+            self.check([*labels.values(), *created])
+
+            self.model.objects.filter(id__in=deleted).delete()
+            if updated:
+                self.model.objects.bulk_update(updated, fields=[*fields, "updated_at"])
+            try:
+                created = self.model.objects.bulk_create(created)
+            except IntegrityError:
+                raise ValidationError("The labels conflict with existing ones.")
+        return {
+            "created": self.serializer_class(created, many=True).data,
+            "updated": self.serializer_class(updated, many=True).data,
+            "deleted": deleted,
+        }
+
+    @staticmethod
+    def select(labels: Dict[int, Label], ids: Iterable[int]) -> List[int]:
+        unknown = [label_id for label_id in ids if label_id not in labels]
+        if unknown:
+            raise ValidationError({"detail": "These labels cannot be edited.", "ids": unknown})
+        return list(dict.fromkeys(ids))
+
+    def update(self, labels: Dict[int, Label], items: List[Dict[str, Any]]) -> Tuple[List[Label], Set[str]]:
+        """Apply the updates to the labels in memory, and return them with the updated fields."""
+        instances = [labels.get(item.get("id")) for item in items]
+        unknown = [item.get("id") for item, instance in zip(items, instances) if instance is None]
+        if unknown:
+            raise ValidationError({"detail": "These labels cannot be edited.", "ids": unknown})
+        now = timezone.now()
+        fields: Set[str] = set()
+        for instance, item in zip(instances, items):
+            serializer = self.serializer_class(instance, data=item, partial=True)
+            serializer.is_valid(raise_exception=True)
+            for field, value in serializer.validated_data.items():
+                setattr(instance, field, value)
+                fields.add(field)
+            instance.updated_at = now
+        return list(dict.fromkeys(instances)), fields
+
+    def create(self, items: List[Dict[str, Any]]) -> List[Label]:
+        serializer = self.serializer_class(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+        return [self.model(example=self.example, user=self.user, **data) for data in serializer.validated_data]
+
+    def check(self, labels: List[Label]):
+        """Check the labels of the example as they will be after the batch."""
+        valid_ids: Dict[Any, Set[int]] = {}
+        for field in self.model._meta.concrete_fields:
+            related_model = field.related_model
+            if related_model is None or not (issubclass(related_model, LabelType) or related_model is Span):
+                continue
+            if related_model not in valid_ids:
+                if related_model is Span:
+                    queryset = Span.objects.filter(example=self.example)
+                else:
+                    queryset = related_model.objects.filter(project=self.project)
+                valid_ids[related_model] = set(queryset.values_list("id", flat=True))
+            self.check_references(labels, field, valid_ids[related_model])
+        if self.model in CHECKS:
+            CHECKS[self.model](labels, self.project)
+
+    @staticmethod
+    def check_references(labels: List[Label], field, ids: Set[int]):
+        invalid = sorted({getattr(label, field.attname) for label in labels} - ids)
+        if invalid:
+            raise ValidationError({"detail": f"Invalid {field.name}.", "ids": invalid})
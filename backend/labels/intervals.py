@@ -0,0 +1,88 @@
+"""Check the overlapping of spans in memory.
+
+The spans are indexed once per batch, so that each check is a bisection on
+sorted offsets instead of a query or a scan over every span of the example.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List
+
+from projects.models import Project
+
+
+class IntervalSet:
+    """A set of half-open intervals, stored as sorted disjoint ranges.
+
+    Examples:
+        >>> intervals = IntervalSet()
+        >>> intervals.add(0, 5)
+        True
+        >>> intervals.add(3, 8)
+        False
+        >>> intervals.add(5, 8)
+        True
+    """
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        i = bisect_right(self.ends, start)
+        return i < len(self.starts) and self.starts[i] < end
+
+    def insert(self, start: int, end: int):
+        """Insert an interval, merging it with the ranges it overlaps or touches."""
+        i = bisect_left(self.ends, start)
+        j = bisect_right(self.starts, end)
+        if i < j:
+            start = min(start, self.starts[i])
+            end = max(end, self.ends[j - 1])
+        self.starts[i:j] = [start]
+        self.ends[i:j] = [end]
+
+    def add(self, start: int, end: int) -> bool:
+        """Insert an interval unless it overlaps the set, and return whether it was inserted."""
+        if self.overlaps(start, end):
+            return False
+        self.insert(start, end)
+        return True
+
+
+class SpanIndex:
+    """The spans of one or more examples, grouped as the project checks their overlapping.
+
+    Spans never overlap when the project allows it. Otherwise, the spans of an
+    example must not overlap each other in collaborative projects, and must not
+    overlap the other spans of the same user in the others.
+
+    Args:
+        project: the project of the examples.
+        spans: the spans already saved.
+    """
+
+    def __init__(self, project: Project, spans: Iterable = ()):
+        self.allow_overlapping = getattr(project, "allow_overlapping", False)
+        self.collaborative = project.collaborative_annotation
+        self.groups: Dict[Hashable, IntervalSet] = defaultdict(IntervalSet)
+        if not self.allow_overlapping:
+            for span in spans:
+                self.group(span).insert(span.start_offset, span.end_offset)
+
+    def group(self, span) -> IntervalSet:
+        user_id = None if self.collaborative else span.user_id
+        return self.groups[span.example_id, user_id]
+
+    def overlaps(self, span) -> bool:
+        if self.allow_overlapping:
+            return False
+        return self.group(span).overlaps(span.start_offset, span.end_offset)
+
+    def add(self, span) -> bool:
+        """Index the span unless it overlaps the indexed ones, and return whether it was indexed."""
+        if self.allow_overlapping:
+            return True
+        return self.group(span).add(span.start_offset, span.end_offset)
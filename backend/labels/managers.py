@@ -1,5 +1,7 @@
 from django.db.models import Count, Manager
 
+from .intervals import SpanIndex
+
 
 class LabelManager(Manager):
     label_type_field = "label"
@@ -44,6 +46,17 @@ class LabelManager(Manager):
     def filter_annotatable_labels(self, labels, project):
         return [label for label in labels if self.can_annotate(label, project)]
 
+    def filter_unique_labels(self, labels, key):
+        """Return the labels whose key is used neither by a saved label nor by a previous label in the list."""
+        example_ids = {label.example_id for label in labels}
+        seen = {key(label) for label in self.filter(example_id__in=example_ids)}
+        unique = []
+        for label in labels:
+            if key(label) not in seen:
+                seen.add(key(label))
+                unique.append(label)
+        return unique
+
 
 class CategoryManager(LabelManager):
     def can_annotate(self, label, project) -> bool:
@@ -54,17 +67,32 @@ class CategoryManager(LabelManager):
         else:
             return not categories.filter(label=label.label).exists()
 
+    def filter_annotatable_labels(self, labels, project):
+        def key(category):
+            user_id = None if project.collaborative_annotation else category.user_id
+            if project.single_class_classification:
+                return category.example_id, user_id
+            return category.example_id, user_id, category.label_id
+
+        return self.filter_unique_labels(labels, key)
+
 
 class SpanManager(LabelManager):
     def can_annotate(self, label, project) -> bool:
         overlapping = getattr(project, "allow_overlapping", False)
-        spans = self.get_labels(label, project)
         if overlapping:
             return True
-        for span in spans:
-            if span.is_overlapping(label):
-                return False
-        return True
+        index = SpanIndex(project, self.get_labels(label, project))
+        return not index.overlaps(label)
+
+    def filter_annotatable_labels(self, labels, project):
+        """Return the spans that overlap neither the saved spans nor the previous ones in the list."""
+        if getattr(project, "allow_overlapping", False):
+            return labels
+        example_ids = {label.example_id for label in labels}
+        spans = self.filter(example_id__in=example_ids).only("example", "user", "start_offset", "end_offset")
+        index = SpanIndex(project, spans)
+        return [label for label in labels if index.add(label)]
 
 
 class TextLabelManager(LabelManager):
@@ -75,6 +103,13 @@ class TextLabelManager(LabelManager):
                 return False
         return True
 
+    def filter_annotatable_labels(self, labels, project):
+        def key(text):
+            user_id = None if project.collaborative_annotation else text.user_id
+            return text.example_id, user_id, text.text
+
+        return self.filter_unique_labels(labels, key)
+
 
 class RelationManager(LabelManager):
     label_type_field = "type"
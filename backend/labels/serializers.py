@@ -111,3 +111,32 @@ class SegmentationSerializer(serializers.ModelSerializer):
             "points",
         )
         read_only_fields = ("user",)
+
+
+# The batch serializers take the ids of related objects as they are, without a query per id.
+# LabelBatch checks them against the project and the example at once.
+class CategoryBatchSerializer(CategorySerializer):
+    example = serializers.PrimaryKeyRelatedField(read_only=True)
+    label = serializers.IntegerField(source="label_id")
+
+
+class SpanBatchSerializer(SpanSerializer):
+    example = serializers.PrimaryKeyRelatedField(read_only=True)
+    label = serializers.IntegerField(source="label_id")
+
+
+class TextLabelBatchSerializer(TextLabelSerializer):
+    example = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class RelationBatchSerializer(RelationSerializer):
+    example = serializers.PrimaryKeyRelatedField(read_only=True)
+    type = serializers.IntegerField(source="type_id")
+    from_id = serializers.IntegerField(source="from_id_id")
+    to_id = serializers.IntegerField(source="to_id_id")
+
+
+class LabelBatchSerializer(serializers.Serializer):
+    create = serializers.ListField(child=serializers.DictField(), default=list)
+    update = serializers.ListField(child=serializers.DictField(), default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), default=list)
@@ -0,0 +1,190 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from api.tests.utils import CRUDMixin
+from examples.tests.utils import make_doc
+from labels.models import Category, Relation, Span, TextLabel
+from metrics.models import LabelSummary
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+from users.tests.utils import make_user
+
+
+class TestCategoryBatch(CRUDMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        cls.example = make_doc(cls.project.item)
+        cls.labels = mommy.make("CategoryType", project=cls.project.item, _quantity=3)
+        cls.user = cls.project.annotator
+        cls.url = reverse(viewname="category_bulk", args=[cls.project.item.id, cls.example.id])
+
+    def make_category(self, label, user=None):
+        return mommy.make("Category", example=self.example, label=label, user=user or self.user)
+
+    def test_create_update_and_delete_in_one_request(self):
+        updated = self.make_category(self.labels[0])
+        deleted = self.make_category(self.labels[1])
+        self.data = {
+            "create": [{"label": self.labels[1].id}],
+            "update": [{"id": updated.id, "label": self.labels[2].id}],
+            "delete": [deleted.id],
+        }
+        response = self.assert_create(self.user, status.HTTP_200_OK)
+        self.assertEqual(response.data["deleted"], [deleted.id])
+        self.assertEqual([label["label"] for label in response.data["updated"]], [self.labels[2].id])
+        self.assertEqual([label["label"] for label in response.data["created"]], [self.labels[1].id])
+        labels = Category.objects.filter(example=self.example).values_list("label", flat=True)
+        self.assertCountEqual(labels, [self.labels[1].id, self.labels[2].id])
+
+    def test_cannot_edit_labels_of_another_user(self):
+        category = self.make_category(self.labels[0], user=self.project.admin)
+        self.data = {"delete": [category.id]}
+        self.assert_create(self.user, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Category.objects.filter(id=category.id).exists())
+
+    def test_reject_label_type_of_another_project(self):
+        other = mommy.make("CategoryType")
+        self.data = {"create": [{"label": other.id}]}
+        self.assert_create(self.user, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Category.objects.exists())
+
+    def test_reject_duplicated_category(self):
+        self.make_category(self.labels[0])
+        self.data = {"create": [{"label": self.labels[0].id}]}
+        self.assert_create(self.user, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Category.objects.count(), 1)
+
+    def test_allow_replacing_category_in_single_class_project(self):
+        self.project.item.single_class_classification = True
+        self.project.item.save()
+        category = self.make_category(self.labels[0])
+        self.data = {"create": [{"label": self.labels[1].id}]}
+        self.assert_create(self.user, status.HTTP_400_BAD_REQUEST)
+        self.data["delete"] = [category.id]
+        self.assert_create(self.user, status.HTTP_200_OK)
+        self.assertEqual(Category.objects.get().label, self.labels[1])
+
+    def test_keep_label_summary_up_to_date(self):
+        category = self.make_category(self.labels[0])
+        self.data = {"create": [{"label": self.labels[1].id}], "delete": [category.id]}
+        self.assert_create(self.user, status.HTTP_200_OK)
+        summaries = LabelSummary.objects.filter(example=self.example, label_count__gt=0)
+        self.assertEqual([summary.label_type_id for summary in summaries], [self.labels[1].id])
+
+    def test_number_of_queries_does_not_depend_on_batch_size(self):
+        def count_queries(labels):
+            Category.objects.all().delete()
+            self.data = {"create": [{"label": label.id} for label in labels]}
+            with CaptureQueriesContext(connection) as context:
+                self.assert_create(self.user, status.HTTP_200_OK)
+            return len(context)
+
+        count_queries(self.labels[:1])  # warm up the caches
+        self.assertEqual(count_queries(self.labels[:1]), count_queries(self.labels))
+
+    def test_denies_non_project_member(self):
+        self.data = {"create": [{"label": self.labels[0].id}]}
+        self.assert_create(make_user(), status.HTTP_403_FORBIDDEN)
+
+    def test_denies_unauthenticated_user(self):
+        self.data = {"create": [{"label": self.labels[0].id}]}
+        self.assert_create(expected=status.HTTP_403_FORBIDDEN)
+
+
+class TestSpanBatch(CRUDMixin):
+    overlapping = False
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = prepare_project(ProjectType.SEQUENCE_LABELING, allow_overlapping=cls.overlapping)
+        cls.example = make_doc(cls.project.item)
+        cls.label = mommy.make("SpanType", project=cls.project.item)
+        cls.user = cls.project.annotator
+        cls.url = reverse(viewname="span_bulk", args=[cls.project.item.id, cls.example.id])
+
+    def span(self, start_offset, end_offset):
+        return {"label": self.label.id, "start_offset": start_offset, "end_offset": end_offset}
+
+    def test_create_spans(self):
+        self.data = {"create": [self.span(0, 3), self.span(3, 5)]}
+        self.assert_create(self.user, status.HTTP_200_OK)
+        self.assertEqual(Span.objects.count(), 2)
+
+    def test_reject_invalid_offsets(self):
+        self.data = {"create": [self.span(3, 3)]}
+        self.assert_create(self.user, status.HTTP_400_BAD_REQUEST)
+
+    def test_overlapping_spans(self):
+        self.data = {"create": [self.span(0, 3), self.span(2, 5)]}
+        if self.overlapping:
+            self.assert_create(self.user, status.HTTP_200_OK)
+            self.assertEqual(Span.objects.count(), 2)
+        else:
+            self.assert_create(self.user, status.HTTP_400_BAD_REQUEST)
+            self.assertFalse(Span.objects.exists())
+
+    def test_allow_moving_span_over_deleted_one(self):
+        span = mommy.make("Span", example=self.example, label=self.label, user=self.user, start_offset=0, end_offset=3)
+        moved = mommy.make("Span", example=self.example, label=self.label, user=self.user, start_offset=5, end_offset=8)
+        self.data = {"update": [{"id": moved.id, "start_offset": 1, "end_offset": 4}], "delete": [span.id]}
+        self.assert_create(self.user, status.HTTP_200_OK)
+        moved.refresh_from_db()
+        self.assertEqual((moved.start_offset, moved.end_offset), (1, 4))
+
+    def test_allow_overlapping_spans_of_other_users(self):
+        mommy.make(
+            "Span", example=self.example, label=self.label, user=self.project.admin, start_offset=0, end_offset=3
+        )
+        self.data = {"create": [self.span(0, 3)]}
+        self.assert_create(self.user, status.HTTP_200_OK)
+
+
+class TestOverlappingSpanBatch(TestSpanBatch):
+    overlapping = True
+
+
+class TestTextLabelBatch(CRUDMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = prepare_project(ProjectType.SEQ2SEQ)
+        cls.example = make_doc(cls.project.item)
+        cls.user = cls.project.annotator
+        cls.url = reverse(viewname="text_bulk", args=[cls.project.item.id, cls.example.id])
+
+    def test_create_and_update_texts(self):
+        text = mommy.make("TextLabel", example=self.example, user=self.user, text="foo")
+        self.data = {"create": [{"text": "bar"}], "update": [{"id": text.id, "text": "baz"}]}
+        self.assert_create(self.user, status.HTTP_200_OK)
+        self.assertCountEqual(TextLabel.objects.values_list("text", flat=True), ["bar", "baz"])
+
+    def test_reject_duplicated_text(self):
+        self.data = {"create": [{"text": "foo"}, {"text": "foo"}]}
+        self.assert_create(self.user, status.HTTP_400_BAD_REQUEST)
+
+
+class TestRelationBatch(CRUDMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = prepare_project(ProjectType.SEQUENCE_LABELING, use_relation=True)
+        cls.example = make_doc(cls.project.item)
+        cls.user = cls.project.annotator
+        cls.spans = [
+            mommy.make("Span", example=cls.example, user=cls.user, start_offset=i, end_offset=i + 1) for i in range(2)
+        ]
+        cls.relation_type = mommy.make("RelationType", project=cls.project.item)
+        cls.url = reverse(viewname="relation_bulk", args=[cls.project.item.id, cls.example.id])
+
+    def test_create_relation(self):
+        relation = {"type": self.relation_type.id, "from_id": self.spans[0].id, "to_id": self.spans[1].id}
+        self.data = {"create": [relation]}
+        self.assert_create(self.user, status.HTTP_200_OK)
+        self.assertEqual(Relation.objects.count(), 1)
+
+    def test_reject_span_of_another_example(self):
+        span = mommy.make("Span", example=make_doc(self.project.item), user=self.user, start_offset=0, end_offset=1)
+        self.data = {"create": [{"type": self.relation_type.id, "from_id": span.id, "to_id": self.spans[1].id}]}
+        self.assert_create(self.user, status.HTTP_400_BAD_REQUEST)
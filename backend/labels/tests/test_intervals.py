@@ -0,0 +1,69 @@
+from django.test import SimpleTestCase
+from model_mommy import mommy
+
+from labels.intervals import IntervalSet, SpanIndex
+from labels.models import Span
+
+
+class TestIntervalSet(SimpleTestCase):
+    def setUp(self):
+        self.intervals = IntervalSet()
+        self.intervals.insert(5, 10)
+
+    def test_overlaps(self):
+        for start, end in [(5, 10), (5, 11), (4, 10), (6, 9), (9, 15), (0, 6)]:
+            self.assertTrue(self.intervals.overlaps(start, end))
+
+    def test_does_not_overlap_adjacent_intervals(self):
+        for start, end in [(0, 5), (10, 15), (0, 1), (20, 25)]:
+            self.assertFalse(self.intervals.overlaps(start, end))
+
+    def test_add_rejects_overlapping_interval(self):
+        self.assertFalse(self.intervals.add(8, 12))
+        self.assertTrue(self.intervals.add(10, 12))
+        self.assertTrue(self.intervals.overlaps(11, 13))
+
+    def test_insert_merges_overlapping_intervals(self):
+        self.intervals.insert(20, 30)
+        self.intervals.insert(8, 22)
+        self.assertEqual(len(self.intervals), 1)
+        self.assertFalse(self.intervals.overlaps(0, 5))
+        self.assertTrue(self.intervals.overlaps(29, 31))
+
+    def test_insert_keeps_overlapping_inputs(self):
+        self.intervals.insert(0, 20)
+        self.intervals.insert(2, 3)
+        self.assertTrue(self.intervals.overlaps(15, 16))
+
+
+class TestSpanIndex(SimpleTestCase):
+    def make_project(self, allow_overlapping=False, collaborative_annotation=False):
+        return mommy.prepare(
+            "SequenceLabelingProject",
+            allow_overlapping=allow_overlapping,
+            collaborative_annotation=collaborative_annotation,
+        )
+
+    def span(self, start_offset, end_offset, example_id=1, user_id=1):
+        return Span(example_id=example_id, user_id=user_id, start_offset=start_offset, end_offset=end_offset)
+
+    def test_group_spans_by_user(self):
+        index = SpanIndex(self.make_project(), [self.span(0, 5)])
+        self.assertTrue(index.overlaps(self.span(2, 3)))
+        self.assertFalse(index.overlaps(self.span(2, 3, user_id=2)))
+        self.assertFalse(index.overlaps(self.span(2, 3, example_id=2)))
+
+    def test_share_spans_in_collaborative_project(self):
+        index = SpanIndex(self.make_project(collaborative_annotation=True), [self.span(0, 5)])
+        self.assertTrue(index.overlaps(self.span(2, 3, user_id=2)))
+        self.assertFalse(index.overlaps(self.span(2, 3, example_id=2)))
+
+    def test_allow_overlapping(self):
+        index = SpanIndex(self.make_project(allow_overlapping=True), [self.span(0, 5)])
+        self.assertTrue(index.add(self.span(2, 3)))
+        self.assertTrue(index.add(self.span(2, 3)))
+
+    def test_add_indexes_span(self):
+        index = SpanIndex(self.make_project())
+        self.assertTrue(index.add(self.span(0, 5)))
+        self.assertFalse(index.add(self.span(4, 6)))
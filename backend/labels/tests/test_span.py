@@ -29,6 +29,16 @@ class TestSpanLabeling(abc.ABC, TestCase):
         can_annotate = Span.objects.can_annotate(self.span, self.project.item)
         self.assertTrue(can_annotate)
 
+    def test_filter_spans_overlapping_each_other(self):
+        spans = [
+            Span(example=self.example, label=self.label_type, user=self.user, start_offset=start, end_offset=end)
+            for start, end in [(0, 5), (3, 8), (5, 8)]
+        ]
+        with self.assertNumQueries(0 if self.overlapping else 1):
+            labels = Span.objects.filter_annotatable_labels(spans, self.project.item)
+        expected = spans if self.overlapping else [spans[0], spans[2]]
+        self.assertEqual(labels, expected)
+
 
 class NonCollaborativeMixin:
     def test_allow_another_user_to_annotate_same_span(self):
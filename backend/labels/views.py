@@ -7,15 +7,21 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from .batch import LabelBatch
 from .permissions import CanEditLabel
 from .serializers import (
     BoundingBoxSerializer,
+    CategoryBatchSerializer,
     CategorySerializer,
+    RelationBatchSerializer,
     RelationSerializer,
     SegmentationSerializer,
+    SpanBatchSerializer,
     SpanSerializer,
+    TextLabelBatchSerializer,
     TextLabelSerializer,
 )
+from examples.models import Example
 from labels.models import (
     BoundingBox,
     Category,
@@ -25,8 +31,8 @@ from labels.models import (
     Span,
     TextLabel,
 )
-from projects.models import Project
 from projects.permissions import IsProjectMember
+from projects.resolvers import get_project
 
 
 class BaseListAPI(generics.ListCreateAPIView):
@@ -37,7 +43,7 @@ class BaseListAPI(generics.ListCreateAPIView):
 
     @property
     def project(self):
-        return get_object_or_404(Project, pk=self.kwargs["project_id"])
+        return get_project(self.request, self.kwargs["project_id"])
 
     def get_queryset(self):
         queryset = self.label_class.objects.filter(example=self.kwargs["example_id"])
@@ -68,7 +74,7 @@ class BaseDetailAPI(generics.RetrieveUpdateDestroyAPIView):
 
     @property
     def project(self):
-        return get_object_or_404(Project, pk=self.kwargs["project_id"])
+        return get_project(self.request, self.kwargs["project_id"])
 
     def get_permissions(self):
         if self.project.collaborative_annotation:
@@ -78,6 +84,25 @@ class BaseDetailAPI(generics.RetrieveUpdateDestroyAPIView):
         return super().get_permissions()
 
 
+class BaseBatchAPI(generics.GenericAPIView):
+    """Create, update and delete the labels of an example in one request.
+
+    The body is `{"create": [label, ...], "update": [label with id, ...], "delete": [id, ...]}`.
+    """
+
+    permission_classes = [IsAuthenticated & IsProjectMember]
+    swagger_schema = None
+
+    @property
+    def project(self):
+        return get_project(self.request, self.kwargs["project_id"])
+
+    def post(self, request, *args, **kwargs):
+        example = get_object_or_404(Example, pk=self.kwargs["example_id"], project=self.project)
+        batch = LabelBatch(self.get_serializer_class(), self.project, example, request.user)
+        return Response(batch.apply(request.data), status=status.HTTP_200_OK)
+
+
 class CategoryListAPI(BaseListAPI):
     label_class = Category
     serializer_class = CategorySerializer
@@ -93,6 +118,10 @@ class CategoryDetailAPI(BaseDetailAPI):
     serializer_class = CategorySerializer
 
 
+class CategoryBatchAPI(BaseBatchAPI):
+    serializer_class = CategoryBatchSerializer
+
+
 class SpanListAPI(BaseListAPI):
     label_class = Span
     serializer_class = SpanSerializer
@@ -103,6 +132,10 @@ class SpanDetailAPI(BaseDetailAPI):
     serializer_class = SpanSerializer
 
 
+class SpanBatchAPI(BaseBatchAPI):
+    serializer_class = SpanBatchSerializer
+
+
 class TextLabelListAPI(BaseListAPI):
     label_class = TextLabel
     serializer_class = TextLabelSerializer
@@ -113,6 +146,10 @@ class TextLabelDetailAPI(BaseDetailAPI):
     serializer_class = TextLabelSerializer
 
 
+class TextLabelBatchAPI(BaseBatchAPI):
+    serializer_class = TextLabelBatchSerializer
+
+
 class RelationList(BaseListAPI):
     label_class = Relation
     serializer_class = RelationSerializer
@@ -123,6 +160,10 @@ class RelationDetail(BaseDetailAPI):
     serializer_class = RelationSerializer
 
 
+class RelationBatchAPI(BaseBatchAPI):
+    serializer_class = RelationBatchSerializer
+
+
 class BoundingBoxListAPI(BaseListAPI):
     label_class = BoundingBox
     serializer_class = BoundingBoxSerializer
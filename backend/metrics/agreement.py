@@ -0,0 +1,301 @@
+"""Inter-annotator agreement.
+
+Annotations are loaded as (example, user, label) triples into NumPy arrays and
+every statistic is computed with vectorized operations on them.
+
+Project-level statistics treat the labels as the categories of a nominal scale
+and assume one label per annotator and example. Per-label statistics treat each
+label as a binary decision (whether an annotator who annotated the example
+used the label), so they are also valid for multi-label and span annotations.
+"""
+import dataclasses
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.db.models import QuerySet
+
+
+@dataclasses.dataclass
+class Annotations:
+    """Deduplicated annotations, encoded as indices.
+
+    Attributes:
+        items: the index of the example of each annotation.
+        coders: the index of the annotator of each annotation.
+        values: the index of the label of each annotation.
+        labels: the label ids. `values` indexes this list.
+        n_items: the number of examples.
+        n_coders: the number of annotators.
+    """
+
+    items: np.ndarray
+    coders: np.ndarray
+    values: np.ndarray
+    labels: List[Any]
+    n_items: int
+    n_coders: int
+
+    @classmethod
+    def from_triples(cls, triples: np.ndarray) -> "Annotations":
+        """Encode (example, user, label) triples.
+
+        Args:
+            triples: an integer array of shape (n, 3).
+        """
+        triples = np.unique(triples.reshape(-1, 3), axis=0)
+        examples, items = np.unique(triples[:, 0], return_inverse=True)
+        users, coders = np.unique(triples[:, 1], return_inverse=True)
+        labels, values = np.unique(triples[:, 2], return_inverse=True)
+        return cls(
+            items=items.reshape(-1),
+            coders=coders.reshape(-1),
+            values=values.reshape(-1),
+            labels=labels.tolist(),
+            n_items=len(examples),
+            n_coders=len(users),
+        )
+
+    @property
+    def n_labels(self) -> int:
+        return len(self.labels)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def load_annotations(label_model, examples: QuerySet, label_field: str = "label") -> Annotations:
+    """Load the annotations of the examples with a single query.
+
+    Args:
+        label_model: the label model, e.g. Category.
+        examples: the example queryset.
+        label_field: the field referring to the label type.
+    """
+    rows = (
+        label_model.objects.filter(example__in=examples.values("id"))
+        .values_list("example_id", "user_id", f"{label_field}_id")
+        .order_by()
+    )
+    flat = np.fromiter(chain.from_iterable(rows.iterator(chunk_size=10000)), dtype=np.int64)
+    return Annotations.from_triples(flat)
+
+
+def _cross_join(left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the index pairs (i, j) such that left[i] == right[j]."""
+    order = np.argsort(right, kind="stable")
+    sorted_right = right[order]
+    start = np.searchsorted(sorted_right, left, side="left")
+    end = np.searchsorted(sorted_right, left, side="right")
+    counts = end - start
+    total = int(counts.sum())
+    left_index = np.repeat(np.arange(len(left)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    right_index = order[np.repeat(start, counts) + offsets]
+    return left_index, right_index
+
+
+def _count(keys: np.ndarray, size: int, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    return np.bincount(keys, weights=weights, minlength=size).astype(np.float64)
+
+
+def _sparse_count(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the distinct keys, sorted, and their counts."""
+    keys, counts = np.unique(keys, return_counts=True)
+    return keys, counts.astype(np.float64)
+
+
+def _lookup(counts: Tuple[np.ndarray, np.ndarray], keys: np.ndarray) -> np.ndarray:
+    """Return the counts of the keys in the result of `_sparse_count`, or 0 for the missing keys."""
+    known, values = counts
+    if len(known) == 0:
+        return np.zeros(len(keys))
+    index = np.minimum(np.searchsorted(known, keys), len(known) - 1)
+    return np.where(known[index] == keys, values[index], 0)
+
+
+def _divide(numerator, denominator):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator != 0, numerator / np.where(denominator != 0, denominator, 1), np.nan)
+
+
+def _nanmean(values: np.ndarray, axis=None):
+    valid = ~np.isnan(values)
+    total = np.where(valid, values, 0).sum(axis=axis)
+    return _divide(total, valid.sum(axis=axis))
+
+
+class AgreementStatistics:
+    """Compute Cohen's kappa, Fleiss' kappa and Krippendorff's alpha.
+
+    Cohen's kappa is defined for two annotators, so it is averaged over every
+    pair of annotators who annotated at least one example in common.
+    """
+
+    def __init__(self, annotations: Annotations):
+        self.annotations = annotations
+        a = annotations
+        # the annotators who annotated each example
+        rated = np.unique(a.items * a.n_coders + a.coders)
+        self.rated_items = rated // a.n_coders
+        self.rated_coders = rated % a.n_coders
+        # the number of annotators per example
+        self.raters = _count(self.rated_items, a.n_items)
+        # the number of annotators who used each label per example, stored sparsely
+        cells, votes = np.unique(a.items * a.n_labels + a.values, return_counts=True)
+        self.cell_items = cells // max(a.n_labels, 1)
+        self.cell_values = cells % max(a.n_labels, 1)
+        self.cell_votes = votes.astype(np.float64)
+
+    def cohen_kappa(self) -> Tuple[float, np.ndarray]:
+        """Return the mean pairwise Cohen's kappa of the project and of each label."""
+        a = self.annotations
+        n_coders, n_labels = a.n_coders, a.n_labels
+        if n_coders < 2 or n_labels == 0:
+            return np.nan, np.full(n_labels, np.nan)
+
+        # The counts are kept sparse, keyed by (label, first annotator, second annotator), since most
+        # labels are not used by a pair of annotators.
+
+        # the number of examples annotated by both annotators
+        left, right = _cross_join(self.rated_items, self.rated_items)
+        joint = _sparse_count(self.rated_coders[left] * n_coders + self.rated_coders[right])
+
+        # the number of joint examples on which the first annotator used the label
+        left, right = _cross_join(a.items, self.rated_items)
+        used = _sparse_count((a.values[left] * n_coders + a.coders[left]) * n_coders + self.rated_coders[right])
+
+        # the number of joint examples on which both annotators used the label
+        left, right = _cross_join(a.items * n_labels + a.values, a.items * n_labels + a.values)
+        both = _sparse_count((a.values[left] * n_coders + a.coders[left]) * n_coders + a.coders[right])
+
+        # The kappa of a label is undefined for the pairs in which neither annotator used it,
+        # so only the labels used by either annotator of a pair are evaluated.
+        values, first, second = used[0] // (n_coders * n_coders), used[0] // n_coders % n_coders, used[0] % n_coders
+        distinct = first != second
+        low, high = np.minimum(first, second)[distinct], np.maximum(first, second)[distinct]
+        cells = np.unique((values[distinct] * n_coders + low) * n_coders + high)
+        values, low, high = cells // (n_coders * n_coders), cells // n_coders % n_coders, cells % n_coders
+
+        n_joint = _lookup(joint, low * n_coders + high)
+        p_first = _lookup(used, cells) / n_joint
+        p_second = _lookup(used, (values * n_coders + high) * n_coders + low) / n_joint
+        p_both = _lookup(both, cells) / n_joint
+
+        observed = 1 - p_first - p_second + 2 * p_both
+        expected = p_first * p_second + (1 - p_first) * (1 - p_second)
+        kappa = _divide(observed - expected, 1 - expected)
+        valid = ~np.isnan(kappa)
+        per_label = _divide(
+            _count(values[valid], n_labels, weights=kappa[valid]), _count(values[valid], n_labels)
+        )
+
+        pair_keys = joint[0][joint[0] // n_coders < joint[0] % n_coders]
+        pairs = np.searchsorted(pair_keys, low * n_coders + high)
+        observed = _count(pairs, len(pair_keys), weights=p_both)
+        expected = _count(pairs, len(pair_keys), weights=p_first * p_second)
+        project = _nanmean(_divide(observed - expected, 1 - expected))
+        return float(project), per_label
+
+    def fleiss_kappa(self) -> Tuple[float, np.ndarray]:
+        """Return Fleiss' kappa of the project and of each label."""
+        project = self._fleiss_kappa_nominal()
+        m, k = self._binary_cells()
+        pairable = self.raters >= 2
+        n_units = pairable.sum()
+        n_ratings = self.raters[pairable].sum()
+        if n_units == 0:
+            return project, np.full(self.annotations.n_labels, np.nan)
+        disagreement = _count(
+            self.cell_values, self.annotations.n_labels, weights=2 * k * (m - k) / np.maximum(m * (m - 1), 1)
+        )
+        observed = 1 - disagreement / n_units
+        p = _count(self.cell_values, self.annotations.n_labels, weights=k) / n_ratings
+        expected = p**2 + (1 - p) ** 2
+        return project, _divide(observed - expected, 1 - expected)
+
+    def krippendorff_alpha(self) -> Tuple[float, np.ndarray]:
+        """Return Krippendorff's alpha (nominal) of the project and of each label."""
+        project = self._krippendorff_alpha_nominal()
+        m, k = self._binary_cells()
+        n = self.raters[self.raters >= 2].sum()
+        disagreement = _count(
+            self.cell_values, self.annotations.n_labels, weights=2 * k * (m - k) / np.maximum(m - 1, 1)
+        )
+        positive = _count(self.cell_values, self.annotations.n_labels, weights=k)
+        return project, 1 - _divide((n - 1) * disagreement, 2 * positive * (n - positive))
+
+    def _binary_cells(self):
+        """Return the number of annotators and label users of the pairable (example, label) cells."""
+        m = self.raters[self.cell_items]
+        k = np.where(m >= 2, self.cell_votes, 0)
+        return m, k
+
+    def _nominal_units(self):
+        """Return the number of values, and the sum of squared value counts, per pairable example."""
+        n_items = self.annotations.n_items
+        m = _count(self.cell_items, n_items, weights=self.cell_votes)
+        squares = _count(self.cell_items, n_items, weights=self.cell_votes**2)
+        pairable = m >= 2
+        return m[pairable], squares[pairable], pairable
+
+    def _fleiss_kappa_nominal(self) -> float:
+        m, squares, pairable = self._nominal_units()
+        if len(m) == 0:
+            return np.nan
+        observed = np.mean((squares - m) / (m * (m - 1)))
+        in_units = pairable[self.cell_items]
+        p = _count(self.cell_values[in_units], self.annotations.n_labels, weights=self.cell_votes[in_units]) / m.sum()
+        expected = np.sum(p**2)
+        return float(_divide(observed - expected, 1 - expected))
+
+    def _krippendorff_alpha_nominal(self) -> float:
+        m, squares, pairable = self._nominal_units()
+        n = m.sum()
+        if n == 0:
+            return np.nan
+        disagreement = n - np.sum((squares - m) / (m - 1))
+        in_units = pairable[self.cell_items]
+        n_values = _count(self.cell_values[in_units], self.annotations.n_labels, weights=self.cell_votes[in_units])
+        return float(1 - _divide((n - 1) * disagreement, n**2 - np.sum(n_values**2)))
+
+
+def _to_python(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, 4)
+
+
+def measure_agreement(annotations: Annotations, label_names: Dict[Any, str]) -> Dict[str, Any]:
+    """Measure the agreement of the annotations.
+
+    Args:
+        annotations: the annotations.
+        label_names: mapping from label ids to their names.
+
+    Returns:
+        project-level and per-label statistics. Undefined statistics are None.
+
+    Examples:
+        >>> measure_agreement(annotations, {1: "positive", 2: "negative"})
+        {'annotations': 10, 'examples': 5, 'annotators': 2, 'cohen_kappa': 0.6, ..., 'labels': {'positive': {...}}}
+    """
+    statistics = AgreementStatistics(annotations)
+    cohen, cohen_per_label = statistics.cohen_kappa()
+    fleiss, fleiss_per_label = statistics.fleiss_kappa()
+    alpha, alpha_per_label = statistics.krippendorff_alpha()
+    labels = {}
+    for i, label_id in enumerate(annotations.labels):
+        labels[label_names.get(label_id, str(label_id))] = {
+            "cohen_kappa": _to_python(cohen_per_label[i]),
+            "fleiss_kappa": _to_python(fleiss_per_label[i]),
+            "krippendorff_alpha": _to_python(alpha_per_label[i]),
+        }
+    return {
+        "annotations": len(annotations),
+        "examples": annotations.n_items,
+        "annotators": annotations.n_coders,
+        "cohen_kappa": _to_python(cohen),
+        "fleiss_kappa": _to_python(fleiss),
+        "krippendorff_alpha": _to_python(alpha),
+        "labels": labels,
+    }
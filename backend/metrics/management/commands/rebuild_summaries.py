@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from ...summaries import summarize_examples
+from examples.models import Example
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = "Rebuild the annotation summaries used by the metrics endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, action="append", help="The id of the project to rebuild.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="The number of examples per batch.")
+
+    def handle(self, *args, **options):
+        project_ids = options.get("project") or Project.objects.values_list("id", flat=True)
+        batch_size = options["batch_size"]
+        for project_id in project_ids:
+            example_ids = list(Example.objects.filter(project=project_id).values_list("id", flat=True))
+            for i in range(0, len(example_ids), batch_size):
+                summarize_examples(example_ids[i : i + batch_size])
+            self.stdout.write(self.style.SUCCESS(f"Summaries rebuilt for project {project_id}"))
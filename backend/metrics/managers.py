@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, Manager, QuerySet
+
+from examples.models import ExampleState
+
+
+class LabelSummaryManager(Manager):
+    def refresh(self, label_model, kind: str, examples, label_type_field: Optional[str] = None):
+        """Recompute the summary rows of a kind of label for the given examples.
+
+        Args:
+            label_model: the label model, e.g. Category.
+            kind: the label kind stored in the summary, e.g. "category".
+            examples: example ids, or a queryset of them.
+            label_type_field: the field referring to the label type. None for labels without types.
+        """
+        if not isinstance(examples, QuerySet):
+            examples = list(set(examples))
+        group_by = ["example", "example__project"]
+        if label_type_field:
+            group_by.append(label_type_field)
+        items = (
+            label_model.objects.filter(example__in=examples)
+            .values(*group_by)
+            .annotate(label_count=Count("id"), annotator_count=Count("user", distinct=True))
+            .order_by()
+        )
+        summaries = [
+            self.model(
+                project_id=item["example__project"],
+                example_id=item["example"],
+                kind=kind,
+                label_type_id=item[label_type_field] if label_type_field else 0,
+                label_count=item["label_count"],
+                annotator_count=item["annotator_count"],
+            )
+            for item in items.iterator()
+        ]
+        keys = {(summary.example_id, summary.label_type_id) for summary in summaries}
+        # The rows are upserted rather than deleted and inserted again, so that two transactions
+        # refreshing the same example at once do not both insert the same row.
+        with transaction.atomic():
+            rows = self.filter(example__in=examples, kind=kind).values_list("id", "example", "label_type_id")
+            self.filter(id__in=[row[0] for row in rows if row[1:] not in keys]).delete()
+            self.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=["example", "kind", "label_type_id"],
+                update_fields=["label_count", "annotator_count"],
+            )
+
+    def count_by_kind(self, examples: Iterable[int]) -> Dict[int, Dict[str, int]]:
+        """Count labels per example and kind.
+
+        Args:
+            examples: example ids.
+
+        Returns:
+            label counts per example and kind.
+
+        Examples:
+            >>> self.count_by_kind([1, 2])
+            {1: {'category': 2, 'span': 3}, 2: {}}
+        """
+        counts: Dict[int, Dict[str, int]] = {example: {} for example in examples}
+        items = self.filter(example__in=counts.keys()).values_list("example", "kind", "label_count")
+        for example, kind, label_count in items:
+            counts[example][kind] = counts[example].get(kind, 0) + label_count
+        return counts
+
+
+class ExampleSummaryManager(Manager):
+    def refresh(self, examples):
+        """Recompute the confirmation state of the given examples.
+
+        Args:
+            examples: example ids, or a queryset of them.
+        """
+        if not isinstance(examples, QuerySet):
+            examples = list(set(examples))
+        items = (
+            ExampleState.objects.filter(example__in=examples)
+            .values("example", "example__project")
+            .annotate(confirmed_count=Count("id"))
+            .order_by()
+        )
+        summaries = [
+            self.model(
+                project_id=item["example__project"],
+                example_id=item["example"],
+                confirmed_count=item["confirmed_count"],
+            )
+            for item in items.iterator()
+        ]
+        # Upserted for the same reason as the label summaries.
+        with transaction.atomic():
+            confirmed = [summary.example_id for summary in summaries]
+            self.filter(example__in=examples).exclude(example__in=confirmed).delete()
+            self.bulk_create(
+                summaries, update_conflicts=True, unique_fields=["example"], update_fields=["confirmed_count"]
+            )
+
+    def count_confirmed(self, project_id: int) -> int:
+        return self.filter(project=project_id, confirmed_count__gt=0).count()
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.15 on 2026-10-18 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('examples', '0008_assignment'),
+        ('projects', '0013_rulediscussionmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExampleSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('example', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='examples.example')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='example_summaries', to='projects.project')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LabelSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('category', 'Category'), ('span', 'Span'), ('relation', 'Relation'), ('text', 'Text')], max_length=16)),
+                ('label_type_id', models.BigIntegerField(default=0)),
+                ('label_count', models.PositiveIntegerField(default=0)),
+                ('annotator_count', models.PositiveIntegerField(default=0)),
+                ('example', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='label_summaries', to='examples.example')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='label_summaries', to='projects.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'kind', 'label_type_id'], name='metrics_lab_project_0e37b7_idx')],
+                'unique_together': {('example', 'kind', 'label_type_id')},
+            },
+        ),
+    ]
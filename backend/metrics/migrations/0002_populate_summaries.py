@@ -0,0 +1,82 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:02
+
+from itertools import islice
+
+from django.db import migrations
+from django.db.models import Count
+
+# label model -> (kind, field referring to the label type), as in metrics.summaries
+SUMMARIZED_LABELS = {
+    "Category": ("category", "label"),
+    "Span": ("span", "label"),
+    "Relation": ("relation", "type"),
+    "TextLabel": ("text", None),
+}
+
+BATCH_SIZE = 1000
+
+
+def bulk_create(model, objs):
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, BATCH_SIZE))
+        if not batch:
+            return
+        model.objects.bulk_create(batch)
+
+
+def populate_summaries(apps, schema_editor):
+    """Summarize the labels and confirmations written before the summaries were maintained by signals."""
+    LabelSummary = apps.get_model("metrics", "LabelSummary")
+    ExampleSummary = apps.get_model("metrics", "ExampleSummary")
+    ExampleState = apps.get_model("examples", "ExampleState")
+    LabelSummary.objects.all().delete()
+    ExampleSummary.objects.all().delete()
+    for model_name, (kind, label_type_field) in SUMMARIZED_LABELS.items():
+        label_model = apps.get_model("labels", model_name)
+        group_by = ["example", "example__project"]
+        if label_type_field:
+            group_by.append(label_type_field)
+        items = (
+            label_model.objects.values(*group_by)
+            .annotate(label_count=Count("id"), annotator_count=Count("user", distinct=True))
+            .order_by()
+        )
+        bulk_create(
+            LabelSummary,
+            (
+                LabelSummary(
+                    project_id=item["example__project"],
+                    example_id=item["example"],
+                    kind=kind,
+                    label_type_id=item[label_type_field] if label_type_field else 0,
+                    label_count=item["label_count"],
+                    annotator_count=item["annotator_count"],
+                )
+                for item in items.iterator()
+            ),
+        )
+    items = ExampleState.objects.values("example", "example__project").annotate(confirmed_count=Count("id")).order_by()
+    bulk_create(
+        ExampleSummary,
+        (
+            ExampleSummary(
+                project_id=item["example__project"],
+                example_id=item["example"],
+                confirmed_count=item["confirmed_count"],
+            )
+            for item in items.iterator()
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("metrics", "0001_initial"),
+        ("labels", "0016_segmentation"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_summaries, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import models
+
+from .managers import ExampleSummaryManager, LabelSummaryManager
+from examples.models import Example
+from projects.models import Project
+
+
+class LabelKind(models.TextChoices):
+    CATEGORY = "category"
+    SPAN = "span"
+    RELATION = "relation"
+    TEXT = "text"
+
+
+class LabelSummary(models.Model):
+    """The number of labels and annotators per example and label type.
+
+    The rows are kept up to date by the signal handlers in `metrics.signals`
+    and can be rebuilt with the `rebuild_summaries` command.
+    """
+
+    objects = LabelSummaryManager()
+    project = models.ForeignKey(to=Project, on_delete=models.CASCADE, related_name="label_summaries")
+    example = models.ForeignKey(to=Example, on_delete=models.CASCADE, related_name="label_summaries")
+    kind = models.CharField(max_length=16, choices=LabelKind.choices)
+    # 0 for labels without types, e.g. text labels.
+    label_type_id = models.BigIntegerField(default=0)
+    label_count = models.PositiveIntegerField(default=0)
+    annotator_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("example", "kind", "label_type_id")
+        indexes = [models.Index(fields=["project", "kind", "label_type_id"])]
+
+
+class ExampleSummary(models.Model):
+    """The confirmation state of an example. Unconfirmed examples have no row."""
+
+    objects = ExampleSummaryManager()
+    project = models.ForeignKey(to=Project, on_delete=models.CASCADE, related_name="example_summaries")
+    example = models.OneToOneField(to=Example, on_delete=models.CASCADE, related_name="summary")
+    confirmed_count = models.PositiveIntegerField(default=0)
+
+    @property
+    def is_confirmed(self) -> bool:
+        return self.confirmed_count > 0
@@ -0,0 +1,75 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterable
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from .models import ExampleSummary
+from .summaries import SUMMARIZED_LABELS, summarize_examples, summarize_labels
+from examples.models import Example, ExampleState
+
+# Examples being deleted in the current thread. Their summaries are removed
+# by the cascade, so there is no need to recompute them label by label.
+_deleting = threading.local()
+
+
+# Examples whose label summaries are refreshed once at the end of a batch.
+_deferred = threading.local()
+
+
+def _is_deleting(example_id) -> bool:
+    return example_id in getattr(_deleting, "examples", set())
+
+
+def _is_deferred(example_id) -> bool:
+    return example_id in getattr(_deferred, "examples", set())
+
+
+@contextmanager
+def deferred_summaries(example_ids: Iterable[int]):
+    """Skip the summary updates of each label saved or deleted in the block, and refresh the examples once at exit.
+
+    Args:
+        example_ids: the ids of the examples whose labels are written in the block.
+    """
+    if not hasattr(_deferred, "examples"):
+        _deferred.examples = set()
+    added = set(example_ids) - _deferred.examples
+    _deferred.examples.update(added)
+    try:
+        yield
+    finally:
+        _deferred.examples.difference_update(added)
+    summarize_examples(list(added))
+
+
+def update_label_summary(sender, instance, **kwargs):
+    if kwargs.get("raw") or _is_deleting(instance.example_id) or _is_deferred(instance.example_id):
+        return
+    summarize_labels(sender, [instance.example_id])
+
+
+def update_example_summary(sender, instance, **kwargs):
+    if kwargs.get("raw") or _is_deleting(instance.example_id):
+        return
+    ExampleSummary.objects.refresh([instance.example_id])
+
+
+def start_deleting_example(sender, instance, **kwargs):
+    if not hasattr(_deleting, "examples"):
+        _deleting.examples = set()
+    _deleting.examples.add(instance.id)
+
+
+def finish_deleting_example(sender, instance, **kwargs):
+    getattr(_deleting, "examples", set()).discard(instance.id)
+
+
+def connect():
+    for label_model in SUMMARIZED_LABELS:
+        post_save.connect(update_label_summary, sender=label_model)
+        post_delete.connect(update_label_summary, sender=label_model)
+    post_save.connect(update_example_summary, sender=ExampleState)
+    post_delete.connect(update_example_summary, sender=ExampleState)
+    pre_delete.connect(start_deleting_example, sender=Example)
+    post_delete.connect(finish_deleting_example, sender=Example)
@@ -0,0 +1,34 @@
+from .models import ExampleSummary, LabelKind, LabelSummary
+from labels.models import Category, Relation, Span, TextLabel
+
+# label model -> (kind, field referring to the label type)
+SUMMARIZED_LABELS = {
+    Category: (LabelKind.CATEGORY, "label"),
+    Span: (LabelKind.SPAN, "label"),
+    Relation: (LabelKind.RELATION, "type"),
+    TextLabel: (LabelKind.TEXT, None),
+}
+
+
+def summarize_labels(label_model, examples):
+    """Recompute the label summaries after labels are written without signals, e.g. by bulk_create.
+
+    Args:
+        label_model: the label model.
+        examples: the ids of the examples whose labels changed.
+    """
+    if label_model not in SUMMARIZED_LABELS:
+        return
+    kind, label_type_field = SUMMARIZED_LABELS[label_model]
+    LabelSummary.objects.refresh(label_model, kind, examples, label_type_field)
+
+
+def summarize_examples(examples):
+    """Recompute the label and confirmation summaries of the examples.
+
+    Args:
+        examples: example ids, or a queryset of them.
+    """
+    for label_model in SUMMARIZED_LABELS:
+        summarize_labels(label_model, examples)
+    ExampleSummary.objects.refresh(examples)
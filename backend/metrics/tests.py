@@ -1,12 +1,27 @@
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
 from model_mommy import mommy
 from rest_framework import status
 from rest_framework.reverse import reverse
 
 from api.tests.utils import CRUDMixin
+from examples.models import ExampleState
 from examples.tests.utils import make_doc
 from label_types.tests.utils import make_label
+from labels.models import Category
+from metrics.agreement import AgreementStatistics, Annotations, measure_agreement
+from metrics.managers import ExampleSummaryManager, LabelSummaryManager
+from metrics.models import ExampleSummary, LabelKind, LabelSummary
+from metrics.summaries import summarize_labels
 from projects.models import ProjectType
 from projects.tests.utils import prepare_project
+from users.tests.utils import make_user
 
 
 class TestMemberProgress(CRUDMixin):
@@ -78,3 +93,242 @@ class TestCategoryDistribution(CRUDMixin):
         expected = {member.username: {self.label.text: 0} for member in self.project.members}
         expected[self.project.admin.username][self.label.text] = 1
         self.assertEqual(response.data, expected)
+
+
+class TestLabelSummary(TestCase):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        self.example = make_doc(self.project.item)
+        self.label = make_label(self.project.item, text="label")
+
+    def test_summarize_labels_on_save(self):
+        for member in self.project.members:
+            mommy.make("Category", example=self.example, label=self.label, user=member)
+        summary = LabelSummary.objects.get(example=self.example, kind=LabelKind.CATEGORY)
+        self.assertEqual(summary.label_type_id, self.label.id)
+        self.assertEqual(summary.label_count, 3)
+        self.assertEqual(summary.annotator_count, 3)
+
+    def test_summarize_labels_on_delete(self):
+        category = mommy.make("Category", example=self.example, label=self.label, user=self.project.admin)
+        category.delete()
+        self.assertFalse(LabelSummary.objects.filter(example=self.example).exists())
+
+    def test_summarize_confirmation(self):
+        state = mommy.make("ExampleState", example=self.example, confirmed_by=self.project.admin)
+        self.assertTrue(self.example.summary.is_confirmed)
+        self.assertEqual(ExampleSummary.objects.count_confirmed(self.project.item.id), 1)
+        state.delete()
+        self.assertEqual(ExampleSummary.objects.count_confirmed(self.project.item.id), 0)
+
+    def test_delete_example_with_labels(self):
+        mommy.make("Category", example=self.example, label=self.label, user=self.project.admin)
+        mommy.make("ExampleState", example=self.example, confirmed_by=self.project.admin)
+        self.example.delete()
+        self.assertFalse(LabelSummary.objects.exists())
+        self.assertFalse(ExampleSummary.objects.exists())
+
+    def test_interleaved_refreshes(self):
+        mommy.make("Category", example=self.example, label=self.label, user=self.project.admin)
+        mommy.make("ExampleState", example=self.example, confirmed_by=self.project.admin)
+        LabelSummary.objects.all().delete()
+        ExampleSummary.objects.all().delete()
+        for manager, refresh in [
+            (LabelSummaryManager, lambda: summarize_labels(Category, [self.example.id])),
+            (ExampleSummaryManager, lambda: ExampleSummary.objects.refresh([self.example.id])),
+        ]:
+            bulk_create = manager.bulk_create
+
+            def refresh_concurrently(self, *args, **kwargs):
+                # Another transaction writes the same rows between the read and the write of this one.
+                with patch.object(manager, "bulk_create", bulk_create):
+                    refresh()
+                    return bulk_create(self, *args, **kwargs)
+
+            with patch.object(manager, "bulk_create", refresh_concurrently):
+                refresh()
+        self.assertEqual(LabelSummary.objects.count_by_kind([self.example.id]), {self.example.id: {"category": 1}})
+        self.assertEqual(ExampleSummary.objects.count_confirmed(self.project.item.id), 1)
+
+    def test_refresh_removes_stale_rows(self):
+        category = mommy.make("Category", example=self.example, label=self.label, user=self.project.admin)
+        other = make_label(self.project.item, text="other")
+        category.label = other
+        category.save()
+        summaries = LabelSummary.objects.filter(example=self.example).values_list("label_type_id", flat=True)
+        self.assertEqual(list(summaries), [other.id])
+
+    def test_rebuild_summaries(self):
+        mommy.make("Category", example=self.example, label=self.label, user=self.project.admin)
+        mommy.make("ExampleState", example=self.example, confirmed_by=self.project.admin)
+        LabelSummary.objects.all().delete()
+        ExampleSummary.objects.all().delete()
+        call_command("rebuild_summaries", project=[self.project.item.id], stdout=StringIO())
+        self.assertEqual(LabelSummary.objects.count_by_kind([self.example.id]), {self.example.id: {"category": 1}})
+        self.assertEqual(ExampleSummary.objects.count_confirmed(self.project.item.id), 1)
+
+
+class TestPopulateSummaries(TransactionTestCase):
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([target])
+
+    def test_summarize_existing_labels(self):
+        project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        example = make_doc(project.item)
+        label = make_label(project.item, text="label")
+        self.migrate(("metrics", "0001_initial"))
+        # bulk_create sends no signals, as for the labels written before the upgrade.
+        Category.objects.bulk_create(
+            [mommy.prepare("Category", example=example, label=label, user=member) for member in project.members]
+        )
+        ExampleState.objects.bulk_create([mommy.prepare("ExampleState", example=example, confirmed_by=project.admin)])
+        self.assertFalse(LabelSummary.objects.exists())
+
+        self.migrate(("metrics", "0002_populate_summaries"))
+        summary = LabelSummary.objects.get(example=example, kind=LabelKind.CATEGORY)
+        self.assertEqual((summary.label_type_id, summary.label_count, summary.annotator_count), (label.id, 3, 3))
+        self.assertEqual(ExampleSummary.objects.count_confirmed(project.item.id), 1)
+
+
+class TestAgreementStatistics(TestCase):
+    def make_statistics(self, triples):
+        return AgreementStatistics(Annotations.from_triples(np.array(triples)))
+
+    def test_krippendorff_alpha(self):
+        # The reliability data from Krippendorff (2011), "Computing Krippendorff's Alpha-Reliability".
+        reliability_data = [
+            [1, 2, 3, 3, 2, 1, 4, 1, 2, None, None, None],
+            [1, 2, 3, 3, 2, 2, 4, 1, 2, 5, None, 3],
+            [None, 3, 3, 3, 2, 3, 4, 2, 2, 5, 1, None],
+            [1, 2, 3, 3, 2, 4, 4, 1, 2, 5, 1, None],
+        ]
+        triples = [
+            (unit, coder, value)
+            for coder, values in enumerate(reliability_data)
+            for unit, value in enumerate(values)
+            if value is not None
+        ]
+        alpha, _ = self.make_statistics(triples).krippendorff_alpha()
+        self.assertAlmostEqual(alpha, 0.743, places=3)
+
+    def test_fleiss_kappa(self):
+        # The example from Fleiss (1971): 10 subjects rated by 14 raters into 5 categories.
+        table = [
+            [0, 0, 0, 0, 14],
+            [0, 2, 6, 4, 2],
+            [0, 0, 3, 5, 6],
+            [0, 3, 9, 2, 0],
+            [2, 2, 8, 1, 1],
+            [7, 7, 0, 0, 0],
+            [3, 2, 6, 3, 0],
+            [2, 5, 3, 2, 2],
+            [6, 5, 2, 1, 0],
+            [0, 2, 2, 3, 7],
+        ]
+        triples = []
+        for subject, counts in enumerate(table):
+            ratings = [category for category, count in enumerate(counts) for _ in range(count)]
+            triples.extend((subject, rater, category) for rater, category in enumerate(ratings))
+        kappa, _ = self.make_statistics(triples).fleiss_kappa()
+        self.assertAlmostEqual(kappa, 0.210, places=3)
+
+    def test_cohen_kappa(self):
+        first = [0, 0, 1, 1, 0, 1, 0, 0]
+        second = [0, 1, 1, 1, 0, 0, 0, 0]
+        triples = [(i, 0, label) for i, label in enumerate(first)] + [(i, 1, label) for i, label in enumerate(second)]
+        kappa, per_label = self.make_statistics(triples).cohen_kappa()
+        # po = 6/8, pe = (5/8 * 5/8) + (3/8 * 3/8)
+        expected = (0.75 - 34 / 64) / (1 - 34 / 64)
+        self.assertAlmostEqual(kappa, expected)
+        # with two labels, each binary decision is the same as the project-level one.
+        np.testing.assert_allclose(per_label, [expected, expected])
+
+    def test_perfect_agreement(self):
+        triples = [(i, coder, i % 3) for i in range(9) for coder in range(3)]
+        statistics = self.make_statistics(triples)
+        self.assertAlmostEqual(statistics.cohen_kappa()[0], 1.0)
+        self.assertAlmostEqual(statistics.fleiss_kappa()[0], 1.0)
+        self.assertAlmostEqual(statistics.krippendorff_alpha()[0], 1.0)
+
+    def test_no_annotations(self):
+        annotations = Annotations.from_triples(np.zeros((0, 3), dtype=np.int64))
+        data = measure_agreement(annotations, {})
+        self.assertIsNone(data["cohen_kappa"])
+        self.assertEqual(data["labels"], {})
+
+
+class TestCategoryAgreement(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        self.label = make_label(self.project.item, text="label")
+        for _ in range(2):
+            example = make_doc(self.project.item)
+            for member in self.project.members:
+                mommy.make("Category", example=example, label=self.label, user=member)
+        self.url = reverse(viewname="category_agreement", args=[self.project.item.id])
+
+    def test_fetch_agreement(self):
+        response = self.assert_fetch(self.project.admin, status.HTTP_200_OK)
+        self.assertEqual(response.data["annotations"], 6)
+        self.assertEqual(response.data["examples"], 2)
+        self.assertEqual(response.data["annotators"], 3)
+        self.assertIn(self.label.text, response.data["labels"])
+
+    def test_denies_non_member(self):
+        self.assert_fetch(make_user("non-member"), status.HTTP_403_FORBIDDEN)
+
+
+class TestDatasetStatistics(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        self.label = make_label(self.project.item, text="label")
+        self.examples = [make_doc(self.project.item) for _ in range(3)]
+        mommy.make("Category", example=self.examples[0], label=self.label, user=self.project.admin)
+        mommy.make("Category", example=self.examples[0], label=self.label, user=self.project.annotator)
+        mommy.make("ExampleState", example=self.examples[0], confirmed_by=self.project.admin)
+        mommy.make("Assignment", project=self.project.item, example=self.examples[1], assignee=self.project.annotator)
+        self.url = reverse(viewname="dataset_statistics", args=[self.project.item.id])
+
+    def fetch(self, **params):
+        self.client.force_login(self.project.admin)
+        response = self.client.get(self.url, data=params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_fetch_statistics(self):
+        data = self.fetch(ordering="id")
+        self.assertEqual((data["total"], data["filtered"], data["annotated"], data["unannotated"]), (3, 3, 1, 2))
+        first = data["entries"][0]
+        self.assertEqual(first["id"], self.examples[0].id)
+        self.assertTrue(first["annotated"])
+        self.assertEqual((first["categoryCount"], first["spanCount"], first["relationCount"]), (2, 0, 0))
+
+    def test_filter_by_status(self):
+        data = self.fetch(status="pending")
+        self.assertEqual(data["filtered"], 2)
+        self.assertEqual({entry["id"] for entry in data["entries"]}, {e.id for e in self.examples[1:]})
+
+    def test_filter_by_label(self):
+        data = self.fetch(label_type="category", label_id=str(self.label.id))
+        self.assertEqual([entry["id"] for entry in data["entries"]], [self.examples[0].id])
+
+    def test_filter_by_assignee(self):
+        data = self.fetch(assignee=self.project.annotator.username)
+        self.assertEqual([entry["id"] for entry in data["entries"]], [self.examples[1].id])
+
+    def test_sort_by_label_count(self):
+        data = self.fetch(ordering="-categoryCount")
+        self.assertEqual(data["entries"][0]["id"], self.examples[0].id)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        for _ in range(30):
+            make_doc(self.project.item)
+        self.client.force_login(self.project.admin)
+        self.client.get(self.url)
+        for page_size in [20, 500]:
+            with self.assertNumQueries(5):
+                # session, user, member, counts and entries
+                response = self.client.get(self.url, data={"page_size": page_size})
+            self.assertEqual(len(response.data["entries"]), min(page_size, 33))
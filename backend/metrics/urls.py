@@ -1,10 +1,13 @@
 from django.urls import path
 
 from .views import (
+    CategoryTypeAgreement,
     CategoryTypeDistribution,
     MemberProgressAPI,
     ProgressAPI,
+    RelationTypeAgreement,
     RelationTypeDistribution,
+    SpanTypeAgreement,
     SpanTypeDistribution,
     DatasetStatisticsAPI,
 )
@@ -15,5 +18,8 @@ urlpatterns = [
     path(route="category-distribution", view=CategoryTypeDistribution.as_view(), name="category_distribution"),
     path(route="relation-distribution", view=RelationTypeDistribution.as_view(), name="relation_distribution"),
     path(route="span-distribution", view=SpanTypeDistribution.as_view(), name="span_distribution"),
+    path(route="category-agreement", view=CategoryTypeAgreement.as_view(), name="category_agreement"),
+    path(route="relation-agreement", view=RelationTypeAgreement.as_view(), name="relation_agreement"),
+    path(route="span-agreement", view=SpanTypeAgreement.as_view(), name="span_agreement"),
     path('dataset', DatasetStatisticsAPI.as_view(), name='dataset_statistics'),
 ]
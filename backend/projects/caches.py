@@ -0,0 +1,62 @@
+"""Cache the role names of project members across requests.
+
+The role of a member is read on every request to a project, but it rarely
+changes. The entries of a project are versioned with a random token, so that
+replacing the token invalidates all of them at once, and entries written
+before a project id was reused can never be read back.
+
+The cache is only enabled when ROLE_CACHE_TIMEOUT is positive. By default, it
+is so only with a cache shared by the processes, since a role revoked in one
+process would otherwise still be granted by the others until the entry expires.
+"""
+import uuid
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+# The role name cached for users who are not members of the project.
+NO_ROLE = ""
+
+
+def _version_key(project_id: int) -> str:
+    return f"projects:roles:{project_id}"
+
+
+def _get_version(project_id: int) -> str:
+    key = _version_key(project_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _role_key(project_id: int, user_id: int) -> str:
+    return f"{_version_key(project_id)}:{_get_version(project_id)}:{user_id}"
+
+
+def get_role_name(project_id: int, user_id: int, load: Callable[[], Optional[str]]) -> Optional[str]:
+    """Return the role name of the user in the project, calling `load` on a cache miss.
+
+    Returns:
+        the role name, or None if the user is not a member of the project.
+    """
+    if settings.ROLE_CACHE_TIMEOUT <= 0:
+        return load()
+    key = _role_key(project_id, user_id)
+    role_name = cache.get(key)
+    if role_name is None:
+        role_name = load() or NO_ROLE
+        cache.set(key, role_name, timeout=settings.ROLE_CACHE_TIMEOUT)
+    return role_name or None
+
+
+def forget_role(project_id: int, user_id: int):
+    """Invalidate the role of a user in a project."""
+    cache.delete(_role_key(project_id, user_id))
+
+
+def forget_project_roles(project_id: int):
+    """Invalidate the roles of every user in a project."""
+    cache.set(_version_key(project_id), uuid.uuid4().hex, timeout=None)
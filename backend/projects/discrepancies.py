@@ -0,0 +1,193 @@
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from django.db.models import (
+    Count,
+    Exists,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+)
+
+from examples.models import Example
+from labels.models import Category
+from projects.models import PerspectiveAnswer
+
+DEFAULT_DISCREPANCY_THRESHOLD = 70
+
+
+class PerspectiveAnswerIndex:
+    """The perspective answers of a project, loaded with a single query.
+
+    Attributes:
+        answers: {annotator_id: {question_id: answer}}
+    """
+
+    def __init__(self, project_id: int):
+        self.answers: Dict[int, Dict[int, str]] = defaultdict(dict)
+        self.groups: Dict[int, Optional[int]] = {}
+        self.respondents: Dict[tuple, Set[int]] = defaultdict(set)
+        items = (
+            PerspectiveAnswer.objects.filter(project_id=project_id, created_by__isnull=False)
+            .values_list("created_by_id", "perspective_id", "perspective__group_id", "answer")
+            .order_by("id")
+        )
+        for annotator_id, question_id, group_id, answer in items:
+            self.answers[annotator_id][question_id] = answer
+            self.groups[question_id] = group_id
+            self.respondents[question_id, answer].add(annotator_id)
+
+    def annotators_answering(self, question_id: int, answer: str) -> Set[int]:
+        """Return the annotators who gave the answer to the question."""
+        return self.respondents.get((question_id, answer), set())
+
+    def answers_of(self, annotators: Iterable[int]) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """Return the answers of the annotators grouped by perspective group and question.
+
+        Examples:
+            >>> index.answers_of([1])
+            {'3': {'7': {'1': 'Yes'}}}
+        """
+        answers: Dict[str, Dict[str, Dict[str, str]]] = {}
+        for annotator_id in annotators:
+            for question_id, answer in self.answers.get(annotator_id, {}).items():
+                group = answers.setdefault(str(self.groups[question_id]), {})
+                group.setdefault(str(question_id), {})[str(annotator_id)] = answer
+        return answers
+
+
+def collect_votes(project_id: int) -> Dict[int, List[tuple]]:
+    """Load the category votes of a project with a single query.
+
+    Returns:
+        {example_id: [(annotator_id, label_text), ...]} in the order of the examples.
+    """
+    votes: Dict[int, List[tuple]] = defaultdict(list)
+    items = (
+        Category.objects.filter(example__project_id=project_id)
+        .values_list("example_id", "user_id", "label__text")
+        .order_by("example__created_at", "example_id")
+    )
+    for example_id, annotator_id, label in items:
+        votes[example_id].append((annotator_id, label))
+    return votes
+
+
+def analyze_votes(
+    votes: List[tuple], annotators: Optional[Set[int]] = None, threshold: float = DEFAULT_DISCREPANCY_THRESHOLD
+) -> Optional[Dict[str, Any]]:
+    """Measure how the votes on an example are split between labels.
+
+    Args:
+        votes: the (annotator_id, label_text) pairs of the example.
+        annotators: if given, only the votes of these annotators are counted.
+        threshold: the example is discrepant if no label has at least this percentage of the votes.
+
+    Returns:
+        None if there are no votes to count.
+    """
+    if annotators is not None:
+        votes = [vote for vote in votes if vote[0] in annotators]
+    if not votes:
+        return None
+    counts = Counter(label for _, label in votes)
+    total = sum(counts.values())
+    percentages = {label: count / total * 100 for label, count in counts.items()}
+    max_percentage = max(percentages.values())
+    return {
+        "percentages": percentages,
+        "is_discrepancy": max_percentage < threshold,
+        "max_percentage": max_percentage,
+        "annotators": sorted({annotator_id for annotator_id, _ in votes}),
+    }
+
+
+class DiscrepancyQuery:
+    """Find the discrepancies of a project in SQL.
+
+    The share of the most voted label of each example is computed by the
+    database, so filtering by threshold happens before any row is loaded.
+
+    Args:
+        project_id: the project id.
+        threshold: the example is discrepant if no label has at least this percentage of the votes.
+        annotators: if given, only the votes of these annotators are counted.
+        label: if given, only the examples with a vote for this label are returned.
+        only_discrepant: whether to return only the discrepant examples.
+    """
+
+    def __init__(
+        self,
+        project_id: int,
+        threshold: float = DEFAULT_DISCREPANCY_THRESHOLD,
+        annotators: Optional[Set[int]] = None,
+        label: Optional[str] = None,
+        only_discrepant: bool = False,
+    ):
+        self.project_id = project_id
+        self.threshold = threshold
+        self.annotators = annotators
+        self.label = label
+        self.only_discrepant = only_discrepant
+        self.index = PerspectiveAnswerIndex(project_id)
+
+    def votes(self, **kwargs) -> QuerySet:
+        votes = Category.objects.filter(**kwargs)
+        if self.annotators is not None:
+            votes = votes.filter(user__in=self.annotators)
+        return votes
+
+    def queryset(self) -> QuerySet:
+        counted = Q(categories__user__in=self.annotators) if self.annotators is not None else Q()
+        top_votes = (
+            self.votes(example=OuterRef("pk"))
+            .values("label")
+            .annotate(count=Count("id"))
+            .order_by("-count")
+            .values("count")[:1]
+        )
+        examples = (
+            Example.objects.filter(project_id=self.project_id)
+            .annotate(total_votes=Count("categories", filter=counted), top_votes=Subquery(top_votes))
+            .annotate(
+                max_percentage=ExpressionWrapper(F("top_votes") * 100.0 / F("total_votes"), output_field=FloatField())
+            )
+            .filter(total_votes__gt=0)
+        )
+        if self.only_discrepant:
+            examples = examples.filter(max_percentage__lt=self.threshold)
+        if self.label:
+            examples = examples.filter(Exists(self.votes(example=OuterRef("pk"), label__text=self.label)))
+        return examples.only("id", "text").order_by("id")
+
+    def describe(self, examples: List[Example]) -> List[Dict[str, Any]]:
+        """Describe the discrepancy of each example with a single query."""
+        votes: Dict[int, List[tuple]] = defaultdict(list)
+        items = self.votes(example__in=[example.id for example in examples]).values_list(
+            "example_id", "user_id", "label__text"
+        )
+        for example_id, annotator_id, label in items:
+            votes[example_id].append((annotator_id, label))
+        discrepancies = []
+        for example in examples:
+            discrepancy = analyze_votes(votes[example.id], threshold=self.threshold) or {}
+            discrepancy["id"] = example.id
+            discrepancy["text"] = example.text
+            discrepancy["perspective_answers"] = self.index.answers_of(discrepancy.get("annotators", []))
+            discrepancies.append(discrepancy)
+        return discrepancies
+
+    def stream(self, chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield the discrepancies, loading `chunk_size` examples at a time."""
+        chunk = []
+        for example in self.queryset().iterator(chunk_size=chunk_size):
+            chunk.append(example)
+            if len(chunk) == chunk_size:
+                yield from self.describe(chunk)
+                chunk = []
+        if chunk:
+            yield from self.describe(chunk)
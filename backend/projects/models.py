@@ -9,6 +9,7 @@ from django.db import models
 from django.db.models import Manager
 from polymorphic.models import PolymorphicModel
 
+from .caches import get_role_name
 from roles.models import Role
 
 
@@ -192,8 +193,16 @@ class MemberManager(Manager):
             # we can change the role except for the only admin.
             return admin.id != member_id or new_role == settings.ROLE_PROJECT_ADMIN
 
+    def get_role_name(self, project_id: int, user: User) -> Optional[str]:
+        """Return the role name of the user in the project, or None if the user is not a member.
+
+        The result is cached across requests, and invalidated when the member or its role changes.
+        """
+        queryset = self.filter(project=project_id, user=user).values_list("role__name", flat=True)
+        return get_role_name(project_id, user.id, load=queryset.first)
+
     def has_role(self, project_id: int, user: User, role_name: str):
-        return self.filter(project=project_id, user=user, role__name=role_name).exists()
+        return self.get_role_name(project_id, user) == role_name
 
 
 class Member(models.Model):
@@ -1,7 +1,7 @@
 from django.conf import settings
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
-from .models import Member
+from .resolvers import get_role_name
 
 
 class RolePermission(BasePermission):
@@ -24,7 +24,7 @@ class RolePermission(BasePermission):
         if not project_id and request.method in SAFE_METHODS:
             return True
 
-        return Member.objects.has_role(project_id, request.user, self.role_name)
+        return get_role_name(request, project_id) == self.role_name
 
 
 class IsProjectAdmin(RolePermission):
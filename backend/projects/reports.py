@@ -0,0 +1,190 @@
+from typing import Any, Dict, List
+
+from django.db.models import (
+    Case,
+    CharField,
+    Count,
+    F,
+    Max,
+    Min,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Concat
+
+from labels.models import Category, Relation, Span
+
+UNNAMED_DATASET = "Arquivo sem nome (ID: "
+
+
+def dataset_name(prefix: str = "") -> Case:
+    """Build the expression naming the dataset of an example.
+
+    Examples without an upload name are reported as their own dataset.
+
+    Args:
+        prefix: The lookup path from the queried model to the example, e.g. "example__".
+    """
+    return Case(
+        When(
+            Q(**{f"{prefix}upload_name": ""}) | Q(**{f"{prefix}upload_name__isnull": True}),
+            then=Concat(
+                Value(UNNAMED_DATASET),
+                Cast(f"{prefix}id", output_field=CharField()),
+                Value(")"),
+                output_field=CharField(),
+            ),
+        ),
+        default=F(f"{prefix}upload_name"),
+        output_field=CharField(),
+    )
+
+
+class AnnotationAggregation:
+    """Aggregate one kind of annotation into per dataset and per label statistics.
+
+    An example is in agreement when every annotation on it has the same values
+    for `agreement_fields`, i.e. MIN(field) = MAX(field) for each of them.
+    """
+
+    kind = ""
+    model: Any = None
+    label_field = "label"
+    agreement_fields = ("label",)
+
+    def __init__(self, examples: QuerySet):
+        self.annotations = self.model.objects.filter(example__in=examples.values("id"))
+
+    def agreed_examples(self) -> QuerySet:
+        bounds = {}
+        for field in self.agreement_fields:
+            bounds[f"{field}_min"] = Min(field)
+            bounds[f"{field}_max"] = Max(field)
+        agreement = Q()
+        for field in self.agreement_fields:
+            agreement &= Q(**{f"{field}_min": F(f"{field}_max")})
+        return self.annotations.values("example").annotate(**bounds).filter(agreement).values("example")
+
+    def filter_by_agreement(self, agreement: str) -> QuerySet:
+        if agreement == "agreed":
+            return self.annotations.filter(example__in=self.agreed_examples())
+        elif agreement == "disagreed":
+            return self.annotations.exclude(example__in=self.agreed_examples())
+        return self.annotations
+
+    def calc(self, agreement: str = "all"):
+        """Calculate the statistics.
+
+        Args:
+            agreement: one of "all", "agreed" or "disagreed".
+
+        Returns:
+            A pair of the number of annotated documents per dataset and the rows of label statistics.
+        """
+        annotations = self.filter_by_agreement(agreement)
+        annotated = annotations.values(dataset=dataset_name("example__")).annotate(
+            documents=Count("example", distinct=True)
+        )
+        labels = (
+            annotations.values(dataset=dataset_name("example__"), name=F(f"{self.label_field}__text"))
+            .annotate(
+                count=Count("id"),
+                unique_users=Count("user", distinct=True),
+                agreed=Count("id", filter=Q(example__in=self.agreed_examples())),
+            )
+            .order_by("dataset", "name")
+        )
+        return {row["dataset"]: row["documents"] for row in annotated}, list(labels)
+
+
+class CategoryAggregation(AnnotationAggregation):
+    kind = "category"
+    model = Category
+
+
+class SpanAggregation(AnnotationAggregation):
+    kind = "span"
+    model = Span
+    agreement_fields = ("label", "start_offset", "end_offset")
+
+
+class RelationAggregation(AnnotationAggregation):
+    kind = "relation"
+    model = Relation
+    label_field = "type"
+    agreement_fields = ("type", "from_id", "to_id")
+
+
+class AnnotationReport:
+    """Build the annotation report of a set of examples.
+
+    The report is computed with a fixed number of grouped queries, so its cost
+    depends on the number of datasets and labels rather than on the number of examples.
+    """
+
+    aggregations = (CategoryAggregation, SpanAggregation, RelationAggregation)
+
+    def __init__(self, examples: QuerySet):
+        self.examples = examples
+
+    def count_documents(self) -> Dict[str, int]:
+        items = (
+            self.examples.values(dataset=dataset_name())
+            .annotate(total=Count("id", distinct=True), first_created_at=Min("created_at"))
+            .order_by("first_created_at", "dataset")
+        )
+        return {item["dataset"]: item["total"] for item in items}
+
+    def build(self, agreement: str = "all") -> List[Dict[str, Any]]:
+        """Build the report rows.
+
+        Args:
+            agreement: one of "all", "agreed" or "disagreed".
+
+        Returns:
+            A summary row per dataset followed by a row per annotated label.
+        """
+        totals = self.count_documents()
+        annotated = {dataset: 0 for dataset in totals}
+        label_rows: Dict[str, List[Dict[str, Any]]] = {dataset: [] for dataset in totals}
+        for aggregation_class in self.aggregations:
+            aggregation = aggregation_class(self.examples)
+            documents, labels = aggregation.calc(agreement)
+            for dataset, count in documents.items():
+                annotated[dataset] += count
+            for label in labels:
+                label_rows[label["dataset"]].append(self.format_label(aggregation.kind, label))
+
+        report = []
+        for dataset, total in totals.items():
+            report.append(
+                {
+                    "type": "dataset_summary",
+                    "dataset": dataset,
+                    "total_documents": total,
+                    "annotated_documents": annotated[dataset],
+                    "annotation_percentage": round(annotated[dataset] / total * 100 if total > 0 else 0, 2),
+                }
+            )
+            report.extend(label_rows[dataset])
+        return report
+
+    @staticmethod
+    def format_label(kind: str, label: Dict[str, Any]) -> Dict[str, Any]:
+        total = label["count"]
+        agreed = label["agreed"]
+        return {
+            "type": kind,
+            "dataset": label["dataset"],
+            "label": label["name"],
+            "count": total,
+            "unique_users": label["unique_users"],
+            "agreement": {
+                "percentage": round(agreed / total * 100 if total > 0 else 0, 2),
+                "total": total,
+                "agreed": agreed,
+                "disagreed": total - agreed,
+            },
+        }
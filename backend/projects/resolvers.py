@@ -0,0 +1,111 @@
+"""Resolve the project of a request and the membership of the requesting user once per request.
+
+Permission classes and views used to look up the same project and member rows
+several times while handling a single request. The functions here memoize them
+on the request, and load the member together with its role and project in a
+single query.
+"""
+from typing import Dict, List, Optional
+
+from django.http import Http404
+
+from . import caches
+from .models import Member, Project
+
+
+class RequestCache:
+    def __init__(self):
+        self.projects: Dict[int, Optional[Project]] = {}
+        self.members: Dict[int, Optional[Member]] = {}
+        self.roles: Dict[int, Optional[str]] = {}
+
+
+def get_cache(request) -> RequestCache:
+    # DRF wraps the Django request, so the cache is kept on the Django one to be shared by both.
+    request = getattr(request, "_request", request)
+    if not hasattr(request, "_project_cache"):
+        request._project_cache = RequestCache()
+    return request._project_cache
+
+
+def project_subclasses() -> List[str]:
+    """Return the names of the relations from a project to its polymorphic subclasses."""
+    return [
+        relation.name
+        for relation in Project._meta.related_objects
+        if relation.one_to_one and issubclass(relation.related_model, Project)
+    ]
+
+
+def downcast(project: Project) -> Project:
+    """Return the subclass instance of a project loaded with select_related."""
+    # django-polymorphic replaces the subclass accessors with queries, so the cache is read directly.
+    related = project._state.fields_cache
+    for name in project_subclasses():
+        subclass = related.get(name)
+        if subclass is None:
+            continue
+        # select_related only fills the fields of the subclass table, so the inherited ones are copied.
+        for field in Project._meta.concrete_fields:
+            setattr(subclass, field.attname, getattr(project, field.attname))
+        return subclass
+    return project
+
+
+def to_key(project_id) -> int:
+    try:
+        return int(project_id)
+    except (TypeError, ValueError):
+        raise Http404("No Project matches the given query.")
+
+
+def get_member(request, project_id) -> Optional[Member]:
+    """Return the membership of the requesting user in the project, or None if there is none."""
+    key = to_key(project_id)
+    cache = get_cache(request)
+    if key not in cache.members:
+        member = None
+        if request.user.is_authenticated:
+            related = ["role", "project", *(f"project__{name}" for name in project_subclasses())]
+            member = Member.objects.select_related(*related).filter(project_id=key, user=request.user).first()
+        if member is not None:
+            member.project = downcast(member.project)
+            cache.projects[key] = member.project
+        cache.members[key] = member
+    return cache.members[key]
+
+
+def get_role_name(request, project_id) -> Optional[str]:
+    """Return the role name of the requesting user in the project, or None if the user is not a member.
+
+    The role is read once per request: from the member if it is loaded already,
+    then from the cache shared across requests, and from the database last.
+    """
+    key = to_key(project_id)
+    cache = get_cache(request)
+    if key not in cache.roles:
+        if key in cache.members or not request.user.is_authenticated:
+            member = get_member(request, key)
+            cache.roles[key] = member.role.name if member else None
+        else:
+
+            def load() -> Optional[str]:
+                member = get_member(request, key)
+                return member.role.name if member else None
+
+            cache.roles[key] = caches.get_role_name(key, request.user.id, load=load)
+    return cache.roles[key]
+
+
+def get_project(request, project_id) -> Project:
+    """Return the project as its polymorphic subclass, or raise Http404 if it does not exist."""
+    key = to_key(project_id)
+    cache = get_cache(request)
+    if key not in cache.projects:
+        get_member(request, key)
+    if key not in cache.projects:
+        cache.projects[key] = Project.objects.filter(pk=key).first()
+    project = cache.projects[key]
+    if project is None:
+        raise Http404("No Project matches the given query.")
+    return project
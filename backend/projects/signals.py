@@ -0,0 +1,32 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .caches import forget_project_roles, forget_role
+from .models import Member, Project
+from roles.models import Role
+
+
+def forget_member_role(sender, instance, **kwargs):
+    forget_role(instance.project_id, instance.user_id)
+
+
+def forget_roles_of_members(sender, instance, **kwargs):
+    project_ids = Member.objects.filter(role=instance).values_list("project_id", flat=True).distinct()
+    for project_id in project_ids:
+        forget_project_roles(project_id)
+
+
+def forget_roles_of_project(sender, instance, created=True, **kwargs):
+    if created:
+        forget_project_roles(instance.id)
+
+
+def connect():
+    post_save.connect(forget_member_role, sender=Member)
+    post_delete.connect(forget_member_role, sender=Member)
+    post_save.connect(forget_roles_of_members, sender=Role)
+    post_delete.connect(forget_roles_of_members, sender=Role)
+    for model in apps.get_models():
+        if issubclass(model, Project):
+            post_save.connect(forget_roles_of_project, sender=model)
+            post_delete.connect(forget_roles_of_project, sender=model)
@@ -0,0 +1,100 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from model_mommy import mommy
+from rest_framework.reverse import reverse
+
+from projects.models import Member, ProjectType
+from projects.permissions import IsProjectMember
+from projects.resolvers import get_project
+from projects.tests.utils import prepare_project
+from roles.models import Role
+from users.tests.utils import make_user
+
+
+@override_settings(ROLE_CACHE_TIMEOUT=60)
+class TestRoleCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        self.project_id = self.project.item.id
+        self.annotator = self.project.annotator
+
+    def assert_role(self, user, role_name):
+        self.assertEqual(Member.objects.get_role_name(self.project_id, user), role_name)
+
+    def test_cache_role_across_calls(self):
+        self.assertTrue(Member.objects.has_role(self.project_id, self.annotator, settings.ROLE_ANNOTATOR))
+        with self.assertNumQueries(0):
+            self.assertTrue(Member.objects.has_role(self.project_id, self.annotator, settings.ROLE_ANNOTATOR))
+            self.assertFalse(Member.objects.has_role(self.project_id, self.annotator, settings.ROLE_PROJECT_ADMIN))
+
+    def test_cache_non_member(self):
+        user = make_user()
+        self.assert_role(user, None)
+        with self.assertNumQueries(0):
+            self.assert_role(user, None)
+
+    def test_invalidate_on_member_creation(self):
+        user = make_user()
+        self.assert_role(user, None)
+        role = Role.objects.get(name=settings.ROLE_ANNOTATOR)
+        mommy.make("Member", project=self.project.item, user=user, role=role)
+        self.assert_role(user, settings.ROLE_ANNOTATOR)
+
+    def test_invalidate_on_member_update(self):
+        self.assert_role(self.annotator, settings.ROLE_ANNOTATOR)
+        member = Member.objects.get(project=self.project_id, user=self.annotator)
+        member.role = Role.objects.get(name=settings.ROLE_ANNOTATION_APPROVER)
+        member.save()
+        self.assert_role(self.annotator, settings.ROLE_ANNOTATION_APPROVER)
+
+    def test_invalidate_on_member_deletion(self):
+        self.assert_role(self.annotator, settings.ROLE_ANNOTATOR)
+        Member.objects.get(project=self.project_id, user=self.annotator).delete()
+        self.assert_role(self.annotator, None)
+
+    def test_invalidate_on_role_rename(self):
+        self.assert_role(self.annotator, settings.ROLE_ANNOTATOR)
+        role = Role.objects.get(name=settings.ROLE_ANNOTATOR)
+        role.name = "reviewer"
+        role.save()
+        self.assert_role(self.annotator, "reviewer")
+
+    def test_permission_check_skips_queries_when_cached(self):
+        example = mommy.make("Example", project=self.project.item)
+        url = reverse(viewname="category_list", args=[self.project_id, example.id])
+        self.client.force_login(self.annotator)
+        self.client.get(url)
+        with self.assertNumQueries(4):
+            # session, user, project with member, categories
+            self.client.get(url)
+
+    def check_permission(self, user):
+        request = RequestFactory().get("/")
+        request.user = user
+        view = type("View", (), {"kwargs": {"project_id": self.project_id}})()
+        return request, IsProjectMember().has_permission(request, view)
+
+    def test_read_role_once_per_request(self):
+        self.check_permission(self.annotator)
+        with patch("projects.caches.cache.get", wraps=cache.get) as cache_get, self.assertNumQueries(0):
+            request, allowed = self.check_permission(self.annotator)
+        self.assertTrue(allowed)
+        self.assertEqual(cache_get.call_count, 2)  # the version of the project, and the role
+
+    def test_share_member_loaded_on_miss_with_request(self):
+        with self.assertNumQueries(1):
+            request, allowed = self.check_permission(self.annotator)
+            get_project(request, self.project_id)
+        self.assertTrue(allowed)
+
+    @override_settings(ROLE_CACHE_TIMEOUT=0)
+    def test_disable_cache(self):
+        with patch("projects.caches.cache") as role_cache, self.assertNumQueries(1):
+            request, allowed = self.check_permission(self.annotator)
+            get_project(request, self.project_id)
+        self.assertTrue(allowed)
+        self.assertFalse(role_cache.method_calls)
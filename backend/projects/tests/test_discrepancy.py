@@ -0,0 +1,144 @@
+import json
+
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from api.tests.utils import CRUDMixin
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+from users.tests.utils import make_user
+
+
+class DiscrepancyTestMixin(CRUDMixin):
+    viewname = ""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        project = cls.project.item
+        admin, approver, annotator = cls.project.members
+        positive = mommy.make("CategoryType", project=project, text="positive")
+        negative = mommy.make("CategoryType", project=project, text="negative")
+        cls.agreed = mommy.make("Example", project=project, text="agreed")
+        cls.split = mommy.make("Example", project=project, text="split")
+        mommy.make("Example", project=project, text="unlabeled")
+        for member in cls.project.members:
+            mommy.make("Category", example=cls.agreed, label=positive, user=member)
+        mommy.make("Category", example=cls.split, label=positive, user=admin)
+        mommy.make("Category", example=cls.split, label=negative, user=approver)
+        group = mommy.make("PerspectiveGroup", project=project)
+        cls.question = mommy.make("Perspective", project=project, group=group, data_type="string")
+        mommy.make("PerspectiveAnswer", project=project, perspective=cls.question, created_by=admin, answer="Yes")
+        mommy.make("PerspectiveAnswer", project=project, perspective=cls.question, created_by=approver, answer="No")
+        cls.group = group
+        cls.url = reverse(viewname=cls.viewname, args=[project.id])
+
+    def fetch(self, **params):
+        self.client.force_login(self.project.admin)
+        response = self.client.get(self.url, data=params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+
+class TestDiscrepancyAnalysis(DiscrepancyTestMixin):
+    viewname = "discrepancy_analysis"
+
+    def test_analyze_annotated_examples(self):
+        discrepancies = self.fetch()["discrepancies"]
+        self.assertEqual([item["id"] for item in discrepancies], [self.agreed.id, self.split.id])
+        agreed, split = discrepancies
+        self.assertEqual(agreed["text"], "agreed")
+        self.assertEqual(agreed["percentages"], {"positive": 100.0})
+        self.assertFalse(agreed["is_discrepancy"])
+        self.assertEqual(split["percentages"], {"positive": 50.0, "negative": 50.0})
+        self.assertTrue(split["is_discrepancy"])
+
+    def test_include_perspective_answers(self):
+        split = self.fetch()["discrepancies"][1]
+        admin, approver, _ = self.project.members
+        expected = {str(self.group.id): {str(self.question.id): {str(admin.id): "Yes", str(approver.id): "No"}}}
+        self.assertEqual(split["perspective_answers"], expected)
+
+    def test_filter_by_perspective_answer(self):
+        discrepancies = self.fetch(perspective=self.question.id, answer="No")["discrepancies"]
+        self.assertEqual([item["id"] for item in discrepancies], [self.agreed.id, self.split.id])
+        split = discrepancies[1]
+        self.assertEqual(split["annotators"], [self.project.approver.id])
+        self.assertEqual(split["percentages"], {"negative": 100.0})
+
+    def test_paginate(self):
+        data = self.fetch(limit=1, offset=1)
+        self.assertEqual(data["count"], 2)
+        self.assertEqual([item["id"] for item in data["discrepancies"]], [self.split.id])
+
+    def test_query_count_does_not_depend_on_examples(self):
+        self.client.force_login(self.project.admin)
+        with self.assertNumQueries(8):
+            self.client.get(self.url)
+        example = mommy.make("Example", project=self.project.item, text="new")
+        label = mommy.make("CategoryType", project=self.project.item)
+        for member in self.project.members:
+            mommy.make("Category", example=example, label=label, user=member)
+        with self.assertNumQueries(8):
+            self.client.get(self.url)
+
+
+class TestDiscrepancyList(DiscrepancyTestMixin):
+    viewname = "discrepancy_list"
+
+    def ids(self, **params):
+        return [item["id"] for item in self.fetch(**params)["discrepancies"]]
+
+    def test_list_annotated_examples(self):
+        results = self.fetch()["discrepancies"]
+        self.assertEqual([item["id"] for item in results], [self.agreed.id, self.split.id])
+        self.assertEqual(results[1]["percentages"], {"positive": 50.0, "negative": 50.0})
+        self.assertTrue(results[1]["is_discrepancy"])
+
+    def test_filter_only_discrepant(self):
+        self.assertEqual(self.ids(only_discrepant="true"), [self.split.id])
+
+    def test_filter_by_threshold(self):
+        self.assertEqual(self.ids(only_discrepant="true", threshold=40), [])
+        self.assertEqual(self.ids(only_discrepant="true", threshold=101), [self.agreed.id, self.split.id])
+
+    def test_filter_by_label(self):
+        self.assertEqual(self.ids(label="negative"), [self.split.id])
+
+    def test_filter_by_perspective_answer(self):
+        self.assertEqual(self.ids(perspective=self.question.id, answer="No", only_discrepant="true"), [])
+
+    def test_paginate_with_cursor(self):
+        data = self.fetch(limit=1)
+        self.assertEqual([item["id"] for item in data["discrepancies"]], [self.agreed.id])
+        response = self.client.get(data["next"])
+        self.assertEqual([item["id"] for item in response.json()["discrepancies"]], [self.split.id])
+
+    def test_reject_invalid_threshold(self):
+        self.client.force_login(self.project.admin)
+        response = self.client.get(self.url, data={"threshold": "high"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_denies_non_member(self):
+        self.assert_fetch(make_user("non-member"), status.HTTP_403_FORBIDDEN)
+
+
+class TestDiscrepancyExport(CRUDMixin):
+    def setUp(self):
+        self.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        label = mommy.make("CategoryType", project=self.project.item, text="positive")
+        self.examples = mommy.make("Example", project=self.project.item, _quantity=3)
+        for example in self.examples:
+            mommy.make("Category", example=example, label=label, user=self.project.admin)
+        self.url = reverse(viewname="discrepancy_export", args=[self.project.item.id])
+
+    def test_stream_ndjson(self):
+        self.client.force_login(self.project.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        items = [json.loads(line) for line in lines]
+        self.assertEqual([item["id"] for item in items], [example.id for example in self.examples])
+        self.assertEqual(items[0]["max_percentage"], 100.0)
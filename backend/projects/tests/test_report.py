@@ -0,0 +1,87 @@
+from model_mommy import mommy
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from api.tests.utils import CRUDMixin
+from projects.models import ProjectType
+from projects.tests.utils import prepare_project
+
+
+class TestReportAnnotations(CRUDMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = prepare_project(ProjectType.DOCUMENT_CLASSIFICATION)
+        project = cls.project.item
+        admin, approver, annotator = cls.project.members
+        positive = mommy.make("CategoryType", project=project, text="positive")
+        negative = mommy.make("CategoryType", project=project, text="negative")
+        agreed = mommy.make("Example", project=project, text="a", upload_name="first.jsonl")
+        disagreed = mommy.make("Example", project=project, text="b", upload_name="first.jsonl")
+        mommy.make("Example", project=project, text="c", upload_name="first.jsonl")
+        single = mommy.make("Example", project=project, text="d", upload_name="second.jsonl")
+        mommy.make("Category", example=agreed, label=positive, user=admin)
+        mommy.make("Category", example=agreed, label=positive, user=annotator)
+        mommy.make("Category", example=disagreed, label=positive, user=admin)
+        mommy.make("Category", example=disagreed, label=negative, user=approver)
+        mommy.make("Category", example=single, label=negative, user=annotator)
+        cls.url = reverse(viewname="project_report", args=[project.id])
+
+    def fetch(self, query=""):
+        self.client.force_login(self.project.admin)
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def find(self, rows, row_type, dataset, label=None):
+        for row in rows:
+            if row["type"] == row_type and row["dataset"] == dataset and row.get("label") == label:
+                return row
+        self.fail(f"{row_type} row for {dataset}/{label} is not found.")
+
+    def test_summarize_datasets(self):
+        data = self.fetch()
+        self.assertEqual(data["available_datasets"], ["all", "first.jsonl", "second.jsonl"])
+        first = self.find(data["report_data"], "dataset_summary", "first.jsonl")
+        self.assertEqual(first["total_documents"], 3)
+        self.assertEqual(first["annotated_documents"], 2)
+        self.assertEqual(first["annotation_percentage"], 66.67)
+        second = self.find(data["report_data"], "dataset_summary", "second.jsonl")
+        self.assertEqual(second["total_documents"], 1)
+        self.assertEqual(second["annotated_documents"], 1)
+
+    def test_aggregate_labels(self):
+        rows = self.fetch()["report_data"]
+        positive = self.find(rows, "category", "first.jsonl", "positive")
+        self.assertEqual(positive["count"], 3)
+        self.assertEqual(positive["unique_users"], 2)
+        self.assertEqual(positive["agreement"], {"percentage": 66.67, "total": 3, "agreed": 2, "disagreed": 1})
+        negative = self.find(rows, "category", "second.jsonl", "negative")
+        self.assertEqual(negative["agreement"], {"percentage": 100.0, "total": 1, "agreed": 1, "disagreed": 0})
+
+    def test_filter_by_agreement(self):
+        rows = self.fetch("?agreement=disagreed")["report_data"]
+        first = self.find(rows, "dataset_summary", "first.jsonl")
+        self.assertEqual(first["annotated_documents"], 1)
+        positive = self.find(rows, "category", "first.jsonl", "positive")
+        self.assertEqual(positive["count"], 1)
+        second = self.find(rows, "dataset_summary", "second.jsonl")
+        self.assertEqual(second["annotated_documents"], 0)
+
+    def test_filter_by_dataset(self):
+        rows = self.fetch("?datasets=second.jsonl")["report_data"]
+        self.assertEqual({row["dataset"] for row in rows}, {"second.jsonl"})
+
+    def test_name_unnamed_dataset_by_example(self):
+        example = mommy.make("Example", project=self.project.item, text="e", upload_name="")
+        rows = self.fetch()["report_data"]
+        unnamed = self.find(rows, "dataset_summary", f"Arquivo sem nome (ID: {example.id})")
+        self.assertEqual(unnamed["total_documents"], 1)
+
+    def test_query_count_does_not_depend_on_examples(self):
+        self.client.force_login(self.project.admin)
+        with self.assertNumQueries(11):
+            self.client.get(self.url)
+        for _ in range(10):
+            mommy.make("Example", project=self.project.item, text="x", upload_name="first.jsonl")
+        with self.assertNumQueries(11):
+            self.client.get(self.url)
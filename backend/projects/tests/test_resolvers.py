@@ -0,0 +1,56 @@
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from model_mommy import mommy
+from rest_framework.request import Request
+
+from projects.models import ProjectType, SequenceLabelingProject
+from projects.resolvers import get_member, get_project
+from projects.tests.utils import prepare_project
+from users.tests.utils import make_user
+
+
+class TestResolvers(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = prepare_project(ProjectType.SEQUENCE_LABELING, use_relation=True)
+
+    def make_request(self, user):
+        request = RequestFactory().get("/")
+        request.user = user
+        return request
+
+    def test_load_member_role_and_project_in_one_query(self):
+        request = self.make_request(self.project.admin)
+        with self.assertNumQueries(1):
+            member = get_member(request, self.project.item.id)
+            project = get_project(request, str(self.project.item.id))
+            self.assertTrue(member.is_admin())
+            self.assertIsInstance(project, SequenceLabelingProject)
+            self.assertTrue(project.use_relation)
+            self.assertEqual(project.name, self.project.item.name)
+
+    def test_share_cache_with_drf_request(self):
+        request = self.make_request(self.project.annotator)
+        member = get_member(request, self.project.item.id)
+        with self.assertNumQueries(0):
+            self.assertIs(get_member(Request(request), self.project.item.id), member)
+
+    def test_load_project_of_non_member(self):
+        request = self.make_request(make_user())
+        self.assertIsNone(get_member(request, self.project.item.id))
+        self.assertEqual(get_project(request, self.project.item.id), self.project.item)
+        with self.assertNumQueries(0):
+            get_member(request, self.project.item.id)
+            get_project(request, self.project.item.id)
+
+    def test_raise_404_for_unknown_project(self):
+        request = self.make_request(self.project.admin)
+        for project_id in (0, "invalid"):
+            with self.assertRaises(Http404):
+                get_project(request, project_id)
+
+    def test_separate_projects(self):
+        other = mommy.make("TextClassificationProject", project_type=ProjectType.DOCUMENT_CLASSIFICATION)
+        request = self.make_request(self.project.admin)
+        get_member(request, self.project.item.id)
+        self.assertEqual(get_project(request, other.id), other)
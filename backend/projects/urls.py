@@ -2,7 +2,14 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from .views.perspective import PerspectiveViewSet, PerspectiveGroupViewSet, PerspectiveAnswerViewSet
-from .views.project import DiscrepancyAnalysisView, ProjectList, ProjectDetail, CloneProject
+from .views.project import (
+    DiscrepancyAnalysisView,
+    DiscrepancyExport,
+    DiscrepancyList,
+    ProjectList,
+    ProjectDetail,
+    CloneProject,
+)
 
 from .views.report import ReportAnnotationsView
 from .views.votacoes import VotacoesView
@@ -52,6 +59,8 @@ urlpatterns = [
 
 
     path("projects/<int:project_id>/discrepacies", DiscrepancyAnalysisView.as_view(), name="discrepancy_analysis"),
+    path("projects/<int:project_id>/discrepancies", DiscrepancyList.as_view(), name="discrepancy_list"),
+    path("projects/<int:project_id>/discrepancies/export", DiscrepancyExport.as_view(), name="discrepancy_export"),
     path('projects/<int:project_id>/annotations', UserAnnotationsAPI.as_view(), name='user_annotations'),
     
     # Old votacoes endpoint (can be removed if not needed)
@@ -1,18 +1,26 @@
+import json
+
 from django.conf import settings
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, status, views
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-
-from examples.models import Example
-from django.db.models import Count
-from rest_framework.exceptions import NotFound
 from rest_framework.views import APIView
 
-from projects.models import Project, PerspectiveAnswer
-
+from examples.models import Example
+from projects.discrepancies import (
+    DEFAULT_DISCREPANCY_THRESHOLD,
+    DiscrepancyQuery,
+    PerspectiveAnswerIndex,
+    analyze_votes,
+    collect_votes,
+)
+from projects.models import Project
 from projects.permissions import IsProjectAdmin, IsProjectStaffAndReadOnly
 from projects.serializers import ProjectPolymorphicSerializer
 
@@ -73,133 +81,124 @@ class CloneProject(views.APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+class DiscrepancyPagination(LimitOffsetPagination):
+    """Paginate only when `limit` is given, so that existing clients still get the full list."""
+
+    default_limit = None
+    max_limit = 1000
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "discrepancies": data,
+            }
+        )
+
 
 class DiscrepancyAnalysisView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = DiscrepancyPagination
 
     def get(self, request, project_id):
+        get_object_or_404(Project, id=project_id)
+        if not Example.objects.filter(project_id=project_id).exists():
+            raise NotFound("No examples found for this project.")
+
+        index = PerspectiveAnswerIndex(project_id)
+        filter_perspective = request.query_params.get("perspective")
+        filter_answer = request.query_params.get("answer")
+        matching_annotators = None
+        if filter_perspective and filter_answer:
+            try:
+                matching_annotators = index.annotators_answering(int(filter_perspective), filter_answer)
+            except ValueError:
+                matching_annotators = set()
+
+        discrepancies = []
+        for example_id, votes in collect_votes(project_id).items():
+            discrepancy = analyze_votes(votes, matching_annotators)
+            if discrepancy is None:
+                continue
+            discrepancy["id"] = example_id
+            discrepancy["perspective_answers"] = index.answers_of(discrepancy["annotators"])
+            discrepancies.append(discrepancy)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(discrepancies, request, view=self)
+        items = discrepancies if page is None else page
+        texts = dict(Example.objects.filter(id__in=[item["id"] for item in items]).values_list("id", "text"))
+        for item in items:
+            item["text"] = texts[item["id"]]
+        if page is None:
+            return Response({"discrepancies": items})
+        return paginator.get_paginated_response(items)
+
+
+class DiscrepancyCursorPagination(CursorPagination):
+    """Return the page under `discrepancies`, as DiscrepancyAnalysisView does."""
+
+    ordering = "id"
+    page_size = 100
+    page_size_query_param = "limit"
+    max_page_size = 1000
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "discrepancies": data,
+            }
+        )
+
+
+class DiscrepancyQueryMixin:
+    def get_discrepancy_query(self) -> DiscrepancyQuery:
+        params = self.request.query_params
         try:
-            project = get_object_or_404(Project, id=project_id)
-            discrepancy_threshold = 70
-            examples = Example.objects.filter(project_id=project_id)
-
-            if not examples.exists():
-                raise NotFound("No examples found for this project.")
-
-            # Obter parâmetros de filtro da URL
-            filter_perspective = request.query_params.get('perspective')
-            filter_answer = request.query_params.get('answer')
-
-            discrepancies = []
-            for example in examples:
-                # Obter anotações com informações do usuário
-                labels = example.categories.values(
-                    'label', 
-                    'label__text', 
-                    'user'
-                ).annotate(count=Count('label'))
-                
-                total_labels = sum(label['count'] for label in labels)
-                if total_labels == 0:
-                    continue
-
-                # Obter usuários que anotaram este exemplo
-                all_annotators = set(label['user'] for label in labels if label['user'])
-                
-                # Se houver filtro, filtrar os anotadores que deram a resposta específica
-                if filter_perspective and filter_answer:
-                    # Buscar todas as respostas das perspectivas para os anotadores
-                    perspective_answers = {}
-                    matching_annotators = set()
-                    
-                    for annotator_id in all_annotators:
-                        user_responses = PerspectiveAnswer.objects.filter(
-                            project_id=project_id,
-                            created_by_id=annotator_id
-                        ).select_related('perspective', 'perspective__group')
-                        
-                        has_matching_answer = False
-                        
-                        for response in user_responses:
-                            group_id = str(response.perspective.group.id)
-                            question_id = str(response.perspective.id)
-                            
-                            # Inicializar estrutura se necessário
-                            if group_id not in perspective_answers:
-                                perspective_answers[group_id] = {}
-                            if question_id not in perspective_answers[group_id]:
-                                perspective_answers[group_id][question_id] = {}
-                            
-                            # Adicionar resposta do anotador
-                            perspective_answers[group_id][question_id][str(annotator_id)] = response.answer
-                            
-                            # Verificar se esta resposta corresponde ao filtro
-                            if (question_id == filter_perspective and 
-                                response.answer == filter_answer):
-                                has_matching_answer = True
-                        
-                        if has_matching_answer:
-                            matching_annotators.add(annotator_id)
-                    
-                    # Se não houver anotadores que deram a resposta específica, pular este exemplo
-                    if not matching_annotators:
-                        continue
-                        
-                    # Filtrar as anotações para incluir apenas os anotadores que deram a resposta correta
-                    labels = [label for label in labels if label['user'] in matching_annotators]
-                    
-                    # Recalcular totais e percentagens apenas com os anotadores filtrados
-                    total_labels = sum(label['count'] for label in labels)
-                    if total_labels == 0:
-                        continue
-                        
-                    percentages = {label['label__text']: (label['count'] / total_labels) * 100 for label in labels}
-                    max_percentage = max(percentages.values())
-                    annotators = matching_annotators
-                else:
-                    percentages = {label['label__text']: (label['count'] / total_labels) * 100 for label in labels}
-                    max_percentage = max(percentages.values())
-                    annotators = all_annotators
-                    
-                    # Buscar respostas das perspectivas para todos os anotadores
-                    perspective_answers = {}
-                    for annotator_id in annotators:
-                        user_responses = PerspectiveAnswer.objects.filter(
-                            project_id=project_id,
-                            created_by_id=annotator_id
-                        ).select_related('perspective', 'perspective__group')
-                        
-                        for response in user_responses:
-                            group_id = str(response.perspective.group.id)
-                            question_id = str(response.perspective.id)
-                            
-                            # Inicializar estrutura se necessário
-                            if group_id not in perspective_answers:
-                                perspective_answers[group_id] = {}
-                            if question_id not in perspective_answers[group_id]:
-                                perspective_answers[group_id][question_id] = {}
-                            
-                            # Adicionar resposta do anotador
-                            perspective_answers[group_id][question_id][str(annotator_id)] = response.answer
-
-                discrepancy = {
-                    "id": example.id,
-                    "text": example.text,
-                    "percentages": percentages,
-                    "is_discrepancy": max_percentage < discrepancy_threshold,
-                    "max_percentage": max_percentage,
-                    "perspective_answers": perspective_answers,
-                    "annotators": list(annotators)
-                }
-                
-                discrepancies.append(discrepancy)
-
-            return Response({"discrepancies": discrepancies})
-            
-        except Exception as e:
-            print(f"Error in DiscrepancyAnalysisView: {str(e)}")
-            return Response(
-                {"detail": "An error occurred while processing your request."},
-                status=500
-            )
+            threshold = float(params.get("threshold", DEFAULT_DISCREPANCY_THRESHOLD))
+        except ValueError:
+            raise ValidationError({"threshold": "A number is required."})
+        annotators = None
+        perspective, answer = params.get("perspective"), params.get("answer")
+        if perspective and answer:
+            try:
+                annotators = PerspectiveAnswerIndex(self.kwargs["project_id"]).annotators_answering(
+                    int(perspective), answer
+                )
+            except ValueError:
+                annotators = set()
+        return DiscrepancyQuery(
+            self.kwargs["project_id"],
+            threshold=threshold,
+            annotators=annotators,
+            label=params.get("label"),
+            only_discrepant=params.get("only_discrepant", "").lower() in ("1", "true"),
+        )
+
+
+class DiscrepancyList(DiscrepancyQueryMixin, generics.ListAPIView):
+    """Cursor-paginated discrepancies, filtered by `threshold`, `only_discrepant`, `label` and perspective answer."""
+
+    permission_classes = [IsAuthenticated & (IsProjectAdmin | IsProjectStaffAndReadOnly)]
+    pagination_class = DiscrepancyCursorPagination
+    swagger_schema = None
+
+    def list(self, request, *args, **kwargs):
+        query = self.get_discrepancy_query()
+        page = self.paginate_queryset(query.queryset())
+        return self.get_paginated_response(query.describe(page))
+
+
+class DiscrepancyExport(DiscrepancyQueryMixin, APIView):
+    """Stream every discrepancy as newline-delimited JSON."""
+
+    permission_classes = [IsAuthenticated & (IsProjectAdmin | IsProjectStaffAndReadOnly)]
 
+    def get(self, request, *args, **kwargs):
+        query = self.get_discrepancy_query()
+        lines = (json.dumps(discrepancy) + "\n" for discrepancy in query.stream())
+        return StreamingHttpResponse(lines, content_type="application/x-ndjson")